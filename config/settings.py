@@ -4,9 +4,13 @@ REST_BASE_URL、WS_MARKET_URL、WS_USER_URL 根据环境（ENV）取值，也可
 """
 import os
 
-# 环境：test/uat / staging / prod
+# 环境：test/uat / staging / prod / local（本地模拟交易所，见 utils/mock_exchange.py）
 ENV = os.getenv("TEST_ENV", "uat").lower()
 
+# 本地模拟交易所监听地址（ENV=local 时使用）
+MOCK_EXCHANGE_HOST = os.getenv("MOCK_EXCHANGE_HOST", "127.0.0.1")
+MOCK_EXCHANGE_PORT = int(os.getenv("MOCK_EXCHANGE_PORT", "8765"))
+
 # 按环境配置的默认 base url
 # REST 格式: {rest_base}/{method}  例: https://uat-api.3ona.co/exchange/v1/orders
 # WebSocket 格式: 区分 market（行情）和 user（用户）两个端点
@@ -31,6 +35,11 @@ ENV_URLS = {
         "ws_market": "wss://stream.crypto.com/exchange/v1/market",
         "ws_user": "wss://stream.crypto.com/exchange/v1/user",
     },
+    "local": {
+        "rest": f"http://{MOCK_EXCHANGE_HOST}:{MOCK_EXCHANGE_PORT}/exchange/v1",
+        "ws_market": f"ws://{MOCK_EXCHANGE_HOST}:{MOCK_EXCHANGE_PORT}/exchange/v1/market",
+        "ws_user": f"ws://{MOCK_EXCHANGE_HOST}:{MOCK_EXCHANGE_PORT}/exchange/v1/user",
+    },
 }
 
 # 按环境配置的 WebSocket 鉴权（与 ENV_URLS 分离，便于维护）
@@ -39,6 +48,7 @@ ENV_WS_CREDENTIALS = {
     "uat": {"api_key": "API_KEY", "secret_key": "SECRET_KEY"},
     "staging": {"api_key": "", "secret_key": ""},
     "prod": {"api_key": "", "secret_key": ""},
+    "local": {"api_key": "LOCAL_API_KEY", "secret_key": "LOCAL_SECRET_KEY"},
 }
 
 # 优先用环境变量，否则根据 ENV 取配置
@@ -55,9 +65,82 @@ WS_SECRET_KEY = os.getenv("WS_SECRET_KEY") or _ws_creds["secret_key"]
 # REST API 超时
 REST_TIMEOUT = int(os.getenv("REST_TIMEOUT", "10"))
 
+# REST 响应压缩协商（Accept-Encoding）：auto 为按已安装解码库自动协商（gzip、deflate，装有 brotli 时加 br），
+# identity 表示不压缩，也可直接指定如 "gzip"
+REST_ACCEPT_ENCODING = os.getenv("REST_ACCEPT_ENCODING", "auto").lower()
+
+# REST GET 响应缓存有效期（秒），0 表示关闭缓存；最大缓存条目数
+REST_CACHE_TTL = float(os.getenv("REST_CACHE_TTL", "0"))
+REST_CACHE_MAX_ENTRIES = int(os.getenv("REST_CACHE_MAX_ENTRIES", "1024"))
+
+# REST 自适应限流：每个接口的初始速率（次/秒），0 表示关闭；速率上限
+REST_RATE_LIMIT = float(os.getenv("REST_RATE_LIMIT", "0"))
+REST_RATE_LIMIT_MAX = float(os.getenv("REST_RATE_LIMIT_MAX", "100"))
+
+# REST 对冲请求：超过近期延迟的该分位（0~100）仍未返回则对冲，0 表示关闭
+REST_HEDGE_PERCENTILE = float(os.getenv("REST_HEDGE_PERCENTILE", "0"))
+
+# REST 日志模式：debug（默认，全量日志 + 每次附加 Allure）/ throughput（采样、截断、仅失败附加 Allure）
+REST_LOG_MODE = os.getenv("REST_LOG_MODE", "debug").lower()
+# throughput 模式下日志中 body 最大字节数、成功请求日志采样率（0~1）
+REST_LOG_BODY_MAX = int(os.getenv("REST_LOG_BODY_MAX", "2048"))
+REST_LOG_SAMPLE_RATE = float(os.getenv("REST_LOG_SAMPLE_RATE", "0.01"))
+
+# REST 录制/回放：off（默认）/ record（录制实际响应）/ replay（从录制文件返回，不发网络请求）；录制文件路径
+REST_CASSETTE_MODE = os.getenv("REST_CASSETTE_MODE", "off").lower()
+REST_CASSETTE_PATH = os.getenv("REST_CASSETTE_PATH", "test_data/cassettes/rest_cassette.ndjson")
+# 回放时精确键未命中是否回退为忽略 start_ts / end_ts 取值的宽松匹配（默认关闭：可能返回其他时间窗口的录制）
+REST_CASSETTE_LOOSE = os.getenv("REST_CASSETTE_LOOSE", "0") == "1"
+
+# 异步 REST 客户端最大并发（同时在途的请求数）
+REST_MAX_CONCURRENCY = int(os.getenv("REST_MAX_CONCURRENCY", "50"))
+
+# REST 压测（core/load_runner.py）：总时长（秒，0 表示跳过压测用例）、目标速率（次/秒，0 表示闭环满负荷）、并发数、预热时长（秒）
+LOAD_DURATION = float(os.getenv("LOAD_DURATION", "0"))
+LOAD_RPS = float(os.getenv("LOAD_RPS", "0"))
+LOAD_CONCURRENCY = int(os.getenv("LOAD_CONCURRENCY", "8"))
+LOAD_WARMUP = float(os.getenv("LOAD_WARMUP", "2"))
+
+# JSON 解析后端：auto（已安装 orjson 则使用）/ orjson / json
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto").lower()
+
 # WebSocket 超时
 WS_TIMEOUT = int(os.getenv("WS_TIMEOUT", "10"))
 
+# WebSocket 文本帧是否跳过 websocket-client 的逐字节 UTF-8 校验（纯 Python 实现，收包的主要 CPU 开销）：
+# 0 保留（默认；安装 wsaccel 后校验为编译实现）/ 1 跳过（压测等场景显式开启，非法编码只在 JSON 解析时才可能暴露）
+WS_SKIP_UTF8_VALIDATION = os.getenv("WS_SKIP_UTF8_VALIDATION", "0") == "1"
+
+# WebSocket 后台读线程：1 开启（持续收包写入有界缓冲，recv 系列从缓冲消费），0 关闭（默认，调用 recv 时才读 socket）
+WS_READER_THREAD = os.getenv("WS_READER_THREAD", "0") == "1"
+# 读线程缓冲容量（帧数）；缓冲满时的策略：oldest（丢最早帧）/ newest（丢新到帧）/ block（读线程等待，积压回 socket）
+WS_BUFFER_SIZE = int(os.getenv("WS_BUFFER_SIZE", "10000"))
+WS_DROP_POLICY = os.getenv("WS_DROP_POLICY", "oldest").lower()
+
+# WebSocket 断线自动恢复：1 开启（recv_until / recv_for_seconds 遇断线时按抖动退避重连、重新鉴权并重放订阅，
+# 在消息列表中插入 _meta 断档标记），0 关闭（默认，断线直接抛异常）；最多重试次数、退避基数与上限（秒）
+WS_RECONNECT = os.getenv("WS_RECONNECT", "0") == "1"
+WS_RECONNECT_RETRIES = int(os.getenv("WS_RECONNECT_RETRIES", "5"))
+WS_RECONNECT_BACKOFF = float(os.getenv("WS_RECONNECT_BACKOFF", "0.5"))
+WS_RECONNECT_BACKOFF_MAX = float(os.getenv("WS_RECONNECT_BACKOFF_MAX", "30"))
+
+# WebSocket 发布到接收延迟统计：1 开启（每条推送按 t 与估计的服务端时钟偏移计算延迟，关闭连接时按 channel 输出分位数），0 关闭（默认）
+WS_TRACK_LATENCY = os.getenv("WS_TRACK_LATENCY", "0") == "1"
+# 服务端时间请求 method：响应 result.t 为服务端处理该请求时的毫秒时间戳，往返样本用于估计服务端时钟偏移；置空表示不发送
+WS_CLOCK_METHOD = os.getenv("WS_CLOCK_METHOD", "public/get-time")
+
+# WebSocket permessage-deflate：1 握手时请求压缩（服务端接受后压缩消息在帧读取层解压，关闭连接时输出压缩前后字节与解压 CPU），
+# 0 不请求（默认）；要求服务端使用的压缩窗口位数 9 ~ 15（越小内存越省、压缩率越低）
+WS_DEFLATE = os.getenv("WS_DEFLATE", "0") == "1"
+WS_DEFLATE_WINDOW_BITS = int(os.getenv("WS_DEFLATE_WINDOW_BITS", "15"))
+
+# WebSocket 连接池：每个 endpoint 最多保留的空闲连接数，大于 0 时 websocket_*_client fixture 从池中租用连接（默认 0 关闭，每个用例新建连接）
+WS_POOL_SIZE = int(os.getenv("WS_POOL_SIZE", "0"))
+
+# WebSocket 原始帧抓包目录（为空不抓包）：每个连接一个 .wscap 文件，可用 core.ws_replay 离线回放；1 表示载荷 zlib 压缩
+WS_CAPTURE_DIR = os.getenv("WS_CAPTURE_DIR", "")
+WS_CAPTURE_COMPRESS = os.getenv("WS_CAPTURE_COMPRESS", "0") == "1"
+
 # 日志
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_DIR = os.getenv("LOG_DIR", "logs")
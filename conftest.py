@@ -1,62 +1,196 @@
 """
 pytest 全局配置：fixtures、日志初始化、Allure 环境信息
 """
+import glob
+import json
 import os
 
 import pytest
+import pytest_asyncio
 
-from config.settings import WS_MARKET_URL, WS_USER_URL
+from config.settings import (
+    REST_CACHE_MAX_ENTRIES,
+    REST_CACHE_TTL,
+    REST_CASSETTE_MODE,
+    REST_CASSETTE_PATH,
+    REST_HEDGE_PERCENTILE,
+    REST_RATE_LIMIT,
+    REST_RATE_LIMIT_MAX,
+    WS_MARKET_URL,
+    WS_POOL_SIZE,
+    WS_USER_URL,
+)
+from core.async_rest_client import AsyncRestClient
+from core.async_websocket_client import AsyncWebSocketClient
+from core.cassette import CASSETTE_MODE_OFF, Cassette
+from core.hedging import HedgePolicy
 from core.logger import get_logger
+from core.metrics import LatencyRecorder, default_recorder
+from core.rate_limiter import AdaptiveRateLimiter
+from core.rest_cache import ResponseCache
 from core.rest_client import RestClient
 from core.websocket_client import WebSocketClient
+from core.ws_capture import capture_path_for
+from core.ws_pool import WebSocketPool
 
 logger = get_logger("conftest")
 
+# REST 延迟直方图：各进程原始数据目录、合并后的汇总文件
+LATENCY_DIR = "reports/latency"
+LATENCY_SUMMARY_PATH = "reports/latency_summary.json"
+
 
 @pytest.fixture(scope="session")
 def rest_client():
-    """Session 级 REST 客户端，复用连接。"""
+    """
+    Session 级 REST 客户端，复用连接。
+    REST_CACHE_TTL > 0 时开启 GET 响应缓存；REST_RATE_LIMIT > 0 时开启自适应限流；
+    REST_HEDGE_PERCENTILE > 0 时开启 GET 对冲请求；REST_CASSETTE_MODE 为 record / replay 时开启录制 / 回放。
+    """
     logger.info("Create session REST client")
-    client = RestClient()
+    cache = ResponseCache(ttl=REST_CACHE_TTL, max_entries=REST_CACHE_MAX_ENTRIES) if REST_CACHE_TTL > 0 else None
+    limiter = (
+        AdaptiveRateLimiter(initial_rate=REST_RATE_LIMIT, max_rate=REST_RATE_LIMIT_MAX) if REST_RATE_LIMIT > 0 else None
+    )
+    hedge_policy = HedgePolicy(percentile=REST_HEDGE_PERCENTILE) if REST_HEDGE_PERCENTILE > 0 else None
+    cassette = Cassette(REST_CASSETTE_PATH, REST_CASSETTE_MODE) if REST_CASSETTE_MODE != CASSETTE_MODE_OFF else None
+    client = RestClient(cache=cache, rate_limiter=limiter, hedge_policy=hedge_policy, cassette=cassette)
     yield client
+    if cache is not None:
+        logger.info("REST cache stats: %s", cache.stats())
+    if limiter is not None:
+        logger.info("REST rate limiter stats: %s", limiter.stats())
+    if hedge_policy is not None:
+        logger.info("REST hedge stats: %s", hedge_policy.stats())
+    # 延迟汇总不在此附加到 Allure：xdist 下每个 worker 只有部分数据，唯一出处为 pytest_sessionfinish 写入的 LATENCY_SUMMARY_PATH
+    client.close()
+    if cassette is not None:
+        cassette.close()
     logger.info("Session end, REST client closed")
 
 
-@pytest.fixture
-def websocket_market_client():
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_rest_client():
     """
-    用例级 WebSocket Market 客户端（行情订阅：book、ticker 等）。
-    URL: wss://uat-stream.3ona.co/exchange/v1/market
-    fixture 负责连接和关闭，用例直接使用即可。
+    Session 级异步 REST 客户端，复用连接池，并发上限见 REST_MAX_CONCURRENCY。
+    用例需标记 @pytest.mark.asyncio(loop_scope="session")，与 fixture 共用同一事件循环。
     """
-    logger.info("Create and connect WebSocket market client: %s", WS_MARKET_URL)
-    client = WebSocketClient(url=WS_MARKET_URL)
+    logger.info("Create session async REST client")
+    client = AsyncRestClient()
+    yield client
+    await client.close()
+    logger.info("Session end, async REST client closed")
+
+
+@pytest.fixture(scope="session")
+def websocket_pools():
+    """
+    Session 级 WebSocket 连接池（每个 endpoint 一个，xdist 下每个 worker 各自一份），
+    websocket_market_client / websocket_user_client 从中租用连接；session 结束时关闭全部连接。
+    """
+    pools = {url: WebSocketPool(url) for url in (WS_MARKET_URL, WS_USER_URL)}
+    yield pools
+    for pool in pools.values():
+        pool.close()
+
+
+def _websocket_client(request, url: str):
+    """WS_POOL_SIZE > 0 时从连接池租用（用例结束退订、清空残留帧后归还），否则新建连接并在用例结束时关闭。"""
+    capture_path = capture_path_for(request.node.nodeid)
+    if WS_POOL_SIZE > 0:
+        with request.getfixturevalue("websocket_pools")[url].lease(capture_path) as client:
+            yield client
+        return
+    client = WebSocketClient(url=url, capture_path=capture_path)
     client.connect()  # fixture 中建立连接
     yield client
     client.close()
-    logger.info("WebSocket market client closed")
 
 
 @pytest.fixture
-def websocket_user_client():
+def websocket_market_client(request):
+    """
+    用例级 WebSocket Market 客户端（行情订阅：book、ticker 等）。
+    URL: wss://uat-stream.3ona.co/exchange/v1/market
+    fixture 负责连接和关闭（WS_POOL_SIZE > 0 时从连接池租用已建立的连接），用例直接使用即可。
+    配置 WS_CAPTURE_DIR 时按用例 nodeid 命名抓包文件。
+    """
+    logger.info("Acquire WebSocket market client: %s", WS_MARKET_URL)
+    yield from _websocket_client(request, WS_MARKET_URL)
+    logger.info("WebSocket market client released")
+
+
+@pytest.fixture
+def websocket_user_client(request):
     """
     用例级 WebSocket User 客户端（用户相关：订单、账户等，需鉴权）。
     URL: wss://uat-stream.3ona.co/exchange/v1/user
     fixture 负责连接和关闭，用例直接使用即可。
+    从连接池租用时会话可能已鉴权（client.authenticated）；连接断开重连后按上次成功的参数自动重新鉴权。
+    需要未鉴权会话的用例请自行创建 WebSocketClient。
     """
-    logger.info("Create and connect WebSocket user client: %s", WS_USER_URL)
-    client = WebSocketClient(url=WS_USER_URL)
-    client.connect()  # fixture 中建立连接
+    logger.info("Acquire WebSocket user client: %s", WS_USER_URL)
+    yield from _websocket_client(request, WS_USER_URL)
+    logger.info("WebSocket user client released")
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_websocket_market_client():
+    """
+    用例级异步 WebSocket Market 客户端，fixture 负责连接和关闭。
+    用例需标记 @pytest.mark.asyncio(loop_scope="session")；需要更多连接时可在用例内自行创建 AsyncWebSocketClient。
+    """
+    logger.info("Create and connect async WebSocket market client: %s", WS_MARKET_URL)
+    client = await AsyncWebSocketClient(url=WS_MARKET_URL).connect()
     yield client
-    client.close()
-    logger.info("WebSocket user client closed")
+    await client.close()
+    logger.info("Async WebSocket market client closed")
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_websocket_user_client():
+    """
+    用例级异步 WebSocket User 客户端（需鉴权），fixture 负责连接和关闭。
+    用例需标记 @pytest.mark.asyncio(loop_scope="session")。
+    """
+    logger.info("Create and connect async WebSocket user client: %s", WS_USER_URL)
+    client = await AsyncWebSocketClient(url=WS_USER_URL).connect()
+    yield client
+    await client.close()
+    logger.info("Async WebSocket user client closed")
 
 
 def pytest_configure(config):
-    """Allure 环境信息写入。"""
+    """Allure 环境信息写入；主进程清理上次运行的延迟数据。"""
     allure_dir = "reports/allure-results"
     os.makedirs(allure_dir, exist_ok=True)
     env_path = os.path.join(allure_dir, "environment.properties")
     with open(env_path, "w", encoding="utf-8") as f:
         f.write("env=test\n")
         f.write("framework=pytest\n")
+    if not hasattr(config, "workerinput"):
+        for path in glob.glob(os.path.join(LATENCY_DIR, "*.json")):
+            os.remove(path)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """
+    REST 延迟直方图落盘与汇总：
+    - xdist worker：将本进程原始直方图写入 LATENCY_DIR
+    - 主进程（或未启用 xdist）：合并各 worker 与本进程数据，写入 LATENCY_SUMMARY_PATH（延迟汇总的唯一出处）
+    """
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker_id:
+        default_recorder.dump(os.path.join(LATENCY_DIR, f"latency_{worker_id}.json"))
+        return
+    merged = LatencyRecorder()
+    merged.merge(default_recorder)
+    for path in glob.glob(os.path.join(LATENCY_DIR, "latency_*.json")):
+        merged.merge(LatencyRecorder.load(path))
+    summary = merged.summary()
+    if not summary:
+        return
+    os.makedirs(os.path.dirname(LATENCY_SUMMARY_PATH), exist_ok=True)
+    with open(LATENCY_SUMMARY_PATH, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    logger.info("REST latency summary written to %s", LATENCY_SUMMARY_PATH)
@@ -0,0 +1,130 @@
+"""
+异步 REST 客户端封装：基于 aiohttp，与 RestClient 保持相同的 request / request_json_success 接口。
+通过 asyncio.Semaphore 限制同时在途的请求数，单个 worker 即可并发保持多个请求，而不必逐个串行等待。
+日志按 RestLogPolicy 采样/截断，与 RestClient 一致。
+注：多个协程并发时 allure step 栈无法正确嵌套，故异步客户端只打日志，不写 allure step / attach。
+"""
+import asyncio
+
+import aiohttp
+
+from config.settings import REST_BASE_URL, REST_MAX_CONCURRENCY, REST_TIMEOUT
+from constants import RestApiDef, get_biz_http_status
+from core.logger import get_logger
+from core.rest_client import DEFAULT_HEADERS
+from core.rest_logging import RestLogPolicy
+from core.rest_response import ParsedBodyMixin
+
+logger = get_logger("async_rest_client")
+
+
+class AsyncRestResponse(ParsedBodyMixin):
+    """
+    异步响应快照：body 在 request 内已读完，字段与 requests.Response 常用属性对齐（status_code / text / json()），
+    text / json() 与 RestResponse 一样只解析一次并缓存。
+    """
+
+    def __init__(self, status_code: int, headers: dict, content: bytes, url: str, encoding: str = None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.encoding = encoding
+
+
+class AsyncRestClient:
+    """
+    异步 REST 请求封装，支持统一 base_url、超时与并发上限。默认 Content-Type: application/json。
+    session 在首次请求时于当前事件循环内创建，用完需 await close()（或 async with）。
+    """
+
+    def __init__(
+        self,
+        base_url: str = None,
+        timeout: int = None,
+        max_concurrency: int = None,
+        log_policy: RestLogPolicy = None,
+    ):
+        self.base_url = (base_url or REST_BASE_URL).rstrip("/")
+        self.timeout = timeout or REST_TIMEOUT
+        self.max_concurrency = max_concurrency or REST_MAX_CONCURRENCY
+        self.log_policy = log_policy or RestLogPolicy.from_settings()
+        self._semaphore = None
+        self._session = None
+
+    def _url(self, path: str) -> str:
+        path = path if path.startswith("http") else f"{self.base_url}/{path.lstrip('/')}"
+        return path
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            # 连接池上限与并发上限一致，避免请求在 connector 内部再次排队
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self._session = aiohttp.ClientSession(
+                headers=DEFAULT_HEADERS,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _request(self, method: str, path: str, **kwargs) -> AsyncRestResponse:
+        url = self._url(path)
+        session = self._get_session()
+        # aiohttp 不接受值为 None 的 params/json，按 requests 语义视为未传
+        kwargs = {k: v for k, v in kwargs.items() if v is not None}
+        params = kwargs.get("params")
+        body = kwargs.get("json") or kwargs.get("data")
+        sampled = self.log_policy.log_request(logger, method.upper(), url, params, body)
+        async with self._semaphore:
+            async with session.request(method, url, **kwargs) as resp:
+                content = await resp.read()
+                out = AsyncRestResponse(resp.status, dict(resp.headers), content, str(resp.url), resp.charset)
+        self.log_policy.log_response(logger, out, sampled, method.upper(), url, params, body, attach=False)
+        return out
+
+    async def request(self, api: RestApiDef, params=None, json=None, **kwargs) -> AsyncRestResponse:
+        """
+        按 api.method 自动发起 GET/POST/PUT/PATCH/DELETE，使用 api.uri 作为 path。
+        GET 常用 params，POST 常用 json，其余通过 **kwargs 传入。
+        """
+        kwargs.setdefault("params", params)
+        kwargs.setdefault("json", json)
+        return await self._request(api.method.upper(), api.uri, **kwargs)
+
+    async def request_json_success(
+        self,
+        api: RestApiDef,
+        expected_biz_code: int = 0,
+        params=None,
+        json=None,
+        **kwargs,
+    ) -> dict:
+        """
+        按 api.method 发起请求，并校验 HTTP 状态与 body 业务码符合 expected_biz_code，通过后返回响应 JSON。
+        与 RestClient.request_json_success 校验规则一致。
+        """
+        resp = await self.request(api, params=params, json=json, **kwargs)
+        expected_http = get_biz_http_status(expected_biz_code)
+        assert resp.status_code == expected_http, (
+            f"HTTP status expected {expected_http}, got {resp.status_code}"
+        )
+        data = resp.json()
+        actual = data.get("biz_code", data.get("code"))
+        assert actual == expected_biz_code, (
+            f"body code/biz_code expected {expected_biz_code}, got {actual}"
+        )
+        return data
+
+    async def close(self) -> None:
+        """关闭底层 session 与连接池。"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self) -> "AsyncRestClient":
+        self._get_session()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
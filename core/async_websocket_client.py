@@ -0,0 +1,231 @@
+"""
+异步 WebSocket 客户端封装：基于 aiohttp，与 WebSocketClient 保持相同的
+connect / send / recv / recv_until / recv_for_seconds / authenticate / subscribe / subscribe_signed / close 语义。
+单个事件循环即可同时驱动数十个连接、数百个订阅频道，无需为每个连接占用一个线程。
+多个连接可共享同一个 aiohttp.ClientSession（构造时传入 session），由调用方负责关闭该 session。
+收到服务端 public/heartbeat 时默认自动回复 public/respond-heartbeat，长时间订阅不会被服务端断开。
+注：多个协程并发时 allure step 栈无法正确嵌套，故异步客户端只打日志，不写 allure step / attach；
+逐条消息日志为 DEBUG 级别，避免大量频道时日志成为瓶颈。
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Callable, Union
+
+import aiohttp
+
+from config.settings import WS_API_KEY, WS_BASE_URL, WS_SECRET_KEY, WS_TIMEOUT
+from core.logger import get_logger
+from core.websocket_client import (
+    WS_AUTH_METHOD,
+    WS_RESPOND_HEARTBEAT_METHOD,
+    WebSocketClient,
+    stop_when_takes_messages,
+)
+from core.ws_signature import build_signed_request, build_signed_subscribe
+
+logger = get_logger("async_websocket_client")
+
+
+class AsyncWebSocketClient:
+    """异步 WebSocket 封装：connect / send / recv / close，支持 JSON、book 订阅与持续收包。"""
+
+    # 与同步客户端共用 heartbeat 判断与过滤
+    is_heartbeat = staticmethod(WebSocketClient.is_heartbeat)
+    filter_heartbeat = staticmethod(WebSocketClient.filter_heartbeat)
+
+    def __init__(
+        self,
+        url: str = None,
+        timeout: int = None,
+        session: aiohttp.ClientSession = None,
+        respond_heartbeat: bool = True,
+    ):
+        """
+        :param url: WebSocket 地址，默认 WS_BASE_URL
+        :param timeout: 建连及 recv 默认超时（秒），默认 WS_TIMEOUT
+        :param session: 可选共享的 aiohttp.ClientSession；None 时自建并在 close 时关闭
+        :param respond_heartbeat: 收到 public/heartbeat 时是否自动回复 public/respond-heartbeat
+        """
+        self.url = url or WS_BASE_URL
+        self.timeout = timeout or WS_TIMEOUT
+        self.respond_heartbeat = respond_heartbeat
+        self._session = session
+        self._own_session = session is None
+        self._ws = None
+        # 等待请求响应期间收到的其他帧（如已订阅频道的推送），后续 recv 优先取出，避免丢失
+        self._pending = deque()
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    async def connect(self) -> "AsyncWebSocketClient":
+        """建立连接（如已连接则跳过）。"""
+        if self.connected:
+            logger.info("WebSocket already connected, skip connect")
+            return self
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+            self._own_session = True
+        logger.info("WebSocket connecting to %s", self.url)
+        self._ws = await asyncio.wait_for(
+            self._session.ws_connect(self.url, timeout=aiohttp.ClientWSTimeout(ws_close=self.timeout)),
+            timeout=self.timeout,
+        )
+        logger.info("WebSocket connected")
+        return self
+
+    async def send(self, payload: str | bytes) -> None:
+        """发送原始消息。"""
+        logger.info("WebSocket send: %s", payload[:200] if len(str(payload)) > 200 else payload)
+        if isinstance(payload, bytes):
+            await self._ws.send_bytes(payload)
+        else:
+            await self._ws.send_str(payload)
+
+    async def send_json(self, obj: dict) -> None:
+        """发送 JSON 对象（自动序列化）。"""
+        await self.send(json.dumps(obj))
+
+    async def _recv_raw(self, timeout: float = None, use_pending: bool = True) -> str | bytes:
+        """接收一条数据帧（优先取暂存帧）；超时抛 asyncio.TimeoutError，连接关闭抛 ConnectionError。"""
+        if use_pending and self._pending:
+            return self._pending.popleft()
+        msg = await self._ws.receive(timeout=timeout)
+        if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+            return msg.data
+        raise ConnectionError(f"WebSocket closed: {msg.type.name} {msg.data or ''}".strip())
+
+    async def recv(self, timeout: float = None) -> str | bytes:
+        """接收一条消息，阻塞直到有数据或超时（默认 self.timeout）。"""
+        out = await self._recv_raw(timeout or self.timeout)
+        logger.info("WebSocket recv: %s", out[:200] if len(str(out)) > 200 else out)
+        return out
+
+    async def recv_json(self, timeout: float = None) -> dict:
+        """接收一条消息并解析为 JSON。"""
+        out = await self.recv(timeout)
+        text = out.decode("utf-8") if isinstance(out, bytes) else out
+        return json.loads(text)
+
+    async def _reply_heartbeat(self, msg: dict) -> None:
+        if self.respond_heartbeat:
+            await self._ws.send_str(json.dumps({"id": msg.get("id"), "method": WS_RESPOND_HEARTBEAT_METHOD}))
+
+    async def recv_until(
+        self,
+        stop_when: Union[Callable[[dict], bool], Callable[[dict, list], bool], None],
+        max_wait_sec: float,
+        recv_timeout: float = 1.0,
+        filter_heartbeat: bool = True,
+    ) -> list:
+        """
+        在 max_wait_sec 内持续接收消息，直到 stop_when 返回 True 或超时，语义同 WebSocketClient.recv_until。
+        :param stop_when: 终止条件，stop_when(msg) 或 stop_when(msg, messages)；None 表示仅按超时结束
+        :param max_wait_sec: 最大等待时间（秒）
+        :param recv_timeout: 单次 recv 超时上限（秒），实际不超过剩余时间
+        :param filter_heartbeat: 是否自动过滤 heartbeat 消息（默认 True）
+        :return: 收到的 JSON 消息列表（已过滤 heartbeat）
+        """
+        if not self.connected:
+            logger.warning("recv_until: 未连接，跳过")
+            return []
+
+        stop_when_takes_two_args = stop_when_takes_messages(stop_when)
+        messages = []
+        heartbeat_count = 0
+        deadline = time.monotonic() + max_wait_sec
+        logger.info(
+            "[%s] 持续收包最多 %.1fs（终止条件=%s，过滤heartbeat=%s）",
+            self.url, max_wait_sec, "有" if stop_when else "无（仅超时）", filter_heartbeat,
+        )
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                raw = await self._recv_raw(min(recv_timeout, remaining))
+            except asyncio.TimeoutError:
+                continue
+            text = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+            msg = json.loads(text)
+
+            if self.is_heartbeat(msg):
+                await self._reply_heartbeat(msg)
+                if filter_heartbeat:
+                    heartbeat_count += 1
+                    continue
+
+            messages.append(msg)
+            logger.debug("WebSocket 持续收包 [%d] 收到: %s", len(messages), text if len(text) <= 500 else text[:500] + "...")
+
+            if stop_when is not None:
+                should_stop = stop_when(msg, messages) if stop_when_takes_two_args else stop_when(msg)
+                if should_stop:
+                    logger.info("满足终止条件，结束收包")
+                    break
+        logger.info("持续收包结束，共收到 %d 条业务消息（已过滤 %d 条 heartbeat）", len(messages), heartbeat_count)
+        return messages
+
+    async def recv_for_seconds(self, duration_sec: float, recv_timeout: float = 1.0, filter_heartbeat: bool = True) -> list:
+        """在指定时长内持续接收消息，无提前终止条件。"""
+        return await self.recv_until(None, duration_sec, recv_timeout, filter_heartbeat)
+
+    async def _recv_response(self, request_id: int) -> dict:
+        """
+        等待 id 匹配的响应：期间的 heartbeat 自动回复，其他帧暂存供后续 recv / recv_until 读取。
+        超过 self.timeout 未收到抛 asyncio.TimeoutError（aiohttp receive(timeout=0) 表示不超时，不能传 0）。
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError(f"等待 id={request_id} 的响应超时（{self.timeout}s）")
+            raw = await self._recv_raw(remaining, use_pending=False)
+            msg = json.loads(raw.decode("utf-8") if isinstance(raw, bytes) else raw)
+            if self.is_heartbeat(msg):
+                await self._reply_heartbeat(msg)
+                continue
+            if msg.get("id") == request_id:
+                logger.info("WebSocket recv: %s", raw[:200] if len(raw) > 200 else raw)
+                return msg
+            self._pending.append(raw)
+
+    async def authenticate(self, api_key: str, secret_key: str, *, params: dict = None, request_id: int = 1) -> dict:
+        """执行 public/auth 鉴权（每个会话调用一次），返回服务端响应。"""
+        req = build_signed_request(WS_AUTH_METHOD, api_key, secret_key, params=params or {}, request_id=request_id)
+        logger.info("WebSocket auth: method=%s id=%s", WS_AUTH_METHOD, request_id)
+        await self.send_json(req)
+        return await self._recv_response(req["id"])
+
+    async def subscribe(self, params: dict, request_id: int = 1) -> dict:
+        """发送明文 subscribe 请求（无 auth/sig），返回 id 匹配的服务端响应。"""
+        await self.send_json({"id": request_id, "method": "subscribe", "params": params})
+        return await self._recv_response(request_id)
+
+    async def subscribe_signed(self, params: dict, request_id: int = 23) -> dict:
+        """发送带签名的 subscribe 请求（api_key、secret_key 取自 config.settings），返回服务端响应。"""
+        payload = build_signed_subscribe(params, WS_API_KEY, WS_SECRET_KEY, request_id=request_id)
+        await self.send_json(payload)
+        return await self._recv_response(request_id)
+
+    async def close(self) -> None:
+        """关闭连接；自建的 session 一并关闭。"""
+        if self._ws is not None:
+            logger.info("WebSocket closing")
+            try:
+                await self._ws.close()
+            except Exception as e:
+                logger.warning("WebSocket close error: %s", e)
+            self._ws = None
+        if self._own_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncWebSocketClient":
+        return await self.connect()
+
+    async def __aexit__(self, *args):
+        await self.close()
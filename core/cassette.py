@@ -0,0 +1,167 @@
+"""
+REST 录制/回放（cassette）：
+- record：真实请求的响应按 method + uri + 归一化 params（及 body）为键追加写入磁盘文件
+- replay：不发网络请求，按键从文件中取出响应返回，用于离线 / CI 高速运行
+文件格式为每行一条「<key>\t<loose_key>\t<json>」，只追加写；回放时扫描一遍行首 key 建立 key -> 文件偏移索引（不解析 JSON），
+查找为 O(1)，命中后才 seek 读取并解析该行。同一键录制多次时按录制顺序循环回放。
+loose_key 不含 ignore_params 中的参数值（默认 start_ts / end_ts 等随当前时间变化的参数）；开启 loose（REST_CASSETTE_LOOSE）时
+精确键未命中按其回退匹配，并打印 warning（回退命中的可能是其他时间窗口的录制，时间窗口相关断言不可信）。
+"""
+import base64
+import hashlib
+import json
+import os
+import threading
+from datetime import timedelta
+from typing import Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from config.settings import REST_CASSETTE_LOOSE
+from core.logger import get_logger
+from core.rest_cache import make_cache_key
+from core.rest_response import RestResponse
+
+logger = get_logger("cassette")
+
+CASSETTE_MODE_OFF = "off"
+CASSETTE_MODE_RECORD = "record"
+CASSETTE_MODE_REPLAY = "replay"
+
+# 回放时不还原的响应头：body 已按解压后的内容录制，长度/编码相关头不再适用
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+# 默认回退匹配时忽略取值的参数：用例中常以当前时间计算
+DEFAULT_IGNORE_PARAMS = ("start_ts", "end_ts")
+
+
+class CassetteMiss(KeyError):
+    """回放模式下未找到对应录制。"""
+
+
+def make_cassette_key(method: str, uri: str, params: Optional[dict] = None, body=None, ignore_params=()) -> str:
+    """
+    录制键：method + uri + 归一化 params（与响应缓存同规则）+ 规范化 body，取 sha1。
+    ignore_params 中的参数只保留参数名、不计参数值。
+    """
+    if params and ignore_params:
+        params = {k: ("*" if k in ignore_params and v is not None else v) for k, v in params.items()}
+    parts = list(make_cache_key(method, uri, params))
+    if body is not None:
+        parts.append(json.dumps(body, sort_keys=True, ensure_ascii=False, default=str))
+    raw = json.dumps(parts, ensure_ascii=False, default=list)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """录制 / 回放存储。线程安全；录制通过 O_APPEND 单次 write 追加，多进程同时录制同一文件也不会交错。"""
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = CASSETTE_MODE_REPLAY,
+        ignore_params=DEFAULT_IGNORE_PARAMS,
+        loose: bool = REST_CASSETTE_LOOSE,
+    ):
+        """
+        :param path: 录制文件路径
+        :param mode: "record" / "replay" / "off"
+        :param ignore_params: 回退匹配时忽略取值的参数名（录制与回放需一致）
+        :param loose: 回放时精确键未命中是否按回退键匹配，默认取 REST_CASSETTE_LOOSE（关闭）
+        """
+        self.path = path
+        self.mode = mode
+        self.ignore_params = frozenset(ignore_params)
+        self.loose = loose
+        self._lock = threading.Lock()
+        self._index = {}  # key / loose_key -> [offset, ...]
+        self._cursor = {}  # key -> 下次回放的序号
+        self._fd = None
+        self._reader = None
+        if mode == CASSETTE_MODE_REPLAY:
+            self._build_index()
+        elif mode == CASSETTE_MODE_RECORD:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == CASSETTE_MODE_REPLAY
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == CASSETTE_MODE_RECORD
+
+    def _build_index(self) -> None:
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"cassette 文件不存在，请先以 record 模式录制: {self.path}")
+        self._reader = open(self.path, "rb")
+        offset = 0
+        for line in self._reader:
+            keys = line.split(b"\t", 2)
+            if len(keys) == 3:
+                self._index.setdefault(keys[0].decode("ascii"), []).append(offset)
+                # 回退键带前缀，避免与精确键混用
+                self._index.setdefault("~" + keys[1].decode("ascii"), []).append(offset)
+            offset += len(line)
+        logger.info("cassette 回放索引已建立：%s，共 %d 个键", self.path, len(self._index))
+
+    def record(self, method: str, uri: str, params, body, resp: requests.Response) -> None:
+        """追加一条录制。"""
+        key = make_cassette_key(method, uri, params, body)
+        loose_key = make_cassette_key(method, uri, params, body, self.ignore_params)
+        content = resp.content or b""
+        try:
+            body_text, is_b64 = content.decode("utf-8"), False
+        except UnicodeDecodeError:
+            body_text, is_b64 = base64.b64encode(content).decode("ascii"), True
+        entry = {
+            "method": method.upper(),
+            "uri": uri,
+            "params": params,
+            "status": resp.status_code,
+            "headers": {k: v for k, v in resp.headers.items() if k.lower() not in _DROP_HEADERS},
+            "body": body_text,
+            "b64": is_b64,
+        }
+        line = f"{key}\t{loose_key}\t{json.dumps(entry, ensure_ascii=False, separators=(',', ':'), default=str)}\n"
+        os.write(self._fd, line.encode("utf-8"))
+
+    def replay(self, method: str, uri: str, params, body) -> RestResponse:
+        """按精确键（开启 loose 且未命中时按回退键）取出录制并构造响应；未录制抛 CassetteMiss。"""
+        key = make_cassette_key(method, uri, params, body)
+        if key not in self._index and self.loose:
+            loose_key = "~" + make_cassette_key(method, uri, params, body, self.ignore_params)
+            if loose_key in self._index:
+                logger.warning(
+                    "cassette 精确键 %s 未命中，按回退键 %s 回放（忽略 %s 取值）: %s %s params=%s",
+                    key, loose_key[1:], sorted(self.ignore_params), method.upper(), uri, params,
+                )
+                key = loose_key
+        with self._lock:
+            offsets = self._index.get(key)
+            if not offsets:
+                raise CassetteMiss(f"cassette 未录制该请求: {method.upper()} {uri} params={params} body={body}")
+            seq = self._cursor.get(key, 0)
+            self._cursor[key] = seq + 1
+            self._reader.seek(offsets[seq % len(offsets)])
+            line = self._reader.readline()
+        entry = json.loads(line.split(b"\t", 2)[2])
+        raw = requests.Response()
+        raw.status_code = entry["status"]
+        raw.headers = CaseInsensitiveDict(entry["headers"])
+        raw._content = base64.b64decode(entry["body"]) if entry["b64"] else entry["body"].encode("utf-8")
+        raw.encoding = "utf-8"
+        raw.url = uri
+        raw.elapsed = timedelta(0)
+        return RestResponse(raw)
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
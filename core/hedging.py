@@ -0,0 +1,97 @@
+"""
+对冲请求（hedged requests）策略：缓解偶发慢连接造成的尾延迟。
+主请求发出后，若超过「近期延迟的第 percentile 分位」仍未返回，则经另一条连接再发一份相同请求，
+取先返回的结果，另一份在后台完成后丢弃（不计入延迟直方图与录制）。仅用于幂等 GET。
+延迟样本按 key（RestApiDef.uri）分别维护滑动窗口，均自主请求发出时计（主请求自身耗时；对冲胜出时为主请求发出至对冲返回），
+不直接记录对冲请求自身的耗时，以免分位被拉低后对冲越发越多；统计 hedge 触发次数、hedge 胜出次数与丢弃份数。
+"""
+import math
+import threading
+from collections import deque
+
+from core.logger import get_logger
+
+logger = get_logger("hedging")
+
+
+class HedgePolicy:
+    """对冲策略：按 key 维护近期延迟窗口，给出对冲等待时间并记录触发/胜出统计。线程安全。"""
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        window: int = 200,
+        min_samples: int = 20,
+        initial_delay: float = 0.5,
+        min_delay: float = 0.01,
+        max_workers: int = 16,
+    ):
+        """
+        :param percentile: 触发对冲的延迟分位（0~100），如 95 表示超过近期 p95 仍未返回则对冲
+        :param window: 每个 key 保留的最近延迟样本数
+        :param min_samples: 样本不足该数量时使用 initial_delay
+        :param initial_delay: 样本不足时的对冲等待时间（秒）
+        :param min_delay: 对冲等待时间下限（秒），避免延迟极低时几乎每次都对冲
+        :param max_workers: 对冲执行线程池大小（主请求与对冲请求均在该线程池中执行）
+        """
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_workers = max_workers
+        self._samples = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _counter(self, key: str) -> dict:
+        counters = self._counters.get(key)
+        if counters is None:
+            counters = {"requests": 0, "hedged": 0, "hedge_wins": 0, "discarded": 0}
+            self._counters[key] = counters
+        return counters
+
+    def record(self, key: str, latency: float) -> None:
+        """记录一次已完成请求的延迟（秒，自主请求发出时计）。"""
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = deque(maxlen=self.window)
+                self._samples[key] = samples
+            samples.append(latency)
+
+    def delay(self, key: str) -> float:
+        """当前对冲等待时间（秒）：近期延迟的 percentile 分位，样本不足时取 initial_delay。"""
+        with self._lock:
+            self._counter(key)["requests"] += 1
+            samples = self._samples.get(key)
+            if not samples or len(samples) < self.min_samples:
+                return self.initial_delay
+            ordered = sorted(samples)
+        # nearest-rank 分位
+        idx = min(len(ordered) - 1, max(0, math.ceil(self.percentile / 100 * len(ordered)) - 1))
+        return max(self.min_delay, ordered[idx])
+
+    def on_hedge(self, key: str, won: bool) -> None:
+        """记录一次对冲：won 表示对冲请求先于主请求返回。"""
+        with self._lock:
+            counters = self._counter(key)
+            counters["hedged"] += 1
+            if won:
+                counters["hedge_wins"] += 1
+
+    def on_discard(self, key: str) -> None:
+        """记录一份被丢弃的请求（对冲中落后或失败的一份），不计入延迟样本。"""
+        with self._lock:
+            self._counter(key)["discarded"] += 1
+
+    def stats(self) -> dict:
+        """各 key 的请求数、对冲触发次数、对冲胜出次数、丢弃份数及触发率。"""
+        with self._lock:
+            return {
+                key: {
+                    **counters,
+                    "hedge_rate": round(counters["hedged"] / counters["requests"], 4) if counters["requests"] else 0.0,
+                }
+                for key, counters in self._counters.items()
+            }
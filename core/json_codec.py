@@ -0,0 +1,64 @@
+"""
+JSON 编解码后端：优先使用已安装的 orjson（直接解析 bytes，速度远快于标准库），未安装时回退标准库 json。
+可通过环境变量 JSON_BACKEND=auto / orjson / json 指定，或运行时调用 set_backend() 切换。
+"""
+import json
+
+from config.settings import JSON_BACKEND
+from core.logger import get_logger
+
+logger = get_logger("json_codec")
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+# 解码失败异常：orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，统一捕获此类即可
+JSONDecodeError = json.JSONDecodeError
+
+_backend = "json"
+
+
+def _orjson_loads(data):
+    return orjson.loads(data)
+
+
+def _orjson_dumps(obj) -> str:
+    return orjson.dumps(obj).decode("utf-8")
+
+
+def _json_loads(data):
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> str:
+    return json.dumps(obj)
+
+
+loads = _json_loads
+dumps = _json_dumps
+
+
+def set_backend(name: str = "auto") -> str:
+    """
+    切换 JSON 后端并返回实际生效的后端名。
+    :param name: "auto"（有 orjson 用 orjson）/ "orjson" / "json"；指定 orjson 但未安装时回退 json 并告警
+    """
+    global loads, dumps, _backend
+    name = (name or "auto").lower()
+    if name in ("auto", "orjson") and orjson is not None:
+        loads, dumps, _backend = _orjson_loads, _orjson_dumps, "orjson"
+    else:
+        if name == "orjson":
+            logger.warning("JSON_BACKEND=orjson 但未安装 orjson，回退标准库 json")
+        loads, dumps, _backend = _json_loads, _json_dumps, "json"
+    return _backend
+
+
+def get_backend() -> str:
+    """当前生效的 JSON 后端名。"""
+    return _backend
+
+
+set_backend(JSON_BACKEND)
@@ -0,0 +1,201 @@
+"""
+REST 压测：复用 RestApiDef 及其 get_param_cases(...) 数据作为负载场景，在固定时长内持续发压。
+- 闭环（target_rps=0）：concurrency 个线程各自循环请求，测最大吞吐
+- 开环（target_rps>0）：按固定间隔调度请求，最多 concurrency 个在途；延迟自「计划发出时刻」起算，
+  服务端变慢导致排队时延迟如实体现（避免 coordinated omission），便于版本间对比
+结果按 HTTP 状态码、body 业务码（code/biz_code）与异常类型计数，输出吞吐与延迟分位（对数直方图，见 core.metrics）。
+预热期（warmup_sec）内的请求不计入统计。
+"""
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from constants import RestApiDef
+from core.logger import get_logger
+from core.metrics import LogHistogram
+
+logger = get_logger("load_runner")
+
+
+def default_build_params(case: dict) -> Optional[dict]:
+    """param_cases 中的 case -> 请求 params：默认取 case["params"]。"""
+    return case.get("params")
+
+
+@dataclass
+class LoadReport:
+    """
+    压测结果：
+    - requests: 统计窗口内完成的请求数（不含预热）
+    - throughput_rps: requests / 统计窗口时长
+    - by_http_status / by_biz_code / errors: 按 HTTP 状态码、业务码、异常类型计数
+    - latency: 端到端延迟直方图（开环自计划发出时刻起算，闭环自实际发出起算）
+    - service_time: 实际发出到收到响应的耗时直方图
+    """
+
+    api: str
+    mode: str
+    concurrency: int
+    target_rps: float
+    duration_sec: float
+    warmup_sec: float
+    requests: int = 0
+    by_http_status: dict = field(default_factory=dict)
+    by_biz_code: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+    latency: LogHistogram = field(default_factory=LogHistogram)
+    service_time: LogHistogram = field(default_factory=LogHistogram)
+
+    @property
+    def throughput_rps(self) -> float:
+        window = self.duration_sec - self.warmup_sec
+        return self.requests / window if window > 0 else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "api": self.api,
+            "mode": self.mode,
+            "concurrency": self.concurrency,
+            "target_rps": self.target_rps,
+            "duration_sec": self.duration_sec,
+            "warmup_sec": self.warmup_sec,
+            "requests": self.requests,
+            "throughput_rps": round(self.throughput_rps, 2),
+            "by_http_status": dict(sorted(self.by_http_status.items())),
+            "by_biz_code": dict(sorted(self.by_biz_code.items())),
+            "errors": dict(sorted(self.errors.items())),
+            "latency": self.latency.summary(),
+            "service_time": self.service_time.summary(),
+        }
+
+    def dump(self, path: str) -> None:
+        """写入 JSON 文件，便于不同版本间对比。"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+
+
+class LoadRunner:
+    """以 RestApiDef + param_cases 为场景的压测执行器，请求经 RestClient 发出（各线程独立 Session）。"""
+
+    def __init__(
+        self,
+        client,
+        api: RestApiDef,
+        param_cases: list[dict[str, Any]],
+        build_params: Callable[[dict], Optional[dict]] = default_build_params,
+    ):
+        """
+        :param client: RestClient；建议使用 RestLogPolicy(mode="throughput")，避免全量日志成为瓶颈
+        :param api: 接口定义
+        :param param_cases: 场景数据，通常为 api.get_param_cases("维度名")，按顺序循环使用
+        :param build_params: case -> 请求 params 的转换函数
+        """
+        if not param_cases:
+            raise ValueError("param_cases 不能为空")
+        self.client = client
+        self.api = api
+        self.params_list = [build_params(case) for case in param_cases]
+        self._lock = threading.Lock()
+        self._report = None
+        self._measure_from = 0.0
+
+    def _next_params(self, seq: int) -> Optional[dict]:
+        return self.params_list[seq % len(self.params_list)]
+
+    def _call(self, params: Optional[dict], scheduled: float) -> None:
+        """发出一次请求并记录结果；scheduled 为计划发出时刻（perf_counter），早于统计起点的不计入。"""
+        start = time.perf_counter()
+        status = biz_code = error = None
+        try:
+            resp = self.client.request(self.api, params=params, session=self.client.thread_session())
+            status = resp.status_code
+            try:
+                data = resp.json()
+                biz_code = data.get("biz_code", data.get("code")) if isinstance(data, dict) else None
+            except ValueError:
+                biz_code = "non_json"
+        except Exception as e:
+            error = type(e).__name__
+        end = time.perf_counter()
+        if scheduled < self._measure_from:
+            return
+        report = self._report
+        with self._lock:
+            report.requests += 1
+            if error is not None:
+                report.errors[error] = report.errors.get(error, 0) + 1
+            else:
+                report.by_http_status[str(status)] = report.by_http_status.get(str(status), 0) + 1
+                report.by_biz_code[str(biz_code)] = report.by_biz_code.get(str(biz_code), 0) + 1
+            report.latency.record(end - scheduled)
+            report.service_time.record(end - start)
+
+    def run(
+        self,
+        duration_sec: float,
+        target_rps: float = 0,
+        concurrency: int = 8,
+        warmup_sec: float = 0.0,
+    ) -> LoadReport:
+        """
+        执行压测。
+        :param duration_sec: 总时长（秒，含预热）
+        :param target_rps: 目标请求速率（次/秒），0 表示闭环按 concurrency 满负荷发压
+        :param concurrency: 闭环为线程数；开环为最大在途请求数（超出则排队，排队时间计入延迟）
+        :param warmup_sec: 预热时长（秒），期间请求不计入统计
+        """
+        mode = "open_loop" if target_rps > 0 else "closed_loop"
+        self._report = LoadReport(
+            api=self.api.uri,
+            mode=mode,
+            concurrency=concurrency,
+            target_rps=target_rps,
+            duration_sec=duration_sec,
+            warmup_sec=warmup_sec,
+        )
+        logger.info(
+            "[压测] %s %s 开始：时长 %.1fs（预热 %.1fs），concurrency=%d，target_rps=%s",
+            self.api.uri, mode, duration_sec, warmup_sec, concurrency, target_rps or "-",
+        )
+        start = time.perf_counter()
+        self._measure_from = start + warmup_sec
+        end = start + duration_sec
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="rest_load") as executor:
+            if target_rps > 0:
+                self._run_open_loop(executor, start, end, target_rps)
+            else:
+                self._run_closed_loop(executor, end, concurrency)
+        # 统计窗口按实际结束时刻（含最后一批在途请求）计算
+        self._report.duration_sec = round(time.perf_counter() - start, 3)
+        logger.info("[压测] %s 结束：%s", self.api.uri, json.dumps(self._report.summary(), ensure_ascii=False))
+        return self._report
+
+    def _run_open_loop(self, executor: ThreadPoolExecutor, start: float, end: float, target_rps: float) -> None:
+        interval = 1.0 / target_rps
+        for seq in itertools.count():
+            scheduled = start + seq * interval
+            if scheduled >= end:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(self._call, self._next_params(seq), scheduled)
+
+    def _run_closed_loop(self, executor: ThreadPoolExecutor, end: float, concurrency: int) -> None:
+        counter = itertools.count()
+
+        def _worker():
+            while True:
+                scheduled = time.perf_counter()
+                if scheduled >= end:
+                    return
+                self._call(self._next_params(next(counter)), scheduled)
+
+        for _ in range(concurrency):
+            executor.submit(_worker)
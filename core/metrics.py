@@ -0,0 +1,252 @@
+"""
+REST 延迟指标：按 RestApiDef.uri + 状态类（2xx/4xx/5xx/error）记录对数分桶直方图，
+分别统计 connect（建连 + TLS，复用连接时为 0）、ttfb（连接就绪到收到响应头）、total（含读取 body）。
+同时按 uri 累计传输字节：wire（线上实际收到的 body 字节，压缩时为压缩后大小）与 decoded（解压后字节），及各 Content-Encoding 次数。
+直方图可序列化并跨进程合并（xdist 各 worker 落盘后由主进程合并），输出 p50/p90/p99/max、count、错误率、压缩比汇总。
+"""
+import json
+import math
+import os
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# 对数分桶：相邻桶边界比 2^(1/8)，相对误差约 9%；最小分辨率 1 微秒
+_BUCKET_GROWTH = 2 ** (1 / 8)
+_LOG_GROWTH = math.log(_BUCKET_GROWTH)
+
+# 直方图汇总输出的分位
+SUMMARY_PERCENTILES = (50, 90, 99)
+
+# 延迟阶段
+PHASES = ("connect", "ttfb", "total")
+
+# 当前线程最近一次请求的建连耗时（秒），由 TimedHTTPAdapter 的连接类写入
+_connect_timing = threading.local()
+
+
+class LogHistogram:
+    """对数分桶直方图（单位：秒，内部按微秒分桶）。非线程安全，由 LatencyRecorder 加锁保护。"""
+
+    __slots__ = ("buckets", "count", "max")
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        us = value * 1e6
+        idx = int(math.log(us) / _LOG_GROWTH) if us > 1 else 0
+        self.buckets[idx] = self.buckets.get(idx, 0) + 1
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LogHistogram") -> None:
+        for idx, n in other.buckets.items():
+            self.buckets[idx] = self.buckets.get(idx, 0) + n
+        self.count += other.count
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> float:
+        """第 p 分位（秒），取所在桶上界且不超过 max；无样本返回 0。"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen >= rank:
+                return min(self.max, _BUCKET_GROWTH ** (idx + 1) / 1e6)
+        return self.max
+
+    def summary(self) -> dict:
+        out = {f"p{p}_ms": round(self.percentile(p) * 1000, 3) for p in SUMMARY_PERCENTILES}
+        out["max_ms"] = round(self.max * 1000, 3)
+        out["count"] = self.count
+        return out
+
+    def to_dict(self) -> dict:
+        return {"buckets": {str(k): v for k, v in self.buckets.items()}, "count": self.count, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LogHistogram":
+        hist = cls()
+        hist.buckets = {int(k): v for k, v in data["buckets"].items()}
+        hist.count = data["count"]
+        hist.max = data["max"]
+        return hist
+
+
+def wire_bytes(resp) -> int:
+    """
+    requests.Response 线上收到的 body 字节数（不含响应头）：urllib3 HTTPResponse.tell() 为从 socket 读取的原始字节，
+    压缩传输时即压缩后大小；无底层 raw（如回放构造的响应）时按解码后长度计。
+    """
+    tell = getattr(getattr(resp, "raw", None), "tell", None)
+    return tell() if tell is not None else len(resp.content or b"")
+
+
+def status_class(status_code: int = None) -> str:
+    """HTTP 状态码 -> 状态类，如 200 -> "2xx"；请求异常（无状态码）为 "error"。"""
+    return f"{status_code // 100}xx" if status_code else "error"
+
+
+class LatencyRecorder:
+    """按 (uri, 状态类) 维护 connect/ttfb/total 三个直方图，按 uri 累计传输字节。线程安全，可合并、落盘与汇总。"""
+
+    def __init__(self):
+        self._hists = {}  # (uri, status_class) -> {phase: LogHistogram}
+        self._transfer = {}  # uri -> {"requests", "wire_bytes", "decoded_bytes", "by_encoding"}
+        self._lock = threading.Lock()
+
+    def record(self, uri: str, status_code: int = None, connect: float = 0.0, ttfb: float = 0.0, total: float = 0.0):
+        """记录一次请求的各阶段耗时（秒）；status_code 为 None 表示请求异常。"""
+        key = (uri.strip("/"), status_class(status_code))
+        with self._lock:
+            hists = self._hists.get(key)
+            if hists is None:
+                hists = {phase: LogHistogram() for phase in PHASES}
+                self._hists[key] = hists
+            hists["connect"].record(connect)
+            hists["ttfb"].record(ttfb)
+            hists["total"].record(total)
+
+    def record_transfer(self, uri: str, wire: int, decoded: int, encoding: str = None) -> None:
+        """记录一次响应的 body 传输字节：wire 为线上字节，decoded 为解压后字节，encoding 为 Content-Encoding。"""
+        encoding = (encoding or "identity").lower()
+        with self._lock:
+            self._add_transfer(uri.strip("/"), 1, wire, decoded, {encoding: 1})
+
+    def _add_transfer(self, uri: str, requests: int, wire: int, decoded: int, by_encoding: dict) -> None:
+        stats = self._transfer.get(uri)
+        if stats is None:
+            stats = {"requests": 0, "wire_bytes": 0, "decoded_bytes": 0, "by_encoding": {}}
+            self._transfer[uri] = stats
+        stats["requests"] += requests
+        stats["wire_bytes"] += wire
+        stats["decoded_bytes"] += decoded
+        for encoding, n in by_encoding.items():
+            stats["by_encoding"][encoding] = stats["by_encoding"].get(encoding, 0) + n
+
+    def merge(self, other: "LatencyRecorder") -> None:
+        data = other.to_dict()
+        with self._lock:
+            for key, hists in data["latency"].items():
+                uri, klass = key.rsplit("|", 1)
+                mine = self._hists.setdefault((uri, klass), {phase: LogHistogram() for phase in PHASES})
+                for phase, hist in hists.items():
+                    mine[phase].merge(LogHistogram.from_dict(hist))
+            for uri, stats in data["transfer"].items():
+                self._add_transfer(uri, stats["requests"], stats["wire_bytes"], stats["decoded_bytes"], stats["by_encoding"])
+
+    def summary(self) -> dict:
+        """
+        汇总：{uri: {"count", "error_rate", "by_status": {状态类: {"connect"/"ttfb"/"total": {p50_ms, p90_ms, p99_ms, max_ms, count}}},
+                    "transfer": {"requests", "wire_bytes", "decoded_bytes", "compression_ratio", "by_encoding"}}}
+        error_rate 为非 2xx（含异常）请求占比；compression_ratio 为 decoded_bytes / wire_bytes。
+        """
+        out = {}
+        with self._lock:
+            for (uri, klass), hists in sorted(self._hists.items()):
+                entry = out.setdefault(uri, {"count": 0, "error_rate": 0.0, "by_status": {}, "_errors": 0})
+                n = hists["total"].count
+                entry["count"] += n
+                if klass != "2xx":
+                    entry["_errors"] += n
+                entry["by_status"][klass] = {phase: hists[phase].summary() for phase in PHASES}
+            for uri, stats in sorted(self._transfer.items()):
+                entry = out.setdefault(uri, {"count": 0, "error_rate": 0.0, "by_status": {}, "_errors": 0})
+                entry["transfer"] = {
+                    **stats,
+                    "by_encoding": dict(stats["by_encoding"]),
+                    "compression_ratio": round(stats["decoded_bytes"] / stats["wire_bytes"], 3) if stats["wire_bytes"] else 0.0,
+                }
+        for entry in out.values():
+            errors = entry.pop("_errors")
+            entry["error_rate"] = round(errors / entry["count"], 4) if entry["count"] else 0.0
+        return out
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "latency": {
+                    f"{uri}|{klass}": {phase: hist.to_dict() for phase, hist in hists.items()}
+                    for (uri, klass), hists in self._hists.items()
+                },
+                "transfer": {uri: {**stats, "by_encoding": dict(stats["by_encoding"])} for uri, stats in self._transfer.items()},
+            }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyRecorder":
+        recorder = cls()
+        for key, hists in data["latency"].items():
+            uri, klass = key.rsplit("|", 1)
+            recorder._hists[(uri, klass)] = {phase: LogHistogram.from_dict(h) for phase, h in hists.items()}
+        for uri, stats in data["transfer"].items():
+            recorder._add_transfer(uri, stats["requests"], stats["wire_bytes"], stats["decoded_bytes"], stats["by_encoding"])
+        return recorder
+
+    def dump(self, path: str) -> None:
+        """将原始直方图写入 JSON 文件（供跨进程合并）。"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "LatencyRecorder":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+# 进程级默认 recorder：RestClient 未指定时记录到此处，session 结束时由 conftest 落盘 / 合并 / 汇总
+default_recorder = LatencyRecorder()
+
+
+# ========== 建连耗时采集 ==========
+
+def reset_connect_timing() -> None:
+    """请求前清零当前线程的建连耗时。"""
+    _connect_timing.value = 0.0
+
+
+def get_connect_timing() -> float:
+    """当前线程最近一次请求的建连耗时（秒），复用连接时为 0。"""
+    return getattr(_connect_timing, "value", 0.0)
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _connect_timing.value = time.perf_counter() - start
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _connect_timing.value = time.perf_counter() - start
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """记录建连（含 TLS 握手）耗时的 HTTPAdapter，挂载到 requests.Session 上使用。"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
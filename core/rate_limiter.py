@@ -0,0 +1,163 @@
+"""
+客户端自适应限流：每个 RestApiDef（按 uri）一个令牌桶，线程安全，可在多个 RestClient / 线程间共享。
+采用 AIMD 调速：
+- 收到 TOO_MANY_REQUESTS（biz_code 42901 / HTTP 429）时速率乘以 decrease_factor（同一冷却期内只降一次）
+- 每次成功响应按 increase_step 线性回升（约每秒提升 increase_step 次/秒），不超过 max_rate
+从而稳定在交易所可承受的最高请求速率，而不必在用例中写死 sleep。
+注：限流器只在进程内共享，xdist 各 worker 各自限流，总速率约为 worker 数 x 单进程速率。
+"""
+import threading
+import time
+
+from constants import BizCode, get_biz_http_status
+from core.logger import get_logger
+
+logger = get_logger("rate_limiter")
+
+# 被限流时对应的 HTTP 状态码（429）
+THROTTLED_HTTP_STATUS = get_biz_http_status(BizCode.TOO_MANY_REQUESTS)
+
+
+def is_throttled(resp) -> bool:
+    """判断响应是否被限流：HTTP 429，或错误响应 body 中 code/biz_code 为 42901。成功响应不解析 body。"""
+    if resp.status_code == THROTTLED_HTTP_STATUS:
+        return True
+    if resp.status_code < 400:
+        return False
+    try:
+        data = resp.json()
+    except ValueError:
+        return False
+    return isinstance(data, dict) and data.get("biz_code", data.get("code")) == BizCode.TOO_MANY_REQUESTS
+
+
+class TokenBucket:
+    """令牌桶：rate 为每秒补充的令牌数，capacity 为最大突发量（未指定时随速率调整，等于 max(1, rate)）。"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self._fixed_capacity = capacity is not None
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """取一个令牌，不足时阻塞等待，返回等待时长（秒）。"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def set_rate(self, rate: float) -> None:
+        """调整补充速率（先按旧速率结算已累积的令牌）；容量未固定时同步调整为 max(1, rate)。"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            if not self._fixed_capacity:
+                self.capacity = max(1.0, rate)
+                self._tokens = min(self._tokens, self.capacity)
+
+
+class AdaptiveRateLimiter:
+    """
+    按 key（RestApiDef.uri）分桶的自适应限流器。
+    RestClient 在每次实际发出 HTTP 前调用 acquire(key)，收到响应后调用 feedback(key, throttled)。
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 10.0,
+        min_rate: float = 1.0,
+        max_rate: float = 100.0,
+        burst: float = None,
+        decrease_factor: float = 0.5,
+        increase_step: float = 1.0,
+        cooldown_sec: float = 1.0,
+        max_retries: int = 2,
+    ):
+        """
+        :param initial_rate: 每个桶的初始速率（次/秒）
+        :param min_rate / max_rate: 速率下限 / 上限
+        :param burst: 桶容量（最大突发请求数），默认等于当前速率
+        :param decrease_factor: 被限流时速率乘数
+        :param increase_step: 成功时的线性回升幅度（约每秒提升的次/秒）
+        :param cooldown_sec: 两次降速的最小间隔，避免同一批在途请求的多个 429 连续降速
+        :param max_retries: 被限流后由 RestClient 重试的最大次数，0 表示不重试
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.cooldown_sec = cooldown_sec
+        self.max_retries = max_retries
+        self._buckets = {}
+        self._last_decrease = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, key: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.initial_rate, self.burst)
+                self._buckets[key] = bucket
+                self._counters[key] = {"requests": 0, "throttled": 0, "wait_sec": 0.0}
+            return bucket
+
+    def acquire(self, key: str) -> float:
+        """为 key 取一个令牌（阻塞），返回等待时长（秒）。"""
+        waited = self._bucket(key).acquire()
+        with self._lock:
+            counters = self._counters[key]
+            counters["requests"] += 1
+            counters["wait_sec"] += waited
+        return waited
+
+    def feedback(self, key: str, throttled: bool) -> None:
+        """
+        根据响应调整 key 的速率：被限流乘性降速，成功线性回升。
+        读取旧速率与写回新速率在同一把锁内完成，并发反馈不会丢失回升或覆盖降速。
+        """
+        bucket = self._bucket(key)
+        now = time.monotonic()
+        with self._lock:
+            rate = bucket.rate
+            if throttled:
+                self._counters[key]["throttled"] += 1
+                if now - self._last_decrease.get(key, 0.0) < self.cooldown_sec:
+                    return
+                self._last_decrease[key] = now
+                new_rate = max(self.min_rate, rate * self.decrease_factor)
+            else:
+                new_rate = min(self.max_rate, rate + self.increase_step / rate)
+            if new_rate != rate:
+                bucket.set_rate(new_rate)
+        if new_rate != rate:
+            if throttled:
+                logger.warning("[限流] %s 触发 TOO_MANY_REQUESTS，速率 %.2f -> %.2f 次/秒", key, rate, new_rate)
+
+    def rate(self, key: str) -> float:
+        """key 当前速率（次/秒）。"""
+        return self._bucket(key).rate
+
+    def stats(self) -> dict:
+        """各 key 的当前速率、请求数、被限流次数与累计等待时长。"""
+        with self._lock:
+            return {
+                key: {"rate": round(self._buckets[key].rate, 3), **counters}
+                for key, counters in self._counters.items()
+            }
@@ -0,0 +1,128 @@
+"""
+REST 响应缓存：用于幂等的 public GET 接口，按 uri + 归一化 params 做键。
+- TTL 过期 + LRU 淘汰（超过 max_entries 时淘汰最久未使用的条目）
+- 并发相同请求合并（coalescing）：同一键在途时，后来者等待首个请求的结果，只发一次 HTTP
+- hits / misses / coalesced 等计数，便于评估对交易所减少了多少请求
+- 每个调用方拿到的都是缓存值的副本（copier，默认调用值的 clone()），原地修改响应 JSON 不会影响缓存及其他用例
+注：缓存仅在进程内生效，xdist 各 worker 各自持有一份。
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from core.logger import get_logger
+
+logger = get_logger("rest_cache")
+
+# 默认缓存有效期（秒）与最大条目数
+DEFAULT_CACHE_TTL = 5.0
+DEFAULT_CACHE_MAX_ENTRIES = 1024
+
+
+def _clone(value: Any) -> Any:
+    """默认副本方法：值提供 clone()（如 RestResponse）时调用，否则原样返回。"""
+    clone = getattr(value, "clone", None)
+    return clone() if clone is not None else value
+
+
+def make_cache_key(method: str, uri: str, params: Optional[dict]) -> tuple:
+    """
+    生成缓存键：method + uri + 归一化 params。
+    归一化规则：忽略值为 None 的参数，按 key 排序，值统一转 str（与 query string 语义一致）。
+    """
+    items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None))
+    return method.upper(), uri.strip("/"), items
+
+
+class ResponseCache:
+    """线程安全的 TTL + LRU 响应缓存，支持在途请求合并。"""
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_CACHE_TTL,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        cacheable: Callable[[Any], bool] = None,
+        copier: Callable[[Any], Any] = None,
+    ):
+        """
+        :param ttl: 条目有效期（秒）
+        :param max_entries: 最大条目数，超出按 LRU 淘汰
+        :param cacheable: 判断结果是否可写入缓存，默认仅缓存 HTTP 2xx 响应
+        :param copier: 返回给调用方前生成副本（命中、合并等待及首个请求均返回副本），默认调用值的 clone()
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cacheable = cacheable or (lambda resp: 200 <= getattr(resp, "status_code", 0) < 300)
+        self.copier = copier or _clone
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}  # key -> Future
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_load(self, key: tuple, loader: Callable[[], Any]) -> Any:
+        """
+        命中未过期缓存直接返回；同键已有在途请求则等待其结果；否则调用 loader 发起请求并按规则写入缓存。
+        返回值均为 copier 生成的副本，缓存中的原值不交给调用方。loader 抛出的异常会同样抛给所有合并等待的调用方。
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self.copier(value)
+                del self._entries[key]
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            logger.debug("[缓存] 合并在途请求 %s", key)
+            return self.copier(future.result())
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+            if self.cacheable(value):
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        future.set_result(value)
+        return self.copier(value)
+
+    def clear(self) -> None:
+        """清空缓存条目（不重置计数）。"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """返回命中统计：hits / misses / coalesced / evictions / size / saved（少发的 HTTP 请求数）。"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "saved": self.hits + self.coalesced,
+            }
@@ -1,29 +1,163 @@
 """
 REST API 客户端封装：GET/POST/PUT/DELETE/PATCH，统一日志与异常处理。
 支持基于 biz status 映射的响应校验；支持按 RestApiDef 自动区分 method 的 request/request_json_success。
+支持 request_many 线程池批量并发请求（每线程独立 Session），结果按入参顺序返回并附单次耗时。
+支持可选的 GET 响应缓存（ResponseCache：TTL/LRU + 在途请求合并），默认关闭。
+日志与 Allure 附件按 RestLogPolicy 输出：debug 全量（默认），throughput 采样/截断/仅失败附加。
+支持可选的自适应限流（AdaptiveRateLimiter：按 uri 分桶，遇 42901/429 降速、成功回升），默认关闭。
+支持可选的对冲请求（HedgePolicy：GET 超过近期延迟分位未返回时经另一连接重发，取先到结果），默认关闭。
+每次实际发出的请求按 uri + 状态类记录 connect / ttfb / total 延迟直方图，并按 uri 累计线上/解压后 body 字节（core.metrics）。
+显式协商响应压缩（Accept-Encoding 见 REST_ACCEPT_ENCODING），由 urllib3 边读边解压，body 只在 content 中保留一份。
+响应统一包装为 RestResponse：body 只解码、解析一次并缓存（已安装 orjson 时用 orjson 直接解析 bytes）。
+支持可选的录制/回放（Cassette）：record 将实际响应追加写入磁盘，replay 直接从录制文件返回响应、不发网络请求。
 """
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Optional
+
 import allure
 import requests
+from urllib3.util.request import ACCEPT_ENCODING
 
-from config.settings import REST_BASE_URL, REST_TIMEOUT
+from config.settings import REST_ACCEPT_ENCODING, REST_BASE_URL, REST_TIMEOUT
 from constants import RestApiDef, get_biz_http_status
+from core.cassette import Cassette
+from core.hedging import HedgePolicy
 from core.logger import get_logger
+from core.metrics import (
+    LatencyRecorder,
+    TimedHTTPAdapter,
+    default_recorder,
+    get_connect_timing,
+    reset_connect_timing,
+    wire_bytes,
+)
+from core.rate_limiter import AdaptiveRateLimiter, is_throttled
+from core.rest_cache import ResponseCache, make_cache_key
+from core.rest_logging import RestLogPolicy
+from core.rest_response import RestResponse
 
 logger = get_logger("rest_client")
 
 
-# 默认请求头：统一为 JSON 接口
-DEFAULT_HEADERS = {"Content-Type": "application/json"}
+# 默认请求头：统一为 JSON 接口；Accept-Encoding 默认取 urllib3 按已安装解码库支持的编码（gzip,deflate[,br][,zstd]）
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept-Encoding": ACCEPT_ENCODING if REST_ACCEPT_ENCODING == "auto" else REST_ACCEPT_ENCODING,
+}
+
+# request_many 默认线程数
+DEFAULT_MAX_WORKERS = 8
+
+
+@dataclass
+class BatchResult:
+    """
+    request_many 单次调用结果：
+    - params: 本次请求的入参
+    - response: 响应对象，请求异常时为 None
+    - elapsed: 本次调用耗时（秒，含网络往返与读取 body）
+    - error: 请求异常，成功时为 None
+    """
+
+    params: Optional[dict[str, Any]]
+    response: Optional[RestResponse]
+    elapsed: float
+    error: Optional[BaseException] = None
+
+
+@dataclass
+class _Attempt:
+    """单次实际发出的 HTTP：原始响应或异常及分阶段耗时（秒），尚未计入延迟直方图、未录制。"""
+
+    raw: Optional[requests.Response]
+    error: Optional[BaseException]
+    connect: float
+    ttfb: float
+    total: float
 
 
 class RestClient:
     """REST 请求封装，支持 session、统一 base_url 与超时。默认 Content-Type: application/json。"""
 
-    def __init__(self, base_url: str = None, timeout: int = None):
+    def __init__(
+        self,
+        base_url: str = None,
+        timeout: int = None,
+        cache: ResponseCache = None,
+        log_policy: RestLogPolicy = None,
+        rate_limiter: AdaptiveRateLimiter = None,
+        hedge_policy: HedgePolicy = None,
+        latency_recorder: LatencyRecorder = None,
+        cassette: Cassette = None,
+    ):
+        """
+        :param base_url: 接口根地址，默认 REST_BASE_URL
+        :param timeout: 请求超时（秒），默认 REST_TIMEOUT
+        :param cache: 可选响应缓存，仅对 method="get" 且无 body 的 RestApiDef 请求生效；None 表示不缓存
+        :param log_policy: 日志策略，默认按 REST_LOG_MODE 等配置
+        :param rate_limiter: 可选自适应限流器（可多个客户端共享）；None 表示不限流
+        :param hedge_policy: 可选对冲策略，仅对 GET 生效；None 表示不对冲
+        :param latency_recorder: 延迟直方图记录器，默认进程级 default_recorder
+        :param cassette: 可选录制/回放存储；record 模式录制实际响应，replay 模式不发网络请求；None 表示不启用
+        """
         self.base_url = (base_url or REST_BASE_URL).rstrip("/")
         self.timeout = timeout or REST_TIMEOUT
-        self.session = requests.Session()
-        self.session.headers.update(DEFAULT_HEADERS)
+        self.cache = cache
+        self.log_policy = log_policy or RestLogPolicy.from_settings()
+        self.rate_limiter = rate_limiter
+        self.hedge_policy = hedge_policy
+        self.latency_recorder = latency_recorder or default_recorder
+        self.cassette = cassette
+        self._hedge_executor = None
+        self.session = self._new_session()
+        # request_many 工作线程各自持有的 Session（requests.Session 非线程安全）
+        self._thread_local = threading.local()
+        self._thread_sessions = []
+        self._thread_sessions_lock = threading.Lock()
+        # 批量请求线程池跨调用复用，线程不销毁则其 Session 与连接持续复用；单次调用的并发数由信号量限制
+        self._executor = None
+        self._executor_workers = 0
+        self._executor_lock = threading.Lock()
+
+    @staticmethod
+    def _new_session() -> requests.Session:
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        # 采集建连耗时，用于延迟直方图的 connect 阶段
+        adapter = TimedHTTPAdapter()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def thread_session(self) -> requests.Session:
+        """
+        返回当前线程专属的 Session（首次调用时创建，close 时统一关闭）。
+        requests.Session 非线程安全，多线程共用同一 RestClient 时应通过 request(..., session=client.thread_session()) 发请求。
+        """
+        session = getattr(self._thread_local, "session", None)
+        if session is None:
+            session = self._new_session()
+            self._thread_local.session = session
+            with self._thread_sessions_lock:
+                self._thread_sessions.append(session)
+        return session
+
+    def _submit_batch(self, fn, max_workers: int) -> Future:
+        """
+        向共享批量线程池提交任务（线程安全）。线程数不足 max_workers 时换用更大的线程池：
+        旧池不再接收新任务，已提交的任务照常完成；获取线程池与提交在同一把锁内，并发调用方不会提交到已关闭的池。
+        """
+        with self._executor_lock:
+            if self._executor is None or self._executor_workers < max_workers:
+                old = self._executor
+                self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rest_batch")
+                self._executor_workers = max_workers
+                if old is not None:
+                    old.shutdown(wait=False)
+            return self._executor.submit(fn)
 
     def _url(self, path: str) -> str:
         path = path if path.startswith("http") else f"{self.base_url}/{path.lstrip('/')}"
@@ -33,37 +167,228 @@ class RestClient:
         self,
         method: str,
         path: str,
+        session: requests.Session = None,
         **kwargs,
-    ) -> requests.Response:
+    ) -> RestResponse:
         url = self._url(path)
+        session = session or self.session
         kwargs.setdefault("timeout", self.timeout)
-        # 入参、响应各打一行log，不截断，便于定位
+        # 入参、响应按日志策略记录：debug 模式各打一行 log 不截断，throughput 模式采样 + 截断
         params = kwargs.get("params")
         body = kwargs.get("json") or kwargs.get("data")
-        logger.info("[请求入参] %s %s | params=%s | body=%s", method.upper(), url, params, body)
+        sampled = self.log_policy.log_request(logger, method.upper(), url, params, body)
         with allure.step(f"REST {method.upper()} {url}"):
-            resp = self.session.request(method, url, **kwargs)
-            resp_body = resp.text if resp.text else "(empty)"
-            logger.info("[响应信息] status=%s | body=%s", resp.status_code, resp_body)
-            allure.attach(
-                resp_body,
-                name="Response Body",
-                attachment_type=allure.attachment_type.TEXT,
-            )
+            attempt = self._attempt(session, method, url, kwargs)
+            return self._accept(attempt, method, path, url, params, body, sampled)
+
+    @staticmethod
+    def _attempt(session: requests.Session, method: str, url: str, kwargs: dict) -> _Attempt:
+        """发出一次 HTTP 并计时，异常不抛出而记录在结果中；不计入延迟直方图、不录制（由 _accept 处理）。"""
+        reset_connect_timing()
+        start = time.perf_counter()
+        try:
+            raw = session.request(method, url, **kwargs)
+        except Exception as e:
+            return _Attempt(None, e, get_connect_timing(), 0.0, time.perf_counter() - start)
+        # resp.elapsed 为发出请求到解析完响应头的耗时（含建连），扣除建连即 ttfb
+        connect = get_connect_timing()
+        ttfb = max(0.0, raw.elapsed.total_seconds() - connect)
+        return _Attempt(raw, None, connect, ttfb, time.perf_counter() - start)
+
+    def _accept(self, attempt: _Attempt, method: str, path: str, url: str, params, body, sampled: bool) -> RestResponse:
+        """采用一次 HTTP 结果：计入延迟直方图与传输字节、录制、输出响应日志；请求异常时记录后抛出。"""
+        raw = attempt.raw
+        if raw is None:
+            self.latency_recorder.record(path, None, attempt.connect, total=attempt.total)
+            raise attempt.error
+        self.latency_recorder.record(
+            path, raw.status_code, connect=attempt.connect, ttfb=attempt.ttfb, total=attempt.total
+        )
+        self.latency_recorder.record_transfer(path, wire_bytes(raw), len(raw.content), raw.headers.get("Content-Encoding"))
+        if self.cassette is not None and self.cassette.recording:
+            self.cassette.record(method, path, params, body, raw)
+        resp = RestResponse(raw)
+        self.log_policy.log_response(logger, resp, sampled, method.upper(), url, params, body)
+        return resp
+
+    def _replay(self, method: str, path: str, **kwargs) -> RestResponse:
+        """回放模式：从 cassette 取出录制的响应，日志与 Allure 步骤同实际请求，不计入延迟直方图。"""
+        url = self._url(path)
+        params = kwargs.get("params")
+        body = kwargs.get("json") or kwargs.get("data")
+        sampled = self.log_policy.log_request(logger, method, url, params, body)
+        with allure.step(f"REST {method} {url} (replay)"):
+            resp = self.cassette.replay(method, path, params, body)
+            self.log_policy.log_response(logger, resp, sampled, method, url, params, body)
             return resp
 
     # 未被引用，已注释
-    # def get(self, path: str, **kwargs) -> requests.Response:
+    # def get(self, path: str, **kwargs) -> RestResponse:
     #     return self._request("GET", path, **kwargs)
 
-    def request(self, api: RestApiDef, params=None, json=None, **kwargs) -> requests.Response:
+    def request(self, api: RestApiDef, params=None, json=None, **kwargs) -> RestResponse:
         """
         按 api.method 自动发起 GET/POST/PUT/PATCH/DELETE，使用 api.uri 作为 path。
         GET 常用 params，POST 常用 json，其余通过 **kwargs 传入。
         """
         kwargs.setdefault("params", params)
         kwargs.setdefault("json", json)
-        return self._request(api.method.upper(), api.uri, **kwargs)
+        return self._request_api(api, **kwargs)
+
+    def _request_api(self, api: RestApiDef, session: requests.Session = None, **kwargs) -> RestResponse:
+        """
+        按 RestApiDef 发起请求；回放模式直接从 cassette 返回（绕过缓存、限流与对冲）；
+        开启缓存时 GET 请求先查缓存，相同在途请求合并为一次 HTTP。
+        """
+        method = api.method.upper()
+        if self.cassette is not None and self.cassette.replaying:
+            return self._replay(method, api.uri, **kwargs)
+        if self.cache is None or method != "GET" or kwargs.get("json") or kwargs.get("data"):
+            return self._send(api, session, **kwargs)
+        key = make_cache_key(method, api.uri, kwargs.get("params"))
+        return self.cache.get_or_load(key, lambda: self._send(api, session, **kwargs))
+
+    def _send(self, api: RestApiDef, session: requests.Session = None, **kwargs) -> RestResponse:
+        """实际发出 HTTP：开启限流时先取令牌，被限流（42901/429）则反馈降速并按 max_retries 重试。"""
+        limiter = self.rate_limiter
+        if limiter is None:
+            return self._dispatch(api, session, **kwargs)
+        attempt = 0
+        while True:
+            limiter.acquire(api.uri)
+            resp = self._dispatch(api, session, **kwargs)
+            throttled = is_throttled(resp)
+            limiter.feedback(api.uri, throttled)
+            if not throttled or attempt >= limiter.max_retries:
+                return resp
+            attempt += 1
+            logger.info("[限流] %s 被限流，第 %d 次重试", api.uri, attempt)
+
+    def _dispatch(self, api: RestApiDef, session: requests.Session = None, **kwargs) -> RestResponse:
+        """发出单次 HTTP：开启对冲且为 GET 时走对冲路径，否则直接请求。"""
+        method = api.method.upper()
+        if self.hedge_policy is None or method != "GET":
+            return self._request(method, api.uri, session=session, **kwargs)
+        return self._send_hedged(api, **kwargs)
+
+    def _send_hedged(self, api: RestApiDef, **kwargs) -> RestResponse:
+        """
+        对冲发送：主请求在对冲线程池中发出，超过 policy.delay 未返回则在另一线程（独立 Session/连接）重发，
+        取先成功返回的结果。只有采用的一份计入延迟直方图与录制；落后或失败的一份在后台完成后丢弃，计入 policy 的 discarded。
+        对冲延迟样本一律自主请求发出时计：对冲胜出时记录主请求发出至对冲返回的耗时，主请求成功完成时
+        （即使落后）记录其自身耗时，避免对冲自身的短耗时拉低分位、使对冲越发越多。两份都异常时抛出主请求的异常。
+        """
+        policy = self.hedge_policy
+        method = api.method.upper()
+        url = self._url(api.uri)
+        kwargs.setdefault("timeout", self.timeout)
+        params = kwargs.get("params")
+        body = kwargs.get("json") or kwargs.get("data")
+        if self._hedge_executor is None:
+            with self._thread_sessions_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(
+                        max_workers=policy.max_workers, thread_name_prefix="rest_hedge"
+                    )
+
+        def _run() -> _Attempt:
+            return self._attempt(self.thread_session(), method, url, kwargs)
+
+        def _discard(_future: Future) -> None:
+            policy.on_discard(api.uri)
+
+        def _record_primary(future: Future) -> None:
+            if future.result().error is None:
+                policy.record(api.uri, future.result().total)
+
+        sampled = self.log_policy.log_request(logger, method, url, params, body)
+        with allure.step(f"REST {method} {url}"):
+            started = time.perf_counter()
+            primary = self._hedge_executor.submit(_run)
+            primary.add_done_callback(_record_primary)
+            done, _ = wait([primary], timeout=policy.delay(api.uri))
+            if done:
+                winner = primary.result()
+            else:
+                logger.info("[对冲] %s 超过对冲阈值未返回，发出对冲请求", api.uri)
+                hedge_started = time.perf_counter()
+                hedge = self._hedge_executor.submit(_run)
+                winner, won, dropped, pending = None, False, [], {primary, hedge}
+                while pending and winner is None:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in sorted(done, key=lambda f: f is hedge):
+                        if winner is None and future.result().error is None:
+                            winner, won = future.result(), future is hedge
+                        else:
+                            dropped.append(future)
+                for future in pending:
+                    future.add_done_callback(_discard)
+                if winner is None:
+                    winner = primary.result()
+                    dropped.remove(primary)
+                policy.on_hedge(api.uri, won=won)
+                for _ in dropped:
+                    policy.on_discard(api.uri)
+                if won:
+                    policy.record(api.uri, hedge_started - started + winner.total)
+            return self._accept(winner, method, api.uri, url, params, body, sampled)
+
+    def submit(self, api: RestApiDef, params=None, **kwargs) -> Future:
+        """
+        在批量请求线程池中异步发起一次请求（工作线程独立 Session），立即返回 Future[RestResponse]。
+        调用方自行控制在途数量，适合流式分窗拉取等需要边取边消费的场景。
+        """
+        return self._submit_batch(
+            lambda: self._request_api(api, session=self.thread_session(), params=params, **kwargs),
+            DEFAULT_MAX_WORKERS,
+        )
+
+    def request_many(
+        self,
+        api: RestApiDef,
+        params_list: list,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        **kwargs,
+    ) -> list[BatchResult]:
+        """
+        对同一 api 按 params_list 批量并发请求：共享线程池执行，每个线程使用独立 Session 复用连接。
+        单次请求异常不会中断整批，记录在对应 BatchResult.error 中。
+        :param api: 接口定义
+        :param params_list: 每次调用的 params 列表（GET 为 query，其余 method 同样作为 params 传入）
+        :param max_workers: 本次调用的最大并发数（信号量限制在途请求数，不重建共享线程池）
+        :return: 与 params_list 顺序一致的 BatchResult 列表
+        :raises ValueError: max_workers 小于 1
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers 须不小于 1: {max_workers}")
+        slots = threading.BoundedSemaphore(max_workers)
+
+        def _call(params) -> BatchResult:
+            start = time.perf_counter()
+            try:
+                resp = self._request_api(api, session=self.thread_session(), params=params, **kwargs)
+            except Exception as e:
+                return BatchResult(params, None, time.perf_counter() - start, e)
+            finally:
+                slots.release()
+            return BatchResult(params, resp, time.perf_counter() - start)
+
+        with allure.step(f"批量并发请求 {api.method.upper()} {api.uri} x{len(params_list)} (max_workers={max_workers})"):
+            # 提交前取信号量：在途请求不超过 max_workers，且不占用共享线程池中的空闲线程等待
+            futures = []
+            for params in params_list:
+                slots.acquire()
+                futures.append(self._submit_batch(lambda p=params: _call(p), max_workers))
+            # 按提交顺序取结果，保证与入参一一对应
+            results = [future.result() for future in futures]
+        logger.info(
+            "[批量请求] %s x%d 完成，失败 %d 次，单次最大耗时 %.3fs",
+            api.uri,
+            len(results),
+            sum(1 for r in results if r.error is not None),
+            max((r.elapsed for r in results), default=0.0),
+        )
+        return results
 
     def request_json_success(
         self,
@@ -79,6 +404,14 @@ class RestClient:
         """
         with allure.step(f"请求 {api.method.upper()} {api.uri} 并校验成功 (expected_biz_code={expected_biz_code})"):
             resp = self.request(api, params=params, json=json, **kwargs)
+            return self.check_json_success(resp, expected_biz_code)
+
+    def check_json_success(self, resp: RestResponse, expected_biz_code: int = 0) -> dict:
+        """
+        校验已有响应的 HTTP 状态与 body 业务码符合 expected_biz_code，通过后返回响应 JSON。
+        供 request_json_success 及 submit 等异步取回的响应复用同一套校验。
+        """
+        try:
             with allure.step("校验 HTTP 状态码符合 expected_biz_code 映射"):
                 expected_http = get_biz_http_status(expected_biz_code)
                 assert resp.status_code == expected_http, (
@@ -90,4 +423,25 @@ class RestClient:
                 assert actual == expected_biz_code, (
                     f"body code/biz_code expected {expected_biz_code}, got {actual}"
                 )
-            return data
+        except AssertionError:
+            # debug 模式已在 _request 中附加过；throughput 模式仅在校验失败时附加
+            if not self.log_policy.is_debug and resp.status_code < 400:
+                self.log_policy.attach_body(resp)
+            raise
+        return data
+
+    def close(self) -> None:
+        """关闭主 Session、批量/对冲线程池及其工作线程的 Session；cassette 由创建方负责关闭。"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+            self._executor_workers = 0
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=True)
+            self._hedge_executor = None
+        self.session.close()
+        with self._thread_sessions_lock:
+            for session in self._thread_sessions:
+                session.close()
+            self._thread_sessions.clear()
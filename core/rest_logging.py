@@ -0,0 +1,112 @@
+"""
+REST 请求/响应日志与 Allure 附件策略。
+- debug 模式（默认）：与原行为一致，每次请求的入参、完整响应 body 均打 INFO 日志并附加到 Allure
+- throughput 模式：高吞吐压测用，按 sample_rate 采样打日志，body 截断到 body_max_bytes，
+  仅在失败（HTTP >= 400 或校验不通过）时附加 Allure
+body 通过 LazyBody 延迟解码：仅在日志真正输出时才解码并截断，未输出时不产生任何解码开销。
+"""
+import random
+from dataclasses import dataclass
+from typing import Literal
+
+import allure
+
+from config.settings import REST_LOG_BODY_MAX, REST_LOG_MODE, REST_LOG_SAMPLE_RATE
+
+LOG_MODE_DEBUG = "debug"
+LOG_MODE_THROUGHPUT = "throughput"
+
+
+class LazyBody:
+    """响应 body 的延迟格式化包装：str() 时才解码，超过 limit 字节时截断。limit=0 表示不截断。"""
+
+    __slots__ = ("resp", "limit")
+
+    def __init__(self, resp, limit: int = 0):
+        self.resp = resp
+        self.limit = limit
+
+    def __str__(self) -> str:
+        content = self.resp.content
+        if not content:
+            return "(empty)"
+        if self.limit and len(content) > self.limit:
+            encoding = getattr(self.resp, "encoding", None) or "utf-8"
+            head = content[: self.limit].decode(encoding, errors="replace")
+            return f"{head}...(truncated, {len(content)} bytes)"
+        # 不截断时复用响应对象上缓存的 text（RestResponse 只解码一次）
+        return self.resp.text
+
+
+@dataclass(frozen=True)
+class RestLogPolicy:
+    """
+    REST 日志策略：
+    - mode: "debug" 全量日志 + 每次附加 Allure；"throughput" 采样、截断、仅失败时附加 Allure
+    - body_max_bytes: throughput 模式下日志/附件中 body 的最大字节数
+    - sample_rate: throughput 模式下成功请求的日志采样率（0~1），失败请求始终记录
+    body_max_bytes / sample_rate 默认取 REST_LOG_BODY_MAX / REST_LOG_SAMPLE_RATE，直接构造与 from_settings 行为一致。
+    """
+
+    mode: Literal["debug", "throughput"] = LOG_MODE_DEBUG
+    body_max_bytes: int = REST_LOG_BODY_MAX
+    sample_rate: float = REST_LOG_SAMPLE_RATE
+
+    @classmethod
+    def from_settings(cls) -> "RestLogPolicy":
+        """按 REST_LOG_MODE / REST_LOG_BODY_MAX / REST_LOG_SAMPLE_RATE 配置构造。"""
+        return cls(mode=REST_LOG_MODE, body_max_bytes=REST_LOG_BODY_MAX, sample_rate=REST_LOG_SAMPLE_RATE)
+
+    @property
+    def is_debug(self) -> bool:
+        return self.mode != LOG_MODE_THROUGHPUT
+
+    @property
+    def body_limit(self) -> int:
+        """日志/附件 body 截断字节数，debug 模式不截断（0）。"""
+        return 0 if self.is_debug else self.body_max_bytes
+
+    def should_sample(self) -> bool:
+        """本次成功请求是否记录日志。"""
+        if self.is_debug or self.sample_rate >= 1:
+            return True
+        return random.random() < self.sample_rate
+
+    def log_request(self, logger, method: str, url: str, params, body) -> bool:
+        """
+        发送前记录入参并返回本次是否采样。debug 模式始终记录；throughput 模式仅记录采样请求。
+        """
+        sampled = self.should_sample()
+        if sampled:
+            logger.info("[请求入参] %s %s | params=%s | body=%s", method, url, params, body)
+        return sampled
+
+    def log_response(
+        self, logger, resp, sampled: bool, method: str, url: str, params, body, attach: bool = True
+    ) -> None:
+        """
+        收到响应后按策略记录并决定是否附加 Allure（attach=False 时只打日志）。
+        throughput 模式下未采样的成功请求不做任何格式化；失败请求若未采样则补记入参，便于定位。
+        """
+        failed = resp.status_code >= 400
+        if self.is_debug:
+            logger.info("[响应信息] status=%s | body=%s", resp.status_code, LazyBody(resp))
+            if attach:
+                self.attach_body(resp)
+            return
+        if failed:
+            if not sampled:
+                logger.warning("[请求入参] %s %s | params=%s | body=%s", method, url, params, body)
+            logger.warning("[响应信息] status=%s | body=%s", resp.status_code, LazyBody(resp, self.body_max_bytes))
+            if attach:
+                self.attach_body(resp)
+        elif sampled:
+            logger.info("[响应信息] status=%s | body=%s", resp.status_code, LazyBody(resp, self.body_max_bytes))
+
+    def attach_body(self, resp, name: str = "Response Body") -> None:
+        """将响应 body（按策略截断）附加到 Allure。"""
+        allure.attach(
+            str(LazyBody(resp, self.body_limit)),
+            name=name,
+            attachment_type=allure.attachment_type.TEXT,
+        )
@@ -0,0 +1,66 @@
+"""
+REST 响应包装：body 只解码一次、只解析一次，结果缓存在对象上。
+_request 返回 RestResponse，用例中多次调用 resp.json() / resp.text 不会重复解析；
+JSON 解析走 core.json_codec（已安装 orjson 时直接解析 bytes）。
+注：同一 RestResponse 的 json() 每次返回同一个对象；响应缓存交给各调用方的是 clone() 副本，各自解析、互不影响。
+"""
+import requests
+
+from core import json_codec
+
+_UNSET = object()
+
+
+class ParsedBodyMixin:
+    """为持有 content（bytes）与 encoding 的响应对象提供一次性解码 / 解析的 text 与 json()。"""
+
+    _text = None
+    _json = _UNSET
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            # JSON 接口按 RFC 8259 为 UTF-8；未声明 charset 时不走 requests 的编码探测
+            encoding = getattr(self, "encoding", None) or "utf-8"
+            self._text = self.content.decode(encoding, errors="replace") if self.content else ""
+        return self._text
+
+    def json(self):
+        """解析响应 JSON（首次解析后缓存）。解析失败抛 json.JSONDecodeError，且不缓存失败结果。"""
+        if self._json is _UNSET:
+            self._json = json_codec.loads(self.content)
+        return self._json
+
+
+class RestResponse(ParsedBodyMixin):
+    """
+    requests.Response 的轻量包装：text / json() 一次性解析并缓存，其余属性（headers、elapsed、raise_for_status 等）
+    透传给原始响应；原始对象可通过 raw_response 取得。
+    """
+
+    def __init__(self, resp: requests.Response):
+        self.raw_response = resp
+
+    @property
+    def status_code(self) -> int:
+        return self.raw_response.status_code
+
+    @property
+    def content(self) -> bytes:
+        return self.raw_response.content
+
+    @property
+    def encoding(self):
+        return self.raw_response.encoding
+
+    def clone(self) -> "RestResponse":
+        """共享原始响应（body bytes 不可变）的新包装，json() 在新对象上重新解析，调用方可随意修改。"""
+        copy = RestResponse(self.raw_response)
+        copy._text = self._text
+        return copy
+
+    def __getattr__(self, name):
+        return getattr(self.raw_response, name)
+
+    def __repr__(self) -> str:
+        return f"<RestResponse [{self.status_code}]>"
@@ -2,34 +2,202 @@
 WebSocket 客户端封装：连接、发送、接收、关闭，带超时与日志。
 支持原始 send/recv 与 JSON 格式 send_json/recv_json，及 book 订阅请求构造。
 支持通用持续收包：recv_until(stop_when, max_wait_sec) 按可传入的终止条件收包；recv_for_seconds(duration_sec) 按时长收包。
+长时间收包可用 aggregate_until / aggregate_for_seconds 把消息逐条交给聚合器（core.ws_aggregators）而不保留列表，
+或用 iter_messages 逐条消费，内存占用与时长无关。
 User API 需在会话内调用一次 public/auth（带 sig + api_key），鉴权后本会话内后续请求无需再带签名。
+可选后台读线程（reader_thread=True 或 WS_READER_THREAD=1）：连接后持续把收到的帧写入有界缓冲（core.ws_buffer），
+recv / recv_until / recv_for_seconds 从缓冲消费并按事件等待，两次调用之间帧不会积压在内核 socket 缓冲中。
+subscribe / authenticate 按 id 等待响应，期间收到的其他帧暂存，后续 recv / recv_until 按原顺序读到。
+同一连接订阅多个频道时可使用 client.dispatcher（core.ws_dispatcher）按 subscription / 响应 id 分别取消息；
+启用后推送请通过 dispatcher 读取，不要再混用 recv_until。
+可选原始帧抓包（capture_path 或 WS_CAPTURE_DIR）：收发的每一帧完整写入 core.ws_capture 文件，失败后用 core.ws_replay 离线回放。
+连接复用（core.ws_pool）：subscriptions 记录已订阅频道，reset() 退订并读掉残留帧；reconnect() 重连后按上次成功的参数重新鉴权。
+可选断线自动恢复（auto_reconnect=True 或 WS_RECONNECT=1）：recv_until / recv_for_seconds 遇断线时按抖动退避重连、
+重新鉴权并重放订阅，在消息列表中插入 _meta 断档标记（is_gap_marker），序列校验据此区分重连断档与服务端问题。
+每帧收到时记录本机单调时钟与墙钟（last_recv_ns / last_recv_wall_ns，读线程模式为读线程收到的时刻）；
+sync_clock() 以服务端时间请求（WS_CLOCK_METHOD，响应带服务端处理请求时的时间戳）的往返样本估计服务端时钟偏移
+（client.clock，core.ws_latency），不以被测推送自身校准；track_latency=True 或 WS_TRACK_LATENCY=1 时
+在读帧层按 channel 统计每条推送的发布到接收延迟（client.latency，recv / recv_until / 分发器均覆盖），时钟无样本时 subscribe 前自动同步。
+可选 permessage-deflate 压缩（deflate=True 或 WS_DEFLATE=1，core.ws_deflate）：握手时协商，压缩消息在帧读取层解压，
+client.deflate_stats 统计压缩前后字节与解压 CPU 时间，关闭连接时输出。
 """
 import inspect
 import json
+import logging
+import random
 import socket
+import threading
 import time
-from typing import Callable, Union
+from collections import deque
+from contextlib import closing
+from typing import Callable, Iterable, Iterator, Optional, Union
 
 import allure
 import websocket
+from websocket import ABNF
 
-from config.settings import WS_BASE_URL, WS_TIMEOUT, WS_API_KEY, WS_SECRET_KEY
+from config.settings import (
+    WS_API_KEY,
+    WS_BASE_URL,
+    WS_BUFFER_SIZE,
+    WS_CLOCK_METHOD,
+    WS_DEFLATE,
+    WS_DEFLATE_WINDOW_BITS,
+    WS_DROP_POLICY,
+    WS_READER_THREAD,
+    WS_RECONNECT,
+    WS_RECONNECT_BACKOFF,
+    WS_RECONNECT_BACKOFF_MAX,
+    WS_RECONNECT_RETRIES,
+    WS_SECRET_KEY,
+    WS_SKIP_UTF8_VALIDATION,
+    WS_TIMEOUT,
+    WS_TRACK_LATENCY,
+)
+from core import json_codec
 from core.logger import get_logger
+from core.ws_buffer import FrameBuffer
+from core.ws_capture import FrameCapture, capture_path_for
+from core.ws_deflate import DeflateStats, install as install_deflate, offer_header, parse_response
+from core.ws_latency import ClockOffsetEstimator
 from core.ws_signature import build_signed_request, build_signed_subscribe
 
 logger = get_logger("websocket_client")
 
 # User API 鉴权 method，每个会话调用一次
 WS_AUTH_METHOD = "public/auth"
+# 心跳回复 method
+WS_RESPOND_HEARTBEAT_METHOD = "public/respond-heartbeat"
+
+# 关闭时等待读线程退出的最长时间（秒），超时则强制断开 socket
+_READER_JOIN_SEC = 2.0
+# reset 退订请求使用的 id（与用例请求的 id 区分，据此识别退订确认）
+_RESET_REQUEST_ID = 9_999_001
+# sync_clock 服务端时间请求的起始 id 与默认往返次数
+_CLOCK_REQUEST_ID = 9_999_101
+_CLOCK_SAMPLES = 3
+
+# 断档标记：断线恢复时插入消息列表的非服务端消息，{"_meta": {"event": GAP_RECONNECT | GAP_DISCONNECTED, ...}}
+META_KEY = "_meta"
+GAP_RECONNECT = "reconnect"
+GAP_DISCONNECTED = "disconnected"
+# 视为连接断开的异常（超时类异常在此之前已单独处理）
+_DISCONNECT_ERRORS = (websocket.WebSocketConnectionClosedException, OSError)
+
+# recv_until 快速路径：解析前按原始帧（bytes 或 str）做子串扫描
+_HEARTBEAT_MARK = {bytes: b'"public/heartbeat"', str: '"public/heartbeat"'}
+_SUBSCRIPTION_KEY = {bytes: b'"subscription"', str: '"subscription"'}
+_QUOTE = {bytes: b'"', str: '"'}
+
+
+def is_gap_marker(msg: dict) -> bool:
+    """是否为断线恢复插入的断档标记（而非服务端消息）。"""
+    return META_KEY in msg
+
+
+def reconnect_delay(attempt: int, base: float = None, cap: float = None) -> float:
+    """第 attempt 次（从 1 开始）重连前的等待秒数：指数退避上限内取均匀随机值（full jitter），避免多连接同时重连。"""
+    base = WS_RECONNECT_BACKOFF if base is None else base
+    cap = WS_RECONNECT_BACKOFF_MAX if cap is None else cap
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def _channels_of(params) -> list:
+    """取 params 中的频道列表（异常参数返回空列表）。"""
+    channels = params.get("channels") if isinstance(params, dict) else None
+    if not isinstance(channels, list):
+        return []
+    return [c for c in channels if isinstance(c, str)]
+
+
+def scan_subscription(raw: str | bytes) -> str | bytes | None:
+    """不解析 JSON，直接扫描原始帧中 "subscription" 字段的取值（类型与 raw 相同）；没有该字段返回 None。"""
+    kind = type(raw)
+    i = raw.find(_SUBSCRIPTION_KEY[kind])
+    if i < 0:
+        return None
+    quote = _QUOTE[kind]
+    start = raw.find(quote, i + len(_SUBSCRIPTION_KEY[kind])) + 1
+    end = raw.find(quote, start)
+    return raw[start:end] if start > 0 and end > 0 else None
+
+
+def stop_when_takes_messages(stop_when) -> bool:
+    """检测 recv_until 的 stop_when 签名：是否为 stop_when(msg, messages) 双参数形式。"""
+    if stop_when is None:
+        return False
+    try:
+        return len(inspect.signature(stop_when).parameters) >= 2
+    except (ValueError, TypeError):
+        return False
 
 
 class WebSocketClient:
     """WebSocket 封装：connect / send / recv / close，支持 JSON 与 book 订阅。"""
 
-    def __init__(self, url: str = None, timeout: int = None):
+    def __init__(
+        self,
+        url: str = None,
+        timeout: int = None,
+        reader_thread: bool = None,
+        buffer_size: int = None,
+        drop_policy: str = None,
+        capture_path: str = None,
+        auto_reconnect: bool = None,
+        track_latency: bool = None,
+        deflate: bool = None,
+        deflate_window_bits: int = None,
+    ):
+        """
+        :param url: WebSocket 地址，默认 WS_BASE_URL
+        :param timeout: 建连及 recv 默认超时（秒），默认 WS_TIMEOUT
+        :param reader_thread: 是否启用后台读线程，默认 WS_READER_THREAD
+        :param buffer_size: 读线程缓冲容量（帧数），默认 WS_BUFFER_SIZE
+        :param drop_policy: 缓冲满时的策略 oldest / newest / block，默认 WS_DROP_POLICY
+        :param capture_path: 原始帧抓包文件路径；None 时按 WS_CAPTURE_DIR 自动命名（未配置则不抓包）
+        :param auto_reconnect: recv_until / recv_for_seconds 遇断线时是否自动恢复，默认 WS_RECONNECT
+        :param track_latency: 是否统计收到推送的发布到接收延迟，默认 WS_TRACK_LATENCY
+        :param deflate: 握手时是否请求 permessage-deflate 压缩，默认 WS_DEFLATE
+        :param deflate_window_bits: 要求服务端使用的压缩窗口位数（9 ~ 15），默认 WS_DEFLATE_WINDOW_BITS
+        """
         self.url = url or WS_BASE_URL
         self.timeout = timeout or WS_TIMEOUT
+        self.reader_thread = WS_READER_THREAD if reader_thread is None else reader_thread
+        self.buffer_size = buffer_size or WS_BUFFER_SIZE
+        self.drop_policy = drop_policy or WS_DROP_POLICY
         self._ws = None
+        self._reader: Optional[threading.Thread] = None
+        self._buffer: Optional[FrameBuffer] = None
+        self._stop_reader = threading.Event()
+        self._dispatcher = None
+        # 未启用分发器时等待请求响应期间收到的其他帧 (帧, 接收 monotonic_ns, 接收墙钟 ns)，后续读帧优先取出
+        self._pending: deque = deque()
+        self.capture_path = capture_path or capture_path_for(f"ws_{id(self):x}")
+        self._capture: Optional[FrameCapture] = None
+        # 本会话已发送订阅的频道（reset 时据此退订）；最近一次鉴权成功的参数（reconnect 后据此重新鉴权）
+        self.subscriptions: set = set()
+        self._auth: Optional[dict] = None
+        self._authenticated = False
+        # 订阅成功的频道 -> (是否签名订阅, params)，断线恢复时据此重放订阅
+        self._subscribe_params: dict = {}
+        self.auto_reconnect = WS_RECONNECT if auto_reconnect is None else auto_reconnect
+        self.reconnects = 0
+        # 最近一帧的本机接收时刻（monotonic / 墙钟，纳秒）
+        self.last_recv_ns = 0
+        self.last_recv_wall_ns = 0
+        # 服务端时钟偏移估计（sync_clock 的往返样本）；服务端不支持时间请求时不再自动同步
+        self.clock = ClockOffsetEstimator()
+        self._clock_unsupported = False
+        self.latency = None
+        if WS_TRACK_LATENCY if track_latency is None else track_latency:
+            # ws_aggregators 依赖本模块，此处导入避免循环导入
+            from core.ws_aggregators import PublishLatency
+
+            self.latency = PublishLatency(self.clock)
+        self.deflate = WS_DEFLATE if deflate is None else deflate
+        self.deflate_window_bits = deflate_window_bits or WS_DEFLATE_WINDOW_BITS
+        # 本连接协商成功时的解压统计（服务端未接受压缩时为 None）
+        self.deflate_stats: Optional[DeflateStats] = None
 
     def connect(self) -> "WebSocketClient":
         """建立连接（如已连接则跳过）。"""
@@ -38,10 +206,212 @@ class WebSocketClient:
             return self
         logger.info("WebSocket connecting to %s", self.url)
         with allure.step(f"WebSocket connect: {self.url}"):
-            self._ws = websocket.create_connection(self.url, timeout=self.timeout)
+            header = [offer_header(self.deflate_window_bits)] if self.deflate else None
+            self._ws = websocket.create_connection(
+                self.url, timeout=self.timeout, skip_utf8_validation=WS_SKIP_UTF8_VALIDATION, header=header
+            )
             logger.info("WebSocket connected")
+            self.deflate_stats = None
+            if self.deflate:
+                self._setup_deflate()
+            self._authenticated = False
+            if self.capture_path:
+                self._capture = FrameCapture(self.capture_path)
+                logger.info("WebSocket 抓包写入 %s", self.capture_path)
+            if self.reader_thread:
+                self._start_reader()
             return self
 
+    def _setup_deflate(self) -> None:
+        """按握手响应确定是否启用 permessage-deflate；服务端接受时替换帧读取层以解压 RSV1 帧。"""
+        agreed = parse_response(self._ws.getheaders().get("sec-websocket-extensions"))
+        if agreed is None:
+            logger.info("服务端未接受 permessage-deflate，按不压缩收包")
+            return
+        self.deflate_stats = DeflateStats(**agreed)
+        install_deflate(self._ws, self.deflate_stats)
+        logger.info("permessage-deflate 已协商：%s", agreed)
+
+    @property
+    def connected(self) -> bool:
+        """连接是否可用（已连接且未被对端关闭；启用读线程时读线程仍在运行）。"""
+        if self._ws is None or not self._ws.connected:
+            return False
+        return self._reader is None or self._reader.is_alive()
+
+    @property
+    def authenticated(self) -> bool:
+        """本会话是否已鉴权成功。"""
+        return self._authenticated
+
+    def reconnect(self) -> "WebSocketClient":
+        """
+        关闭并重新建立连接（新会话，订阅记录与分发器清空）；此前鉴权成功过则用原参数重新鉴权，
+        重新鉴权失败抛 ConnectionError。只关闭 socket，不输出延迟与压缩统计（由最终的 close / reset 输出一次）。
+        """
+        previous_deflate = self.deflate_stats
+        self._close_socket()
+        self.subscriptions.clear()
+        self._subscribe_params.clear()
+        self._dispatcher = None
+        self.connect()
+        if previous_deflate is not None and self.deflate_stats is not None:
+            self.deflate_stats.add_counters(previous_deflate)
+        if self._auth is not None:
+            resp = self.authenticate(**self._auth)
+            if resp.get("code") != 0:
+                raise ConnectionError(f"WebSocket 重连后重新鉴权失败: {resp}")
+        return self
+
+    def set_capture(self, path: Optional[str]) -> None:
+        """切换抓包文件（None 表示停止抓包），连接复用时按用例分别抓包。"""
+        if self._capture is not None:
+            self._capture.close()
+            self._capture = None
+        self.capture_path = path
+        if path and self._ws is not None:
+            self._capture = FrameCapture(path)
+            logger.info("WebSocket 抓包写入 %s", path)
+
+    def _start_reader(self) -> None:
+        """启动后台读线程：socket 改为阻塞读，收到的数据帧写入有界缓冲。"""
+        self._buffer = FrameBuffer(self.buffer_size, self.drop_policy)
+        self._stop_reader.clear()
+        self._ws.sock.settimeout(None)
+        self._reader = threading.Thread(target=self._reader_loop, name="ws_reader", daemon=True)
+        self._reader.start()
+        logger.info("WebSocket reader thread started（缓冲 %d 帧，满时策略=%s）", self.buffer_size, self.drop_policy)
+
+    def _reader_loop(self) -> None:
+        ws, buffer = self._ws, self._buffer
+        error = None
+        try:
+            while not self._stop_reader.is_set():
+                opcode, data = ws.recv_data()
+                if opcode == ABNF.OPCODE_CLOSE:
+                    logger.info("WebSocket reader: 收到服务端关闭帧")
+                    break
+                recv_ns, wall_ns = time.monotonic_ns(), time.time_ns()
+                if self._capture is not None:
+                    self._capture.write(data, binary=opcode != ABNF.OPCODE_TEXT, ts_ns=recv_ns)
+                # 缓冲原始 bytes，由消费端按需解码（recv_until 快速路径不解码）
+                buffer.put((data, opcode == ABNF.OPCODE_TEXT, recv_ns, wall_ns))
+        except Exception as e:
+            if not self._stop_reader.is_set():
+                error = e
+                logger.warning("WebSocket reader 异常退出: %s", e)
+        finally:
+            buffer.close(error)
+
+    def _read_socket(self, decode: bool = True) -> str | bytes:
+        """
+        直接从 socket 读一帧（未启用读线程时），开启抓包时同时写入抓包文件。
+        :param decode: 文本帧是否解码为 str；False 时保持 bytes（recv_until 快速路径，省去解码与复制）
+        """
+        opcode, data = self._ws.recv_data()
+        self.last_recv_ns, self.last_recv_wall_ns = time.monotonic_ns(), time.time_ns()
+        if opcode == ABNF.OPCODE_CLOSE:
+            raise websocket.WebSocketConnectionClosedException("WebSocket 收到服务端关闭帧")
+        is_text = opcode == ABNF.OPCODE_TEXT
+        if self._capture is not None:
+            self._capture.write(data, binary=not is_text, ts_ns=self.last_recv_ns)
+        if self.latency is not None and is_text:
+            self._feed_latency(data)
+        return data.decode("utf-8") if is_text and decode else data
+
+    def _feed_latency(self, data: bytes) -> None:
+        """推送帧（含 subscription）按接收时刻计入发布延迟；在读帧层统计，recv / recv_until / 分发器各路径均覆盖。"""
+        if _SUBSCRIPTION_KEY[bytes] in data:
+            self.latency.feed(json_codec.loads(data), self.last_recv_ns, self.last_recv_wall_ns)
+
+    @property
+    def dispatcher(self) -> "MessageDispatcher":
+        """按 subscription / 响应 id 分发消息的分发器（首次访问时创建）。"""
+        if self._dispatcher is None:
+            # ws_dispatcher 依赖本模块，此处导入避免循环导入
+            from core.ws_dispatcher import MessageDispatcher
+
+            self._dispatcher = MessageDispatcher(self._pump_frame, respond_heartbeat=self._respond_heartbeat)
+        return self._dispatcher
+
+    def _respond_heartbeat(self, msg: dict) -> None:
+        """回复服务端 public/heartbeat，避免会话被断开。"""
+        self.send_json({"id": msg.get("id"), "method": WS_RESPOND_HEARTBEAT_METHOD})
+
+    def _pump_frame(self, timeout: float) -> str | bytes | None:
+        """供分发器读取一帧：未启用读线程时按本次 timeout 设置 socket 超时。"""
+        if self._buffer is not None:
+            return self._recv_frame(timeout)
+        old_timeout = self._ws.sock.gettimeout()
+        self._ws.sock.settimeout(max(timeout, 0.001))
+        try:
+            return self._recv_frame(timeout)
+        finally:
+            self._ws.sock.settimeout(old_timeout)
+
+    def _recv_response(self, request_id: int) -> dict:
+        """
+        接收 id 匹配的响应：启用分发器时由分发器按 id 等待（期间其他消息分发到各自队列）；
+        否则逐帧读取，heartbeat 回复后跳过，其他帧（如已订阅频道的推送）按原顺序暂存，供后续 recv / recv_until 读取。
+        超过 self.timeout 未收到抛 WebSocketTimeoutException。
+        """
+        if self._dispatcher is not None:
+            msg = self._dispatcher.get(request_id, self.timeout)
+            if msg is None:
+                raise websocket.WebSocketTimeoutException(f"等待 id={request_id} 的响应超时")
+            logger.info("WebSocket recv: %s", msg)
+            return msg
+        deadline = time.monotonic() + self.timeout
+        skipped = []
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise websocket.WebSocketTimeoutException(f"等待 id={request_id} 的响应超时")
+                raw = self._pump_frame(remaining)
+                if raw is None:
+                    continue
+                msg = json_codec.loads(raw)
+                if msg.get("id") == request_id and not self.is_heartbeat(msg):
+                    self._log_recv(raw)
+                    return msg
+                if self.is_heartbeat(msg):
+                    self._respond_heartbeat(msg)
+                else:
+                    skipped.append((raw, self.last_recv_ns, self.last_recv_wall_ns))
+        finally:
+            # 暂存帧排在尚未读取的帧之前，保持到达顺序
+            self._pending.extendleft(reversed(skipped))
+
+    @property
+    def buffer_stats(self) -> Optional[dict]:
+        """读线程缓冲统计（received / dropped / buffered / high_watermark），未启用读线程时为 None。"""
+        return self._buffer.stats() if self._buffer is not None else None
+
+    def _recv_frame(self, timeout: float = None, decode: bool = True) -> str | bytes | None:
+        """
+        读取一帧并更新 last_recv_ns / last_recv_wall_ns：读线程模式从缓冲等待（timeout 内无帧返回 None），
+        否则直接读 socket（超时由 socket 超时决定）。
+        decode=False 时文本帧保持 bytes（两种模式均不解码）。连接已关闭时抛 WebSocketConnectionClosedException。
+        """
+        if self._pending:
+            frame, self.last_recv_ns, self.last_recv_wall_ns = self._pending.popleft()
+            return frame
+        if self._buffer is None:
+            try:
+                return self._read_socket(decode)
+            except websocket.WebSocketTimeoutException:
+                return None
+        item = self._buffer.get(timeout)
+        if item is None:
+            if self._buffer.closed:
+                raise websocket.WebSocketConnectionClosedException("WebSocket connection is already closed.")
+            return None
+        frame, is_text, self.last_recv_ns, self.last_recv_wall_ns = item
+        if self.latency is not None and is_text:
+            self._feed_latency(frame)
+        return frame.decode("utf-8") if is_text and decode else frame
+
     def send(self, payload: str | bytes) -> None:
         """发送原始消息。"""
         logger.info("WebSocket send: %s", payload[:200] if len(str(payload)) > 200 else payload)
@@ -51,6 +421,8 @@ class WebSocketClient:
                 name="Sent",
                 attachment_type=allure.attachment_type.TEXT,
             )
+            if self._capture is not None:
+                self._capture.write(payload, sent=True)
             self._ws.send(payload)
 
     def send_json(self, obj: dict) -> None:
@@ -60,7 +432,18 @@ class WebSocketClient:
 
     def recv(self) -> str | bytes:
         """接收一条消息，阻塞直到有数据或超时。"""
-        out = self._ws.recv()
+        if self._buffer is None and not self._pending:
+            out = self._read_socket()
+        else:
+            out = self._recv_frame(self.timeout)
+            if out is None:
+                raise websocket.WebSocketTimeoutException("Connection timed out")
+        self._log_recv(out)
+        return out
+
+    @staticmethod
+    def _log_recv(out: str | bytes) -> None:
+        """单条收包的日志与 Allure 附件。"""
         logger.info("WebSocket recv: %s", out[:200] if len(str(out)) > 200 else out)
         with allure.step("WebSocket recv"):
             allure.attach(
@@ -68,7 +451,6 @@ class WebSocketClient:
                 name="Received",
                 attachment_type=allure.attachment_type.TEXT,
             )
-            return out
 
     def recv_json(self) -> dict:
         """接收一条消息并解析为 JSON。"""
@@ -82,35 +464,26 @@ class WebSocketClient:
         max_wait_sec: float,
         recv_timeout: float = 1.0,
         filter_heartbeat: bool = True,
+        subscriptions: Iterable[str] = None,
     ) -> list:
         """
         在 max_wait_sec 内持续接收消息，直到 stop_when 返回 True 或超时。
+        快速路径：帧以原始 bytes 处理（不先解码为 str），heartbeat 与非关注订阅在完整解析前按子串扫描识别，
+        JSON 解析走 core.json_codec（安装 orjson 时更快），逐条预览仅在 INFO 日志开启时构造。
         :param stop_when: 终止条件，支持两种签名：
                           - stop_when(msg) -> bool: 仅判断当前消息
                           - stop_when(msg, messages) -> bool: 可获取已收消息列表（用于判断消息数量等）
                           None 表示不设条件，仅按超时结束
         :param max_wait_sec: 最大等待时间（秒）
-        :param recv_timeout: 单次 recv 超时（秒），超时后继续循环
+        :param recv_timeout: 单次 recv 超时（秒），超时后继续循环；读线程模式下直接按剩余时间等待，不使用该参数
         :param filter_heartbeat: 是否自动过滤 heartbeat 消息（默认 True）
-        :return: 收到的 JSON 消息列表（已过滤 heartbeat）
+        :param subscriptions: 只保留这些 subscription 的推送（其他订阅的推送不解析、不返回）；不含 subscription 的消息照常返回
+        :return: 收到的 JSON 消息列表（已过滤 heartbeat）；启用 auto_reconnect 时断线处插入断档标记（不参与 stop_when），
+                 重连失败则以 GAP_DISCONNECTED 标记结尾并返回已收消息
         """
-        if not self._ws or not getattr(self._ws, "sock", None):
-            logger.warning("recv_until: 未连接或无 sock，跳过")
-            return []
-
-        # 检测 stop_when 参数数量
-        stop_when_takes_two_args = False
-        if stop_when is not None:
-            try:
-                sig = inspect.signature(stop_when)
-                stop_when_takes_two_args = len(sig.parameters) >= 2
-            except (ValueError, TypeError):
-                pass
-
+        stop_when_takes_two_args = stop_when_takes_messages(stop_when)
+        log_preview = logger.isEnabledFor(logging.INFO)
         messages = []
-        heartbeat_count = 0
-        deadline = time.time() + max_wait_sec
-        old_timeout = self._ws.sock.gettimeout()
         logger.info(
             "持续收包最多 %.1fs（单次 recv 超时 %.1fs，终止条件=%s，过滤heartbeat=%s）",
             max_wait_sec,
@@ -118,55 +491,235 @@ class WebSocketClient:
             "有" if stop_when else "无（仅超时）",
             filter_heartbeat,
         )
+        with closing(self._stream(max_wait_sec, recv_timeout, filter_heartbeat, subscriptions)) as stream:
+            for msg, raw, _, _ in stream:
+                messages.append(msg)
+                if raw is None:
+                    continue  # 断档标记不参与 stop_when
+                if log_preview:
+                    text = raw.decode("utf-8", "replace") if isinstance(raw, bytes) else raw
+                    preview = text if len(text) <= 500 else text[:500] + "..."
+                    logger.info("WebSocket 持续收包 [%d] 收到: %s", len(messages), preview)
+
+                # 调用 stop_when（兼容单参数和双参数）
+                if stop_when is not None:
+                    should_stop = stop_when(msg, messages) if stop_when_takes_two_args else stop_when(msg)
+                    if should_stop:
+                        logger.info("满足终止条件，结束收包")
+                        break
+        return messages
+
+    def _stream(
+        self,
+        max_wait_sec: float,
+        recv_timeout: float,
+        filter_heartbeat: bool,
+        subscriptions: Optional[Iterable[str]],
+    ) -> Iterator[tuple]:
+        """
+        recv_until / iter_messages / aggregate_until 共用的收包循环：逐条产出 (消息, 原始帧, 接收 monotonic_ns, 接收墙钟 ns)，
+        断档标记的原始帧为 None。
+        调用方提前结束迭代时须 close() 生成器以恢复 socket 超时。
+        """
+        if not self._ws or not getattr(self._ws, "sock", None):
+            logger.warning("recv_until: 未连接或无 sock，跳过")
+            return
+        wanted = None
+        if subscriptions is not None:
+            wanted = {s for sub in subscriptions for s in (sub, sub.encode("utf-8"))}
+
+        count = 0
+        heartbeat_count = 0
+        skipped_count = 0
+        deadline = time.monotonic() + max_wait_sec
+        old_timeout = self._ws.sock.gettimeout()
         try:
-            self._ws.sock.settimeout(recv_timeout)
-            while time.time() < deadline:
+            if self._buffer is None:
+                self._ws.sock.settimeout(recv_timeout)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
                 try:
-                    raw = self._ws.recv()
-                    text = raw.decode("utf-8") if isinstance(raw, bytes) else raw
-                    msg = json.loads(text)
-
-                    # 过滤 heartbeat
-                    if filter_heartbeat and self.is_heartbeat(msg):
-                        heartbeat_count += 1
-                        logger.debug("跳过 heartbeat 消息 [%d]", heartbeat_count)
+                    # 临近截止时缩短 socket 超时，避免最后一次阻塞读越过 max_wait_sec 多收一条
+                    if self._buffer is None and remaining < recv_timeout:
+                        self._ws.sock.settimeout(remaining)
+                    raw = self._recv_frame(remaining, decode=False)
+                    if raw is None:
                         continue
+                    recv_ns, wall_ns = self.last_recv_ns, self.last_recv_wall_ns
 
-                    messages.append(msg)
-                    preview = text if len(text) <= 500 else text[:500] + "..."
-                    logger.info("WebSocket 持续收包 [%d] 收到: %s", len(messages), preview)
+                    # 非关注订阅：按子串取 subscription，不解析直接跳过
+                    if wanted is not None:
+                        sub = scan_subscription(raw)
+                        if sub is not None and sub not in wanted:
+                            skipped_count += 1
+                            continue
 
-                    # 调用 stop_when（兼容单参数和双参数）
-                    if stop_when is not None:
-                        should_stop = stop_when(msg, messages) if stop_when_takes_two_args else stop_when(msg)
-                        if should_stop:
-                            logger.info("满足终止条件，结束收包")
-                            break
+                    # 过滤 heartbeat：仅含 heartbeat 标记的帧才需确认
+                    if filter_heartbeat and _HEARTBEAT_MARK[type(raw)] in raw:
+                        msg = json_codec.loads(raw)
+                        if self.is_heartbeat(msg):
+                            heartbeat_count += 1
+                            logger.debug("跳过 heartbeat 消息 [%d]", heartbeat_count)
+                            continue
+                    else:
+                        msg = json_codec.loads(raw)
                 except socket.timeout:
                     continue
                 except Exception as e:
                     if "timeout" in str(type(e).__name__).lower() or "timed out" in str(e).lower():
                         continue
-                    raise
+                    if not (self.auto_reconnect and isinstance(e, _DISCONNECT_ERRORS)):
+                        raise
+                    marker = self._recover(e)
+                    yield marker, None, time.monotonic_ns(), time.time_ns()
+                    if marker[META_KEY]["event"] != GAP_RECONNECT:
+                        break
+                    if self._buffer is None:
+                        self._ws.sock.settimeout(recv_timeout)
+                    continue
+                count += 1
+                yield msg, raw, recv_ns, wall_ns
         finally:
-            self._ws.sock.settimeout(old_timeout)
-        if heartbeat_count > 0:
-            logger.info("持续收包结束，共收到 %d 条业务消息（已过滤 %d 条 heartbeat）", len(messages), heartbeat_count)
-        else:
-            logger.info("持续收包结束，共收到 %d 条消息", len(messages))
-        return messages
+            if self._buffer is None and self._ws is not None:
+                self._ws.sock.settimeout(old_timeout)
+            if heartbeat_count > 0:
+                logger.info("持续收包结束，共收到 %d 条业务消息（已过滤 %d 条 heartbeat）", count, heartbeat_count)
+            else:
+                logger.info("持续收包结束，共收到 %d 条消息", count)
+            if skipped_count:
+                logger.info("按 subscriptions 跳过 %d 条其他订阅的推送", skipped_count)
 
     def recv_for_seconds(
-        self, duration_sec: float, recv_timeout: float = 1.0, filter_heartbeat: bool = True
+        self,
+        duration_sec: float,
+        recv_timeout: float = 1.0,
+        filter_heartbeat: bool = True,
+        subscriptions: Iterable[str] = None,
     ) -> list:
         """
         在指定时长内持续接收消息，无提前终止条件。
         :param duration_sec: 接收时长（秒）
         :param recv_timeout: 单次 recv 超时（秒）
         :param filter_heartbeat: 是否自动过滤 heartbeat 消息（默认 True）
+        :param subscriptions: 只保留这些 subscription 的推送，见 recv_until
         :return: 收到的 JSON 消息列表（已过滤 heartbeat）
         """
-        return self.recv_until(None, duration_sec, recv_timeout, filter_heartbeat)
+        return self.recv_until(None, duration_sec, recv_timeout, filter_heartbeat, subscriptions)
+
+    def iter_messages(
+        self,
+        max_wait_sec: float,
+        recv_timeout: float = 1.0,
+        filter_heartbeat: bool = True,
+        subscriptions: Iterable[str] = None,
+    ) -> Iterator[dict]:
+        """
+        逐条产出 max_wait_sec 内收到的消息，不在内存中累积（参数语义同 recv_until）。
+        提前结束迭代时请用 contextlib.closing 包裹或显式 close()，以便及时恢复 socket 超时。
+        """
+        stream = self._stream(max_wait_sec, recv_timeout, filter_heartbeat, subscriptions)
+        try:
+            for msg, _, _, _ in stream:
+                yield msg
+        finally:
+            stream.close()
+
+    def aggregate_until(
+        self,
+        reducers: dict,
+        stop_when: Optional[Callable[[dict], bool]],
+        max_wait_sec: float,
+        recv_timeout: float = 1.0,
+        filter_heartbeat: bool = True,
+        subscriptions: Iterable[str] = None,
+    ) -> dict:
+        """
+        流式聚合：在 max_wait_sec 内持续收包，每条消息依次交给各聚合器（core.ws_aggregators）后即丢弃，
+        直到 stop_when 返回 True 或超时；内存占用与收包时长无关。
+        :param reducers: 名称 -> 聚合器，如 {"count": ChannelCounter(), "last": LastN(10)}
+        :param stop_when: 仅支持 stop_when(msg)（不保留消息列表）；None 表示仅按超时结束；断档标记不参与判断
+        :return: 名称 -> 聚合结果（reducer.result()）
+        """
+        if stop_when_takes_messages(stop_when):
+            raise TypeError("aggregate_until 不保留消息列表，stop_when 仅支持 stop_when(msg)")
+        feeds = [reducer.feed for reducer in reducers.values()]
+        logger.info("流式聚合最多 %.1fs，聚合器：%s", max_wait_sec, ", ".join(reducers))
+        with closing(self._stream(max_wait_sec, recv_timeout, filter_heartbeat, subscriptions)) as stream:
+            for msg, raw, recv_ns, wall_ns in stream:
+                for feed in feeds:
+                    feed(msg, recv_ns, wall_ns)
+                if stop_when is not None and raw is not None and stop_when(msg):
+                    logger.info("满足终止条件，结束收包")
+                    break
+        results = {name: reducer.result() for name, reducer in reducers.items()}
+        logger.info("流式聚合结果：%s", results)
+        return results
+
+    def aggregate_for_seconds(
+        self,
+        reducers: dict,
+        duration_sec: float,
+        recv_timeout: float = 1.0,
+        filter_heartbeat: bool = True,
+        subscriptions: Iterable[str] = None,
+    ) -> dict:
+        """在指定时长内流式聚合，无提前终止条件，见 aggregate_until。"""
+        return self.aggregate_until(reducers, None, duration_sec, recv_timeout, filter_heartbeat, subscriptions)
+
+    def _recover(self, error: Exception) -> dict:
+        """
+        断线恢复：按抖动退避重连（reconnect 会重新鉴权），再按原 params 重放断线前订阅成功的频道。
+        :return: 断档标记；WS_RECONNECT_RETRIES 次均失败时连接保持关闭，标记 event 为 GAP_DISCONNECTED
+        """
+        down_at = time.monotonic()
+        replay = dict(self._subscribe_params)
+        dispatcher = self._dispatcher
+        logger.warning("WebSocket 断线（%s），开始重连，待恢复订阅：%s", error, sorted(replay))
+        attempt = 0
+        while attempt < WS_RECONNECT_RETRIES:
+            attempt += 1
+            time.sleep(reconnect_delay(attempt))
+            try:
+                self.reconnect()
+                self._dispatcher = dispatcher
+                self._resubscribe(replay)
+            except Exception as e:
+                logger.warning("WebSocket 第 %d 次重连失败: %s", attempt, e)
+                continue
+            self.reconnects += 1
+            logger.warning("WebSocket 第 %d 次重连成功，断线 %.2fs", attempt, time.monotonic() - down_at)
+            return self._gap_marker(GAP_RECONNECT, error, attempt, down_at, replay)
+        self._close_socket()
+        logger.error("WebSocket 重连 %d 次均失败，停止收包", attempt)
+        return self._gap_marker(GAP_DISCONNECTED, error, attempt, down_at, replay)
+
+    def _resubscribe(self, replay: dict) -> None:
+        """按原 params 重放订阅（同一 params 的频道合并为一次请求，仅保留仍需恢复的频道）。"""
+        done = set()
+        for channel, (signed, params) in replay.items():
+            if channel in done:
+                continue
+            channels = [c for c in _channels_of(params) if c in replay and c not in done]
+            done.update(channels)
+            subscribe = self.subscribe_signed if signed else self.subscribe
+            resp = subscribe({**params, "channels": channels})
+            if resp.get("code") != 0:
+                raise ConnectionError(f"重放订阅失败 {channels}: {resp}")
+
+    @staticmethod
+    def _gap_marker(event: str, error: Exception, attempts: int, down_at: float, replay: dict) -> dict:
+        return {
+            META_KEY: {
+                "event": event,
+                "error": repr(error),
+                "attempts": attempts,
+                "downtime_ms": int((time.monotonic() - down_at) * 1000),
+                "t": int(time.time() * 1000),
+                "subscriptions": sorted(replay),
+            }
+        }
 
     def authenticate(self, api_key: str, secret_key: str, *, params: dict = None, request_id: int = 1) -> dict:
         """
@@ -183,7 +736,11 @@ class WebSocketClient:
         )
         logger.info("WebSocket auth: method=%s id=%s", WS_AUTH_METHOD, request_id)
         self.send_json(req)
-        return self.recv_json()
+        resp = self._recv_response(req["id"])
+        if resp.get("code") == 0:
+            self._auth = {"api_key": api_key, "secret_key": secret_key, "params": params, "request_id": request_id}
+            self._authenticated = True
+        return resp
 
     def subscribe(self, params: dict, request_id: int = 1) -> dict:
         """
@@ -192,8 +749,10 @@ class WebSocketClient:
         :return: 服务端 JSON 响应（含 code、result 等）
         """
         payload = {"id": request_id, "method": "subscribe", "params": params}
+        self._ensure_clock()
         self.send_json(payload)
-        return self.recv_json()
+        self.subscriptions.update(_channels_of(params))
+        return self._track_subscribe(self._recv_response(request_id), params, signed=False)
 
     def subscribe_signed(self, params: dict, request_id: int = 23) -> dict:
         """
@@ -203,18 +762,200 @@ class WebSocketClient:
         :return: 服务端 JSON 响应（含 code、result 等）
         """
         payload = build_signed_subscribe(params, WS_API_KEY, WS_SECRET_KEY, request_id=request_id)
+        self._ensure_clock()
+        self.send_json(payload)
+        self.subscriptions.update(_channels_of(params))
+        return self._track_subscribe(self._recv_response(request_id), params, signed=True)
+
+    def sync_clock(self, samples: int = _CLOCK_SAMPLES) -> bool:
+        """
+        发送 samples 次服务端时间请求（WS_CLOCK_METHOD），以本机发送墙钟、响应中服务端处理请求时的时间戳 result.t、
+        本机接收墙钟形成往返样本，计入 client.clock。
+        :return: 是否全部成功；服务端不支持（响应 code 非 0、无 result.t 或超时未响应）时返回 False，此后 subscribe 不再自动同步
+        """
+        if not WS_CLOCK_METHOD:
+            return False
+        for i in range(samples):
+            request_id = _CLOCK_REQUEST_ID + i
+            send_ms = time.time_ns() / 1e6
+            self.send_json({"id": request_id, "method": WS_CLOCK_METHOD})
+            try:
+                resp = self._recv_response(request_id)
+            except websocket.WebSocketTimeoutException:
+                resp = {}  # 服务端不响应未知 method 时按不支持处理
+            # 未启用分发器时响应帧即最近读到的帧；分发器下响应可能由其他调用方先读入队列，取当前时刻（误差界仍成立，只是更宽）
+            recv_ms = (self.last_recv_wall_ns if self._dispatcher is None else time.time_ns()) / 1e6
+            server_ms = (resp.get("result") or {}).get("t") if resp.get("code") == 0 else None
+            if server_ms is None:
+                self._clock_unsupported = True
+                logger.warning("服务端时间请求 %s 不可用，时钟偏移按 0 计：%s", WS_CLOCK_METHOD, resp)
+                return False
+            self.clock.add_sample(send_ms, server_ms, recv_ms)
+        logger.info("服务端时钟偏移：%s", self.clock.summary())
+        return True
+
+    def _ensure_clock(self) -> None:
+        """统计发布延迟且时钟尚无样本时，先同步服务端时钟（订阅推送开始前完成，不占用被测推送）。"""
+        if self.latency is not None and not self.clock.ready and not self._clock_unsupported:
+            self.sync_clock()
+
+    def _track_subscribe(self, resp: dict, params: dict, signed: bool) -> dict:
+        """记录订阅成功的频道及其 params（断线恢复时重放）。"""
+        if resp.get("code") == 0:
+            for channel in _channels_of(params):
+                self._subscribe_params[channel] = (signed, params)
+        return resp
+
+    def unsubscribe(self, params: dict, request_id: int = 1) -> dict:
+        """
+        发送 unsubscribe 请求，并返回服务端响应。
+        :param params: unsubscribe 的 params，如 {"channels": ["book.BTCUSD-PERP.10"]}
+        """
+        payload = {"id": request_id, "method": "unsubscribe", "params": params}
         self.send_json(payload)
-        return self.recv_json()
+        for channel in _channels_of(params):
+            self.subscriptions.discard(channel)
+            self._subscribe_params.pop(channel, None)
+        return self._recv_response(request_id)
+
+    def drain(
+        self,
+        quiet_sec: float = 0.2,
+        max_sec: float = 2.0,
+        respond_heartbeat: bool = True,
+        until_id: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        读掉连接上已到达及在途的帧，直到连续 quiet_sec 秒无新帧；期间收到 heartbeat 时回复 public/respond-heartbeat。
+        :param until_id: 先等到该 id 的响应（如 unsubscribe 的确认）再开始计静默时间
+        :return: 丢弃的帧数；max_sec 内帧未停止（或未等到 until_id 的响应）返回 None。连接已关闭时抛 WebSocketConnectionClosedException
+        """
+        deadline = time.monotonic() + max_sec
+        count = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            raw = self._pump_frame(min(quiet_sec, remaining))
+            if raw is None:
+                if until_id is None and remaining >= quiet_sec:
+                    return count
+                continue
+            count += 1
+            if until_id is None and not (respond_heartbeat and _HEARTBEAT_MARK[type(raw)] in raw):
+                continue
+            msg = json_codec.loads(raw)
+            if respond_heartbeat and self.is_heartbeat(msg):
+                self._respond_heartbeat(msg)
+            elif until_id is not None and msg.get("id") == until_id:
+                until_id = None
+
+    def reset(self, quiet_sec: float = 0.05, max_sec: float = 2.0) -> bool:
+        """
+        把连接复位到刚建立时的状态（保留鉴权）：输出本次使用期间的发布延迟与压缩统计，退订已记录的频道并等到退订确认、
+        读掉残留帧、丢弃分发器，最后清空测量状态（见 reset_stats）。
+        :return: 残留帧是否在 max_sec 内读完（False 表示仍在持续收到推送，连接不宜复用）
+        """
+        # 池化连接不逐用例 close，测量结果在复位时输出，归属当前用例
+        if self.deflate_stats is not None and self.deflate_stats.messages:
+            self._publish_deflate()
+        if self.latency is not None:
+            self._publish_latency()
+        until_id = None
+        if self.subscriptions:
+            until_id = _RESET_REQUEST_ID
+            channels = sorted(self.subscriptions)
+            self.send_json({"id": until_id, "method": "unsubscribe", "params": {"channels": channels}})
+            self.subscriptions.clear()
+            self._subscribe_params.clear()
+        self._dispatcher = None
+        drained = self.drain(quiet_sec, max_sec, until_id=until_id)
+        self.reset_stats()
+        if drained is None:
+            logger.warning("WebSocket 复位：%.1f 秒内残留帧未读完", max_sec)
+            return False
+        logger.info("WebSocket 复位：丢弃 %d 条残留帧", drained)
+        return True
+
+    def reset_stats(self) -> None:
+        """
+        清空逐用例的测量状态：时钟偏移样本、发布延迟、重连次数与压缩统计计数。
+        解压上下文与鉴权保留；连接池复位及租出时调用，避免上一个用例的样本被下一个用例当作自己的结果。
+        """
+        self.clock = ClockOffsetEstimator()
+        if self.latency is not None:
+            self.latency = type(self.latency)(self.clock)
+        self.reconnects = 0
+        if self.deflate_stats is not None:
+            self.deflate_stats.reset_counters()
 
     def close(self) -> None:
-        """关闭连接。"""
+        """关闭连接并输出本连接的压缩统计与发布延迟；启用读线程时先停止读线程并输出缓冲统计。"""
+        was_open = self._ws is not None
+        self._close_socket()
+        if was_open and self.deflate_stats is not None and self.deflate_stats.messages:
+            self._publish_deflate()
+        if self.latency is not None:
+            self._publish_latency()
+
+    def _close_socket(self) -> None:
+        """只关闭 socket、读线程与抓包文件并丢弃暂存帧，不输出统计（reconnect 与 close 共用）。"""
         if self._ws:
             logger.info("WebSocket closing")
             try:
-                self._ws.close()
+                if self._reader is not None:
+                    self._stop_reader_thread()
+                else:
+                    self._ws.close()
             except Exception as e:
                 logger.warning("WebSocket close error: %s", e)
             self._ws = None
+        self._pending.clear()
+        if self._capture is not None:
+            self._capture.close()
+            self._capture = None
+
+    def _publish_latency(self) -> None:
+        """按 channel 输出发布到接收延迟分位数（日志 + Allure 附件）。"""
+        summary = self.latency.result()
+        if not any(key != "clock" for key in summary):
+            return
+        logger.info("WebSocket 发布到接收延迟：%s", summary)
+        allure.attach(
+            json.dumps(summary, ensure_ascii=False, indent=2),
+            name="WebSocket Publish Latency",
+            attachment_type=allure.attachment_type.JSON,
+        )
+
+    def _publish_deflate(self) -> None:
+        """输出本连接压缩前后字节与解压 CPU 时间（日志 + Allure 附件）。"""
+        summary = self.deflate_stats.summary()
+        logger.info("WebSocket permessage-deflate 统计：%s", summary)
+        allure.attach(
+            json.dumps(summary, ensure_ascii=False, indent=2),
+            name="WebSocket Compression",
+            attachment_type=allure.attachment_type.JSON,
+        )
+
+    def _stop_reader_thread(self) -> None:
+        """发送关闭帧，读线程收到服务端关闭帧后退出；超时未退出则强制断开 socket。"""
+        self._stop_reader.set()
+        self._buffer.close()
+        try:
+            self._ws.send_close()
+        except Exception as e:
+            logger.debug("WebSocket send_close error: %s", e)
+        self._reader.join(_READER_JOIN_SEC)
+        if self._reader.is_alive():
+            self._ws.abort()
+            self._reader.join(_READER_JOIN_SEC)
+        self._ws.shutdown()
+        self._reader = None
+        stats = self._buffer.stats()
+        if stats["dropped"]:
+            logger.warning("WebSocket reader 缓冲溢出：%s", stats)
+        else:
+            logger.info("WebSocket reader 缓冲统计：%s", stats)
 
     # ========== 消息过滤工具方法 ==========
 
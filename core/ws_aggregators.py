@@ -0,0 +1,174 @@
+"""
+WebSocket 流式聚合：长时间订阅时不保留消息列表，逐条交给聚合器累积，内存占用与收包时长无关。
+配合 WebSocketClient.aggregate_until / aggregate_for_seconds 使用，也可自行调用 feed(msg, recv_ns, wall_ns)。
+内置聚合器：
+- ChannelCounter：按 channel（或 subscription）计数
+- InterArrivalHistogram：相邻消息到达间隔的对数分桶直方图（core.metrics.LogHistogram），可按 channel 分开统计
+- LastN：最近 N 条消息
+- TimeRange：消息时间字段 t 的最小 / 最大值
+- PublishLatency：按 channel 统计发布到接收的延迟（服务端 t 按 core.ws_latency 估计的时钟偏移换算到本机时钟）
+自定义聚合器继承 Reducer，实现 feed 与 result 即可。
+断线恢复插入的断档标记（core.websocket_client.META_KEY）同样会交给聚合器，各聚合器自行决定如何处理。
+"""
+from collections import Counter, deque
+from typing import Optional
+
+from core.metrics import LogHistogram
+from core.websocket_client import META_KEY
+
+_NS_PER_SEC = 1_000_000_000
+
+
+def data_field(msg: dict, field: str):
+    """推送消息 result.data[0] 中的字段（如 t / u），不存在返回 None。"""
+    result = msg.get("result")
+    data = result.get("data") if isinstance(result, dict) else None
+    if isinstance(data, list) and data and isinstance(data[0], dict):
+        return data[0].get(field)
+    return None
+
+
+def message_channel(msg: dict, field: str = "channel") -> str:
+    """消息的分组键：result.<field>（如 channel / subscription），无 result 时取 method；断档标记为 META_KEY。"""
+    if META_KEY in msg:
+        return META_KEY
+    result = msg.get("result")
+    if isinstance(result, dict) and result.get(field):
+        return result[field]
+    return msg.get("method") or "unknown"
+
+
+class Reducer:
+    """聚合器基类：feed 逐条累积（只保留有界状态），result 返回当前汇总。"""
+
+    def feed(self, msg: dict, recv_ns: int, wall_ns: int) -> None:
+        """
+        :param msg: 已解析的消息
+        :param recv_ns: 本地接收时刻（time.monotonic_ns()）
+        :param wall_ns: 本地接收墙钟（time.time_ns()）
+        """
+        raise NotImplementedError
+
+    def result(self):
+        raise NotImplementedError
+
+
+class ChannelCounter(Reducer):
+    """按 channel 计数（field="subscription" 时按订阅计数）。"""
+
+    def __init__(self, field: str = "channel"):
+        self.field = field
+        self.counts = Counter()
+
+    def feed(self, msg: dict, recv_ns: int, wall_ns: int) -> None:
+        self.counts[message_channel(msg, self.field)] += 1
+
+    def result(self) -> dict:
+        return dict(self.counts)
+
+
+class InterArrivalHistogram(Reducer):
+    """
+    相邻消息本地到达间隔的直方图（p50/p90/p99/max_ms/count）。
+    per_channel=True 时按 channel 分别统计；断档标记处重新开始，断线期间不计入间隔。
+    """
+
+    def __init__(self, per_channel: bool = False, field: str = "channel"):
+        self.per_channel = per_channel
+        self.field = field
+        self._hists = {}
+        self._last_ns = {}
+
+    def feed(self, msg: dict, recv_ns: int, wall_ns: int) -> None:
+        if META_KEY in msg:
+            self._last_ns.clear()
+            return
+        key = message_channel(msg, self.field) if self.per_channel else None
+        last = self._last_ns.get(key)
+        self._last_ns[key] = recv_ns
+        if last is None:
+            return
+        hist = self._hists.get(key)
+        if hist is None:
+            hist = self._hists[key] = LogHistogram()
+        hist.record((recv_ns - last) / _NS_PER_SEC)
+
+    def result(self) -> dict:
+        if not self.per_channel:
+            hist = self._hists.get(None)
+            return (hist or LogHistogram()).summary()
+        return {key: hist.summary() for key, hist in self._hists.items()}
+
+
+class LastN(Reducer):
+    """最近 n 条消息（按到达顺序）。"""
+
+    def __init__(self, n: int = 100):
+        self.messages = deque(maxlen=n)
+
+    def feed(self, msg: dict, recv_ns: int, wall_ns: int) -> None:
+        self.messages.append(msg)
+
+    def result(self) -> list:
+        return list(self.messages)
+
+
+class TimeRange(Reducer):
+    """消息时间字段（默认 result.data[0].t）的最小值、最大值及有该字段的消息数。"""
+
+    def __init__(self, field: str = "t"):
+        self.field = field
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self.count = 0
+
+    def feed(self, msg: dict, recv_ns: int, wall_ns: int) -> None:
+        t = data_field(msg, self.field)
+        if t is None:
+            return
+        self.count += 1
+        if self.min is None or t < self.min:
+            self.min = t
+        if self.max is None or t > self.max:
+            self.max = t
+
+    def result(self) -> dict:
+        span = self.max - self.min if self.count else None
+        return {"min": self.min, "max": self.max, "span_ms": span, "count": self.count}
+
+
+class PublishLatency(Reducer):
+    """
+    发布到接收的延迟：本机接收墙钟 - (消息 t - 服务端时钟偏移)，按 channel 记入对数分桶直方图。
+    时钟偏移取自 clock（core.ws_latency.ClockOffsetEstimator，如 client.clock），None 表示按两端时钟一致计算；
+    偏移误差导致的负延迟按 0 记录并单独计数。
+    """
+
+    def __init__(self, clock=None, field: str = "channel", t_field: str = "t"):
+        self.clock = clock
+        self.field = field
+        self.t_field = t_field
+        self._hists = {}
+        self.negative = Counter()
+
+    def feed(self, msg: dict, recv_ns: int, wall_ns: int) -> None:
+        t = data_field(msg, self.t_field)
+        if t is None:
+            return
+        offset = self.clock.offset_ms if self.clock is not None else 0.0
+        latency_ms = wall_ns / 1e6 - (t - offset)
+        key = message_channel(msg, self.field)
+        hist = self._hists.get(key)
+        if hist is None:
+            hist = self._hists[key] = LogHistogram()
+        if latency_ms < 0:
+            self.negative[key] += 1
+            latency_ms = 0.0
+        hist.record(latency_ms / 1000)
+
+    def result(self) -> dict:
+        """channel -> {p50_ms, p90_ms, p99_ms, max_ms, count, negative}；含 clock 时附带偏移估计（键 "clock"）。"""
+        out = {key: {**hist.summary(), "negative": self.negative[key]} for key, hist in self._hists.items()}
+        if self.clock is not None:
+            out["clock"] = self.clock.summary()
+        return out
@@ -0,0 +1,109 @@
+"""
+WebSocket 收包环形缓冲：后台读线程写入、用例线程消费，容量有界。
+缓冲满时按 drop_policy 处理：
+- oldest（默认）：丢弃最早的一帧，保留最新数据
+- newest：丢弃新到的帧，保留已缓冲数据
+- block：读线程等待消费者腾出空间（数据积压回内核 socket 缓冲，最终由 TCP 流控反压服务端）
+消费端基于 Condition 等待，有帧到达立即唤醒，无需轮询超时。
+"""
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+DROP_OLDEST = "oldest"
+DROP_NEWEST = "newest"
+DROP_BLOCK = "block"
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST, DROP_BLOCK)
+
+
+class FrameBuffer:
+    """有界帧缓冲（线程安全），统计写入、丢弃与最大积压。"""
+
+    def __init__(self, capacity: int, drop_policy: str = DROP_OLDEST):
+        """
+        :param capacity: 最多缓冲的帧数
+        :param drop_policy: 缓冲满时的处理方式，oldest / newest / block
+        """
+        if capacity <= 0:
+            raise ValueError(f"capacity 必须大于 0，实际 {capacity}")
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"drop_policy 仅支持 {DROP_POLICIES}，实际 {drop_policy!r}")
+        self.capacity = capacity
+        self.drop_policy = drop_policy
+        self._frames = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self.received = 0
+        self.dropped = 0
+        self.high_watermark = 0
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, frame) -> bool:
+        """写入一帧；返回是否写入（newest 策略下缓冲满返回 False，缓冲已关闭也返回 False）。"""
+        with self._cond:
+            self.received += 1
+            if len(self._frames) >= self.capacity:
+                if self.drop_policy == DROP_OLDEST:
+                    self._frames.popleft()
+                    self.dropped += 1
+                elif self.drop_policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                else:
+                    while len(self._frames) >= self.capacity and not self._closed:
+                        self._cond.wait()
+            if self._closed:
+                return False
+            self._frames.append(frame)
+            if len(self._frames) > self.high_watermark:
+                self.high_watermark = len(self._frames)
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None):
+        """
+        取出最早的一帧；timeout 内无帧返回 None。
+        缓冲已关闭且为空时：读线程异常关闭则抛出该异常，否则返回 None。
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._frames:
+                if self._closed:
+                    if self._error is not None:
+                        raise self._error
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            frame = self._frames.popleft()
+            if self.drop_policy == DROP_BLOCK:
+                self._cond.notify_all()
+            return frame
+
+    def close(self, error: BaseException = None) -> None:
+        """关闭缓冲（读线程退出时调用）：唤醒所有等待者；已缓冲的帧仍可被取出。"""
+        with self._cond:
+            self._closed = True
+            self._error = error
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """received：读线程收到的帧数；dropped：因缓冲满丢弃的帧数；high_watermark：最大积压帧数。"""
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "drop_policy": self.drop_policy,
+                "received": self.received,
+                "dropped": self.dropped,
+                "buffered": len(self._frames),
+                "high_watermark": self.high_watermark,
+            }
@@ -0,0 +1,162 @@
+"""
+WebSocket 原始帧抓包：把每一帧完整内容连同本地单调时钟接收时间追加写入磁盘，用例失败后可离线回放（见 core.ws_replay）。
+文件格式（只追加，不做逐帧 fsync）：
+- 文件头：FILE_MAGIC（8 字节）
+- 每帧：<int64 接收时间 ns（time.monotonic_ns）><uint32 载荷长度><uint8 标志> + 载荷
+  标志位：FLAG_BINARY 二进制帧 / FLAG_ZLIB 载荷经 zlib 压缩 / FLAG_SENT 本端发送的帧
+读取端 mmap 整个文件并逐帧惰性解析，不一次性载入内存；进程异常退出导致的末尾残缺帧会被忽略。
+"""
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from typing import Iterator, NamedTuple, Optional
+
+from config.settings import WS_CAPTURE_COMPRESS, WS_CAPTURE_DIR
+from core import json_codec
+from core.logger import get_logger
+
+logger = get_logger("ws_capture")
+
+FILE_MAGIC = b"WSCAP01\n"
+CAPTURE_SUFFIX = ".wscap"
+
+FLAG_BINARY = 0x01
+FLAG_ZLIB = 0x02
+FLAG_SENT = 0x04
+
+_HEADER = struct.Struct("<qIB")
+# 写入缓冲大小：帧先进入用户态缓冲，满或关闭时才落盘
+_WRITE_BUFFER_BYTES = 1 << 16
+# 小于该长度的帧不压缩（压缩收益低于开销）
+_COMPRESS_MIN_BYTES = 256
+
+
+def capture_path_for(name: str) -> Optional[str]:
+    """按名称（如用例 nodeid）生成抓包文件路径；未配置 WS_CAPTURE_DIR 时返回 None（不抓包）。"""
+    if not WS_CAPTURE_DIR:
+        return None
+    safe = re.sub(r"[^\w.-]+", "_", name).strip("_")
+    return os.path.join(WS_CAPTURE_DIR, f"{safe}_{time.strftime('%Y%m%d_%H%M%S')}{CAPTURE_SUFFIX}")
+
+
+class FrameCapture:
+    """抓包写入端（线程安全）：后台读线程与用例线程可同时写入。"""
+
+    def __init__(self, path: str, compress: bool = None):
+        """
+        :param path: 抓包文件路径，已存在则追加
+        :param compress: 是否以 zlib 压缩载荷，默认 WS_CAPTURE_COMPRESS
+        """
+        self.path = path
+        self.compress = WS_CAPTURE_COMPRESS if compress is None else compress
+        self.frames = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "ab", buffering=_WRITE_BUFFER_BYTES)
+        if self._file.tell() == 0:
+            self._file.write(FILE_MAGIC)
+
+    def write(self, frame: str | bytes, sent: bool = False, ts_ns: int = None, binary: bool = None) -> None:
+        """
+        追加一帧；ts_ns 默认取当前 time.monotonic_ns()。
+        binary 默认按类型推断（str 为文本帧，bytes 为二进制帧）；未解码的文本帧以 bytes 传入时指定 binary=False。
+        """
+        ts_ns = time.monotonic_ns() if ts_ns is None else ts_ns
+        if isinstance(frame, str):
+            payload = frame.encode("utf-8")
+        else:
+            payload = bytes(frame)
+        if binary is None:
+            binary = not isinstance(frame, str)
+        flags = FLAG_BINARY if binary else 0
+        if sent:
+            flags |= FLAG_SENT
+        if self.compress and len(payload) >= _COMPRESS_MIN_BYTES:
+            payload, flags = zlib.compress(payload, 1), flags | FLAG_ZLIB
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(_HEADER.pack(ts_ns, len(payload), flags))
+            self._file.write(payload)
+            self.frames += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        logger.info("WebSocket 抓包已写入 %s（%d 帧）", self.path, self.frames)
+
+
+class CapturedFrame(NamedTuple):
+    """一帧抓包：接收（或发送）时刻的 monotonic 纳秒时间戳、帧内容、是否为本端发送。"""
+
+    ts_ns: int
+    data: str | bytes
+    sent: bool
+
+    def json(self) -> dict:
+        return json_codec.loads(self.data)
+
+
+class CaptureReader:
+    """抓包读取端：mmap 文件后逐帧惰性迭代。"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if self._mm[:len(FILE_MAGIC)] != FILE_MAGIC:
+            self.close()
+            raise ValueError(f"不是 WebSocket 抓包文件: {path}")
+
+    def __iter__(self) -> Iterator[CapturedFrame]:
+        """按写入顺序迭代全部帧（含本端发送的帧）。"""
+        mm = self._mm
+        size = len(mm)
+        offset = len(FILE_MAGIC)
+        while offset + _HEADER.size <= size:
+            ts_ns, length, flags = _HEADER.unpack_from(mm, offset)
+            start = offset + _HEADER.size
+            end = start + length
+            if end > size:
+                logger.warning("抓包文件末尾帧不完整，已忽略：%s offset=%d", self.path, offset)
+                return
+            payload = mm[start:end]
+            if flags & FLAG_ZLIB:
+                payload = zlib.decompress(payload)
+            data = payload if flags & FLAG_BINARY else payload.decode("utf-8")
+            yield CapturedFrame(ts_ns, data, bool(flags & FLAG_SENT))
+            offset = end
+
+    def received(self) -> Iterator[CapturedFrame]:
+        """仅迭代收到的帧。"""
+        return (frame for frame in self if not frame.sent)
+
+    def messages(self) -> Iterator[dict]:
+        """收到的帧逐条解析为 JSON。"""
+        return (frame.json() for frame in self.received())
+
+    def close(self) -> None:
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._mm = b""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "CaptureReader":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,161 @@
+"""
+WebSocket permessage-deflate（RFC 7692）：握手时协商压缩，收到的压缩消息在帧读取层解压，并按连接统计带宽与解压 CPU。
+websocket-client 本身不支持扩展（收到 RSV1 帧直接报协议错误），这里替换连接的 frame_buffer：
+- 握手：offer_header 生成 Sec-WebSocket-Extensions 请求头，server_max_window_bits 限制服务端压缩窗口（即本端解压窗口）
+- 协商结果：parse_response 解析服务端响应头，未接受则不替换 frame_buffer，连接按不压缩处理
+- 解压：RSV1 数据帧清除 RSV1 后交给 websocket-client 原有校验，载荷（含分片）以同一 zlib 流解压后再拼接消息
+- 本端发送的请求体积很小，不压缩（RFC 7692 允许逐消息选择是否压缩）
+统计项：消息数、压缩消息数、线上载荷字节（压缩后）、解压后字节、解压 CPU 时间（time.thread_time_ns，读线程模式计读线程）。
+"""
+import re
+import time
+import zlib
+from typing import Optional
+
+from websocket import ABNF, frame_buffer
+
+EXTENSION_NAME = "permessage-deflate"
+# RFC 7692 7.2.2：每条压缩消息末尾被省略的空 stored block，解压时补回
+_DEFLATE_TAIL = b"\x00\x00\xff\xff"
+# zlib 不支持 8 位窗口的 raw deflate（aiohttp 等服务端同样只接受 9 ~ 15）
+MIN_WINDOW_BITS = 9
+MAX_WINDOW_BITS = 15
+
+_PARAM_RE = re.compile(r"\s*([\w-]+)\s*(?:=\s*\"?(\d+)\"?)?\s*")
+
+
+def offer_header(window_bits: int = MAX_WINDOW_BITS) -> str:
+    """握手请求头：请求 permessage-deflate，window_bits 小于 15 时要求服务端以该窗口压缩（降低双方内存占用）。"""
+    if not MIN_WINDOW_BITS <= window_bits <= MAX_WINDOW_BITS:
+        raise ValueError(f"window_bits 须在 {MIN_WINDOW_BITS} ~ {MAX_WINDOW_BITS} 之间: {window_bits}")
+    value = EXTENSION_NAME
+    if window_bits < MAX_WINDOW_BITS:
+        value += f"; server_max_window_bits={window_bits}"
+    return f"Sec-WebSocket-Extensions: {value}"
+
+
+def parse_response(value: Optional[str]) -> Optional[dict]:
+    """
+    解析服务端响应的 Sec-WebSocket-Extensions：接受 permessage-deflate 时返回
+    {"window_bits": 服务端压缩窗口, "no_context_takeover": 服务端是否逐消息重置压缩上下文}，否则返回 None。
+    """
+    for ext in (value or "").split(","):
+        name, *params = ext.split(";")
+        if name.strip().lower() != EXTENSION_NAME:
+            continue
+        agreed = {"window_bits": MAX_WINDOW_BITS, "no_context_takeover": False}
+        for param in params:
+            match = _PARAM_RE.fullmatch(param)
+            if not match:
+                continue
+            key, number = match.group(1).lower(), match.group(2)
+            if key == "server_max_window_bits" and number:
+                agreed["window_bits"] = int(number)
+            elif key == "server_no_context_takeover":
+                agreed["no_context_takeover"] = True
+        return agreed
+    return None
+
+
+class DeflateStats:
+    """单个连接的解压器与带宽 / CPU 统计（由收包线程写入）。"""
+
+    def __init__(self, window_bits: int = MAX_WINDOW_BITS, no_context_takeover: bool = False):
+        self.window_bits = window_bits
+        self.no_context_takeover = no_context_takeover
+        self._inflater = zlib.decompressobj(-window_bits)
+        self.reset_counters()
+
+    def reset_counters(self) -> None:
+        """清零统计计数（解压上下文保留，连接复用时按用例分别统计）。"""
+        self.messages = 0
+        self.compressed_messages = 0
+        self.compressed_bytes = 0
+        self.uncompressed_bytes = 0
+        self.cpu_ns = 0
+
+    def add_counters(self, other: "DeflateStats") -> None:
+        """累加另一统计的计数（断线重连后沿用重连前的计数，关闭时一并输出）。"""
+        self.messages += other.messages
+        self.compressed_messages += other.compressed_messages
+        self.compressed_bytes += other.compressed_bytes
+        self.uncompressed_bytes += other.uncompressed_bytes
+        self.cpu_ns += other.cpu_ns
+
+    def inflate(self, payload: bytes, fin: bool) -> bytes:
+        """解压一帧载荷；fin 为消息最后一帧时补回省略的块尾。"""
+        start = time.thread_time_ns()
+        data = self._inflater.decompress(payload)
+        if fin:
+            data += self._inflater.decompress(_DEFLATE_TAIL)
+            if self.no_context_takeover:
+                self._inflater = zlib.decompressobj(-self.window_bits)
+        self.cpu_ns += time.thread_time_ns() - start
+        self.compressed_bytes += len(payload)
+        self.uncompressed_bytes += len(data)
+        if fin:
+            self.messages += 1
+            self.compressed_messages += 1
+        return data
+
+    def count_plain(self, payload: bytes, fin: bool) -> None:
+        """未压缩的数据帧：线上字节即解压后字节。"""
+        self.compressed_bytes += len(payload)
+        self.uncompressed_bytes += len(payload)
+        if fin:
+            self.messages += 1
+
+    def summary(self) -> dict:
+        """消息数、压缩前后字节、压缩比、节省比例、解压 CPU 总耗时（ms）与每条压缩消息平均耗时（µs）。"""
+        ratio = self.uncompressed_bytes / self.compressed_bytes if self.compressed_bytes else None
+        saved = 1 - self.compressed_bytes / self.uncompressed_bytes if self.uncompressed_bytes else None
+        per_msg = self.cpu_ns / self.compressed_messages / 1000 if self.compressed_messages else None
+        return {
+            "window_bits": self.window_bits,
+            "no_context_takeover": self.no_context_takeover,
+            "messages": self.messages,
+            "compressed_messages": self.compressed_messages,
+            "compressed_bytes": self.compressed_bytes,
+            "uncompressed_bytes": self.uncompressed_bytes,
+            "ratio": None if ratio is None else round(ratio, 3),
+            "saved_pct": None if saved is None else round(saved * 100, 1),
+            "decompress_cpu_ms": round(self.cpu_ns / 1e6, 3),
+            "cpu_us_per_msg": None if per_msg is None else round(per_msg, 2),
+        }
+
+
+class DeflateFrameBuffer(frame_buffer):
+    """接受 RSV1 压缩帧的 frame_buffer：读到帧头时记录并清除 RSV1，整帧读完后解压载荷。"""
+
+    def __init__(self, recv_fn, skip_utf8_validation: bool, stats: DeflateStats):
+        super().__init__(recv_fn, skip_utf8_validation)
+        self.stats = stats
+        self._frame_compressed = False
+        # 当前（分片）消息是否压缩：首帧 RSV1 决定，续帧沿用
+        self._message_compressed = False
+
+    def recv_header(self) -> None:
+        super().recv_header()
+        fin, rsv1, rsv2, rsv3, opcode, has_mask, length_bits = self.header
+        # 仅数据首帧允许 RSV1；续帧 / 控制帧带 RSV1 仍交给原有校验报协议错误
+        self._frame_compressed = bool(rsv1) and opcode in (ABNF.OPCODE_TEXT, ABNF.OPCODE_BINARY)
+        if self._frame_compressed:
+            self.header = (fin, 0, rsv2, rsv3, opcode, has_mask, length_bits)
+
+    def recv_frame(self) -> ABNF:
+        frame = super().recv_frame()
+        if frame.opcode in (ABNF.OPCODE_TEXT, ABNF.OPCODE_BINARY):
+            self._message_compressed = self._frame_compressed
+        elif frame.opcode != ABNF.OPCODE_CONT:
+            return frame
+        if self._message_compressed:
+            frame.data = self.stats.inflate(frame.data, bool(frame.fin))
+        else:
+            self.stats.count_plain(frame.data, bool(frame.fin))
+        return frame
+
+
+def install(ws, stats: DeflateStats) -> None:
+    """握手完成后替换连接的 frame_buffer（握手阶段逐行读取响应头，此时帧缓冲为空）。"""
+    old = ws.frame_buffer
+    ws.frame_buffer = DeflateFrameBuffer(old.recv, old.skip_utf8_validation, stats)
@@ -0,0 +1,203 @@
+"""
+WebSocket 消息分发：同一连接承载多个订阅时，按路由键把每条消息分到各自队列或回调。
+路由键：
+- 推送消息（result.subscription 存在）：subscription，如 "book.BTCUSD-PERP.10"
+- 请求响应（id 存在且不为 -1）：请求 id（int）
+- 其他：DEFAULT_KEY
+heartbeat 默认不进入队列（仅计数），传入 respond_heartbeat 时先回复 public/respond-heartbeat，长时间 get / get_until 不会被服务端断开。
+各路由键队列有界（默认 WS_BUFFER_SIZE 条），满时丢弃最早的消息并按键计入 dropped。
+分发器本身不持有读线程：消费者调用 get / get_until / pump_for 时，由其中一个调用方从连接读帧并分发（同一时刻只有一个读者），
+其余调用方等待各自队列被写入；连接启用后台读线程时帧来自其有界缓冲。
+"""
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from typing import Callable, Hashable, Optional, Union
+
+from config.settings import WS_BUFFER_SIZE
+from core import json_codec
+from core.logger import get_logger
+from core.websocket_client import stop_when_takes_messages
+
+logger = get_logger("ws_dispatcher")
+
+# 未能按 subscription / id 路由的消息
+DEFAULT_KEY = "*"
+
+
+def route_key(msg: dict) -> Hashable:
+    """消息的路由键：subscription > 响应 id > DEFAULT_KEY。"""
+    result = msg.get("result")
+    if isinstance(result, dict) and result.get("subscription"):
+        return result["subscription"]
+    request_id = msg.get("id")
+    if request_id is not None and request_id != -1:
+        return request_id
+    return DEFAULT_KEY
+
+
+class MessageDispatcher:
+    """按路由键把消息分发到队列（get 取出）或回调（on 注册，在读帧的线程中同步调用，异常向上抛出）。"""
+
+    def __init__(
+        self,
+        recv_frame: Callable[[float], Union[str, bytes, None]],
+        filter_heartbeat: bool = True,
+        respond_heartbeat: Optional[Callable[[dict], None]] = None,
+        max_queue: int = None,
+    ):
+        """
+        :param recv_frame: 读取一帧的函数，recv_frame(timeout) 超时返回 None
+        :param filter_heartbeat: 是否丢弃 public/heartbeat 消息（默认 True）
+        :param respond_heartbeat: 收到 heartbeat 时的回复函数（在读帧的线程中调用）；None 表示不回复
+        :param max_queue: 每个路由键队列的最大条数，默认 WS_BUFFER_SIZE；满时丢弃最早的消息
+        """
+        self._recv_frame = recv_frame
+        self.filter_heartbeat = filter_heartbeat
+        self.respond_heartbeat = respond_heartbeat
+        self.max_queue = max_queue or WS_BUFFER_SIZE
+        self._queues = defaultdict(lambda: deque(maxlen=self.max_queue))
+        self._callbacks = {}
+        self._cond = threading.Condition()
+        self._pumping = False
+        self.routed = Counter()
+        self.dropped = Counter()
+        self.heartbeats = 0
+
+    def on(self, key: Hashable, callback: Callable[[dict], None]) -> None:
+        """为路由键注册回调；该键已排队的消息立即交给回调。"""
+        with self._cond:
+            self._callbacks[key] = callback
+            queued = self._queues.pop(key, ())
+        for msg in queued:
+            callback(msg)
+
+    def off(self, key: Hashable) -> None:
+        """取消回调，之后该键的消息重新进入队列。"""
+        with self._cond:
+            self._callbacks.pop(key, None)
+
+    def dispatch(self, msg: dict) -> None:
+        """分发一条已解析的消息。"""
+        if msg.get("method") == "public/heartbeat":
+            if self.respond_heartbeat is not None:
+                self.respond_heartbeat(msg)
+            if self.filter_heartbeat:
+                self.heartbeats += 1
+                return
+        key = route_key(msg)
+        with self._cond:
+            self.routed[key] += 1
+            callback = self._callbacks.get(key)
+            if callback is None:
+                queue = self._queues[key]
+                if len(queue) == self.max_queue:
+                    if not self.dropped[key]:
+                        logger.warning("[%s] 分发队列已满（%d 条），开始丢弃最早的消息", key, self.max_queue)
+                    self.dropped[key] += 1
+                queue.append(msg)
+                self._cond.notify_all()
+                return
+        callback(msg)
+
+    def pending(self, key: Hashable) -> int:
+        """该键队列中尚未取出的消息数。"""
+        with self._cond:
+            return len(self._queues.get(key, ()))
+
+    def _pump(self, deadline: float) -> bool:
+        """读一帧并分发（需已持有读者身份）；deadline 前无帧返回 False。"""
+        raw = self._recv_frame(max(0.0, deadline - time.monotonic()))
+        if raw is None:
+            return False
+        # json_codec 直接解析 bytes（orjson 时免去 decode 复制）
+        self.dispatch(json_codec.loads(raw))
+        return True
+
+    def _release_pump(self) -> None:
+        with self._cond:
+            self._pumping = False
+            self._cond.notify_all()
+
+    def get(self, key: Hashable, timeout: float) -> Optional[dict]:
+        """取出该键的下一条消息；timeout（秒）内没有则返回 None。"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                queue = self._queues.get(key)
+                if queue:
+                    return queue.popleft()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                if self._pumping:
+                    # 其他调用方正在读帧，等待其分发（任一键有新消息都会唤醒，重查本键队列）
+                    self._cond.wait(remaining)
+                    continue
+                self._pumping = True
+            try:
+                self._pump(deadline)
+            finally:
+                self._release_pump()
+
+    def get_until(
+        self,
+        key: Hashable,
+        stop_when: Union[Callable[[dict], bool], Callable[[dict, list], bool], None],
+        max_wait_sec: float,
+    ) -> list:
+        """
+        在 max_wait_sec 内持续取该键的消息，直到 stop_when 返回 True 或超时，语义同 WebSocketClient.recv_until。
+        :param key: 路由键（subscription 或请求 id）
+        :param stop_when: stop_when(msg) 或 stop_when(msg, messages)；None 表示仅按超时结束
+        :param max_wait_sec: 最大等待时间（秒）
+        :return: 该键的消息列表
+        """
+        takes_messages = stop_when_takes_messages(stop_when)
+        messages = []
+        deadline = time.monotonic() + max_wait_sec
+        while True:
+            msg = self.get(key, deadline - time.monotonic())
+            if msg is None:
+                break
+            messages.append(msg)
+            if stop_when is not None and (stop_when(msg, messages) if takes_messages else stop_when(msg)):
+                break
+        logger.info("[%s] 分发收包结束，共 %d 条", key, len(messages))
+        return messages
+
+    def collect(self, key: Hashable, duration_sec: float) -> list:
+        """在指定时长内收集该键的全部消息。"""
+        return self.get_until(key, None, duration_sec)
+
+    def pump_for(self, duration_sec: float) -> int:
+        """
+        持续读帧并分发 duration_sec 秒（用于只注册了回调、没有 get 调用方的场景），返回本次读到的帧数。
+        其他线程正在读帧时本调用只等待。
+        """
+        deadline = time.monotonic() + duration_sec
+        count = 0
+        while True:
+            with self._cond:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return count
+                if self._pumping:
+                    self._cond.wait(remaining)
+                    continue
+                self._pumping = True
+            try:
+                while self._pump(deadline):
+                    count += 1
+            finally:
+                self._release_pump()
+
+    def stats(self) -> dict:
+        """各路由键的分发条数、当前排队条数、队列满丢弃条数及过滤的 heartbeat 数。"""
+        with self._cond:
+            return {
+                "routed": {str(k): v for k, v in self.routed.items()},
+                "queued": {str(k): len(q) for k, q in self._queues.items() if q},
+                "dropped": {str(k): v for k, v in self.dropped.items()},
+                "heartbeats": self.heartbeats,
+            }
@@ -0,0 +1,53 @@
+"""
+WebSocket 行情时效：估计服务端时钟相对本机的偏移，用于把消息中的服务端时间 t 换算到本机时钟后计算发布到接收的延迟。
+偏移按 NTP 方式由往返样本估计：
+- 样本：本机发送墙钟 send、服务端处理该请求时打的时间戳 server_t、本机收到该请求响应的墙钟 recv
+- offset = server_t - (send + recv) / 2（服务端时钟 - 本机时钟，毫秒）
+- 取最近 max_samples 个样本中 RTT 最小者（排队、调度干扰最小，误差界最紧）
+误差不超过 RTT / 2 的前提是 server_t 落在 [send, recv] 内，即由服务端在收到请求之后、发出响应之前打出；
+行情推送的 t 是发布时刻，与请求无因果关系（可能早于 send，如订阅后下发的已有快照），不能作为样本。
+WebSocketClient.sync_clock 以服务端时间请求的响应形成样本（见 client.clock）。
+"""
+from collections import deque
+from typing import Optional
+
+
+class ClockOffsetEstimator:
+    """服务端时钟偏移估计（线程不安全，由单个收包线程写入）。"""
+
+    def __init__(self, max_samples: int = 64):
+        """:param max_samples: 保留的最近样本数，长时间运行时旧样本淘汰以跟随本机时钟漂移"""
+        self._samples = deque(maxlen=max_samples)  # (rtt_ms, offset_ms)
+        self._best: Optional[tuple] = None
+        self.total = 0
+
+    def add_sample(self, send_wall_ms: float, server_ms: float, recv_wall_ms: float) -> None:
+        """记录一次往返：send_wall_ms / recv_wall_ms 为本机墙钟（毫秒），server_ms 为服务端时间戳。"""
+        rtt = recv_wall_ms - send_wall_ms
+        if rtt < 0:
+            return
+        self._samples.append((rtt, server_ms - (send_wall_ms + recv_wall_ms) / 2))
+        self._best = min(self._samples)
+        self.total += 1
+
+    @property
+    def ready(self) -> bool:
+        """是否已有样本。"""
+        return self._best is not None
+
+    @property
+    def offset_ms(self) -> float:
+        """服务端时钟 - 本机时钟（毫秒）；无样本时为 0。"""
+        return self._best[1] if self._best is not None else 0.0
+
+    @property
+    def error_ms(self) -> Optional[float]:
+        """偏移估计的误差上界（最佳样本 RTT / 2），无样本时为 None。"""
+        return self._best[0] / 2 if self._best is not None else None
+
+    def summary(self) -> dict:
+        return {
+            "offset_ms": round(self.offset_ms, 3),
+            "error_ms": None if self.error_ms is None else round(self.error_ms, 3),
+            "samples": self.total,
+        }
@@ -0,0 +1,117 @@
+"""
+WebSocket 连接池：按 endpoint 保持已建立的连接，在用例之间复用，省去每个用例的 TLS / WebSocket 握手。
+- 租出（acquire）：优先取空闲连接，先读掉空闲期间到达的帧（heartbeat 自动回复）；连接已被对端关闭则重连，
+  此前鉴权成功过的会话重连后用原参数重新鉴权（会话未丢失时不重复鉴权）；交出前清空测量状态（时钟偏移、发布延迟、重连次数、压缩统计）
+- 归还（release）：输出本次租用的测量结果，退订本次租用期间订阅的频道、读掉残留帧、丢弃分发器；复位失败或空闲连接已满时直接关闭
+池对象只在本进程内共享，pytest-xdist 下每个 worker 各自持有一个池。
+"""
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from config.settings import WS_POOL_SIZE
+from core.logger import get_logger
+from core.websocket_client import WebSocketClient
+
+logger = get_logger("ws_pool")
+
+# 未配置 WS_POOL_SIZE（fixture 不走连接池）时直接创建的连接池默认保留的空闲连接数
+DEFAULT_MAX_IDLE = 2
+# 租出前读掉空闲期间积压帧的静默判定时间（秒）
+_ACQUIRE_QUIET_SEC = 0.01
+# 归还时（收到退订确认后）残留帧读完的静默判定时间与最长等待（秒）
+_RELEASE_QUIET_SEC = 0.05
+_RELEASE_MAX_SEC = 2.0
+
+
+class WebSocketPool:
+    """单个 endpoint 的 WebSocketClient 连接池（线程安全）。"""
+
+    def __init__(self, url: str, max_idle: int = None, **client_kwargs):
+        """
+        :param url: WebSocket 地址
+        :param max_idle: 最多保留的空闲连接数，默认 WS_POOL_SIZE（未配置时为 DEFAULT_MAX_IDLE）
+        :param client_kwargs: 新建 WebSocketClient 的其他参数（timeout、reader_thread 等）
+        """
+        self.url = url
+        if max_idle is None:
+            max_idle = WS_POOL_SIZE if WS_POOL_SIZE > 0 else DEFAULT_MAX_IDLE
+        self.max_idle = max_idle
+        self._client_kwargs = client_kwargs
+        self._idle: list[WebSocketClient] = []
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.reconnects = 0
+        self.discarded = 0
+
+    def acquire(self, capture_path: Optional[str] = None) -> WebSocketClient:
+        """租出一个可用连接；capture_path 为本次租用的抓包文件（None 不抓包）。"""
+        with self._lock:
+            client = self._idle.pop() if self._idle else None
+        if client is None:
+            client = WebSocketClient(url=self.url, capture_path=capture_path, **self._client_kwargs).connect()
+            self.created += 1
+            return client
+        self.reused += 1
+        try:
+            if not client.connected or client.drain(_ACQUIRE_QUIET_SEC) is None:
+                raise ConnectionError("连接已断开或仍有持续推送")
+        except Exception as e:
+            logger.info("WebSocket 池连接不可用（%s），重新连接", e)
+            client.reconnect()
+            self.reconnects += 1
+        client.reset_stats()
+        client.set_capture(capture_path)
+        return client
+
+    def release(self, client: WebSocketClient, discard: bool = False) -> None:
+        """
+        归还连接：复位后放回空闲列表。复位失败（会话已丢失）时先断开，客户端对象连同鉴权参数仍放回，下次租出时重连并重新鉴权；
+        discard=True 或空闲已满时关闭并丢弃。
+        """
+        healthy = False
+        if not discard and client.connected:
+            try:
+                healthy = client.reset(_RELEASE_QUIET_SEC, _RELEASE_MAX_SEC)
+            except Exception as e:
+                logger.info("WebSocket 池连接复位失败: %s", e)
+        client.set_capture(None)
+        if not healthy:
+            client.close()
+        if not discard:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(client)
+                    return
+        self.discarded += 1
+        client.close()
+
+    @contextmanager
+    def lease(self, capture_path: Optional[str] = None) -> Iterator[WebSocketClient]:
+        """with pool.lease() as client: ...，退出时归还（连接已断开或复位失败时关闭）。"""
+        client = self.acquire(capture_path)
+        try:
+            yield client
+        finally:
+            self.release(client)
+
+    def close(self) -> None:
+        """关闭全部空闲连接。"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for client in idle:
+            client.close()
+        logger.info("WebSocket 连接池已关闭 %s：%s", self.url, self.stats())
+
+    def stats(self) -> dict:
+        """新建 / 复用 / 重连 / 丢弃的连接数及当前空闲连接数。"""
+        with self._lock:
+            idle = len(self._idle)
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "reconnects": self.reconnects,
+            "discarded": self.discarded,
+            "idle": idle,
+        }
@@ -0,0 +1,125 @@
+"""
+WebSocket 抓包离线回放：把 core.ws_capture 写出的抓包文件当作一个「已连接」的客户端，
+提供与 WebSocketClient 相同的 recv / recv_json / recv_until / recv_for_seconds，
+用例中的 stop_when 终止条件与 RespChecker 断言可原样在离线数据上复现。
+回放不等待真实时间：max_wait_sec 按抓包中记录的接收时间戳计算（虚拟时钟从上一条已消费帧的时间开始）。
+"""
+from typing import Callable, Iterable, Optional, Union
+
+import websocket
+
+from core import json_codec
+from core.logger import get_logger
+from core.websocket_client import WebSocketClient, scan_subscription, stop_when_takes_messages
+from core.ws_capture import CapturedFrame, CaptureReader
+
+logger = get_logger("ws_replay")
+
+_NS_PER_SEC = 1_000_000_000
+
+
+class CaptureReplay:
+    """抓包回放客户端（只读，仅回放收到的帧；send 系列为空操作）。"""
+
+    is_heartbeat = staticmethod(WebSocketClient.is_heartbeat)
+    filter_heartbeat = staticmethod(WebSocketClient.filter_heartbeat)
+
+    def __init__(self, path: str):
+        self.path = path
+        self._reader = CaptureReader(path)
+        self._frames = self._reader.received()
+        self._peeked: Optional[CapturedFrame] = None
+        self._now_ns: Optional[int] = None
+
+    def _peek(self) -> Optional[CapturedFrame]:
+        if self._peeked is None:
+            self._peeked = next(self._frames, None)
+            if self._peeked is not None and self._now_ns is None:
+                self._now_ns = self._peeked.ts_ns
+        return self._peeked
+
+    def _take(self) -> CapturedFrame:
+        frame = self._peeked
+        self._peeked = None
+        self._now_ns = frame.ts_ns
+        return frame
+
+    def send(self, payload) -> None:
+        """回放模式不发送。"""
+
+    def send_json(self, obj: dict) -> None:
+        """回放模式不发送。"""
+
+    def recv(self) -> str | bytes:
+        """取下一帧；抓包已读完抛 WebSocketConnectionClosedException（与连接关闭一致）。"""
+        if self._peek() is None:
+            raise websocket.WebSocketConnectionClosedException(f"抓包已回放完毕: {self.path}")
+        return self._take().data
+
+    def recv_json(self) -> dict:
+        return json_codec.loads(self.recv())
+
+    def recv_until(
+        self,
+        stop_when: Union[Callable[[dict], bool], Callable[[dict, list], bool], None],
+        max_wait_sec: float,
+        recv_timeout: float = 1.0,
+        filter_heartbeat: bool = True,
+        subscriptions: Iterable[str] = None,
+    ) -> list:
+        """
+        语义同 WebSocketClient.recv_until：按抓包时间戳取 max_wait_sec 窗口内的帧，直到 stop_when 返回 True；
+        抓包读完即结束。recv_timeout 仅为接口兼容，不使用。
+        :param subscriptions: 只保留这些 subscription 的推送（其他订阅的推送不解析、不返回）；不含 subscription 的消息照常返回
+        """
+        takes_messages = stop_when_takes_messages(stop_when)
+        messages = []
+        heartbeat_count = 0
+        skipped_count = 0
+        if self._peek() is None:
+            return messages
+        wanted = None
+        if subscriptions is not None:
+            wanted = {s for sub in subscriptions for s in (sub, sub.encode("utf-8"))}
+        deadline_ns = self._now_ns + int(max_wait_sec * _NS_PER_SEC)
+        while True:
+            frame = self._peek()
+            if frame is None or frame.ts_ns > deadline_ns:
+                self._now_ns = deadline_ns
+                break
+            raw = self._take().data
+            if wanted is not None:
+                sub = scan_subscription(raw)
+                if sub is not None and sub not in wanted:
+                    skipped_count += 1
+                    continue
+            msg = json_codec.loads(raw)
+            if filter_heartbeat and self.is_heartbeat(msg):
+                heartbeat_count += 1
+                continue
+            messages.append(msg)
+            if stop_when is not None and (stop_when(msg, messages) if takes_messages else stop_when(msg)):
+                break
+        logger.info("回放收包结束，共 %d 条业务消息（已过滤 %d 条 heartbeat）", len(messages), heartbeat_count)
+        if skipped_count:
+            logger.info("按 subscriptions 跳过 %d 条其他订阅的推送", skipped_count)
+        return messages
+
+    def recv_for_seconds(
+        self,
+        duration_sec: float,
+        recv_timeout: float = 1.0,
+        filter_heartbeat: bool = True,
+        subscriptions: Iterable[str] = None,
+    ) -> list:
+        """按抓包时间戳取 duration_sec 窗口内的全部消息；subscriptions 见 recv_until。"""
+        return self.recv_until(None, duration_sec, recv_timeout, filter_heartbeat, subscriptions)
+
+    def close(self) -> None:
+        self._reader.close()
+
+    def __enter__(self) -> "CaptureReplay":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
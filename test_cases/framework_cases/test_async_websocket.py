@@ -0,0 +1,90 @@
+"""
+异步 WebSocket 客户端用例，对应 framework_case.md 中 FW-019 ~ FW-020。
+服务端为用例内启动的本地 aiohttp WebSocket：收到请求只推送无关消息，从不回复匹配 id 的响应。
+"""
+import asyncio
+import json
+import time
+
+import aiohttp
+import allure
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+import core.async_websocket_client as async_ws_module
+from core.async_websocket_client import AsyncWebSocketClient
+
+UNRELATED_PUSH = {"id": -1, "method": "subscribe", "code": 0, "result": {"channel": "book", "data": []}}
+
+
+class _Clock:
+    """替身 time 模块：monotonic 为真实时间加 skew，用于让截止时间在收到消息的同时到期。"""
+
+    def __init__(self):
+        self.skew = 0.0
+
+    def monotonic(self) -> float:
+        return time.monotonic() + self.skew
+
+
+@pytest_asyncio.fixture
+async def silent_server():
+    """收到请求后推送一条无关消息并调用 on_push，之后不再发送任何帧。"""
+    state = {"on_push": None}
+
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                await ws.send_str(json.dumps(UNRELATED_PUSH))
+                if state["on_push"] is not None:
+                    state["on_push"]()
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/ws", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    state["url"] = f"ws://127.0.0.1:{runner.addresses[0][1]}/ws"
+    yield state
+    await runner.cleanup()
+
+
+@allure.epic("框架自测")
+@allure.feature("异步 WebSocket 客户端")
+@pytest.mark.framework
+class TestAsyncWebSocketClient:
+    """请求响应等待的超时"""
+
+    @allure.title("FW-019 服务端不回复匹配 id：超过 timeout 抛 asyncio.TimeoutError，期间推送暂存")
+    @pytest.mark.asyncio
+    async def test_fw019_response_timeout(self, silent_server):
+        client = await AsyncWebSocketClient(url=silent_server["url"], timeout=0.3).connect()
+        try:
+            start = time.monotonic()
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.subscribe({"channels": ["book.BTCUSD-PERP.10"]}, request_id=7), 3)
+            assert 0.3 <= time.monotonic() - start < 1.5
+            assert [json.loads(raw) for raw in client._pending] == [UNRELATED_PUSH]
+        finally:
+            await client.close()
+
+    @allure.title("FW-020 截止时间恰在收到消息时到期：立即抛超时，不以 timeout=0 调用 receive 而永久阻塞")
+    @pytest.mark.asyncio
+    async def test_fw020_deadline_reached_on_message(self, silent_server, monkeypatch):
+        clock = _Clock()
+        monkeypatch.setattr(async_ws_module, "time", clock)
+        client = await AsyncWebSocketClient(url=silent_server["url"], timeout=5).connect()
+        silent_server["on_push"] = lambda: setattr(clock, "skew", client.timeout)
+        try:
+            start = time.monotonic()
+            with pytest.raises(asyncio.TimeoutError) as exc_info:
+                await asyncio.wait_for(client.subscribe({"channels": ["book.BTCUSD-PERP.10"]}, request_id=7), 2)
+            assert time.monotonic() - start < 1, "截止后应立即超时"
+            assert "id=7" in str(exc_info.value)
+        finally:
+            await client.close()
@@ -0,0 +1,63 @@
+"""
+K 线分窗拉取用例，对应 framework_case.md 中 FW-015。
+RestClient.submit 替换为本地函数：按自然月生成 K 线，窗口内超过 count 根时与接口一致只返回最近 count 根。
+"""
+import datetime
+import json
+from concurrent.futures import Future
+
+import allure
+import pytest
+import requests
+
+from constants import RestApiDef
+from core.rest_client import RestClient
+from core.rest_response import RestResponse
+from utils.candlestick_stream import iter_candles
+
+API_CANDLES = RestApiDef(uri="public/get-candlestick")
+
+
+def _month_starts(first_year: int, last_year: int) -> list:
+    """[first_year, last_year] 每个自然月首日 00:00 UTC 的毫秒时间戳。"""
+    return [
+        int(datetime.datetime(year, month, 1, tzinfo=datetime.timezone.utc).timestamp() * 1000)
+        for year in range(first_year, last_year + 1)
+        for month in range(1, 13)
+    ]
+
+
+def _monthly_submit(months: list, calls: list):
+    def submit(api, params=None, **kwargs):
+        calls.append(params)
+        hits = [t for t in months if params["start_ts"] <= t <= params["end_ts"]][-params["count"]:]
+        raw = requests.Response()
+        raw.status_code = 200
+        raw._content = json.dumps({"code": 0, "result": {"data": [{"t": t, "c": "1"} for t in hits]}}).encode()
+        future = Future()
+        future.set_result(RestResponse(raw))
+        return future
+
+    return submit
+
+
+@allure.epic("框架自测")
+@allure.feature("K 线分窗拉取")
+@pytest.mark.framework
+class TestCandlestickStream:
+    """变长周期的窗口大小"""
+
+    @allure.title("FW-015 1M 周期窗口按最短月份计，任一窗口不超过 count 根，不因接口截断丢数据")
+    def test_fw015_monthly_windows_not_truncated(self):
+        months = _month_starts(2019, 2024)
+        calls = []
+        client = RestClient(base_url="http://127.0.0.1:9")
+        client.submit = _monthly_submit(months, calls)
+        try:
+            candles = list(iter_candles(client, API_CANDLES, "BTCUSD-PERP", "1M", months[0], months[-1] + 1, candles_per_window=12))
+        finally:
+            client.close()
+        assert [c["t"] for c in candles] == months
+        for params in calls:
+            in_window = [t for t in months if params["start_ts"] <= t <= params["end_ts"]]
+            assert len(in_window) <= params["count"], f"窗口 {params} 含 {len(in_window)} 根，超过 count"
@@ -0,0 +1,161 @@
+"""
+REST 录制/回放用例，对应 framework_case.md 中 FW-016 ~ FW-018、FW-034。
+录制时 RestClient 的 Session 替换为返回预设响应的替身；回放时替身一旦被调用即判失败。
+"""
+import datetime
+
+import allure
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import core.cassette as cassette_module
+from constants import RestApiDef
+from core.cassette import CASSETTE_MODE_RECORD, CASSETTE_MODE_REPLAY, Cassette, CassetteMiss
+from core.rest_client import RestClient
+
+API_FAKE = RestApiDef(uri="public/fake")
+API_POST = RestApiDef(uri="private/fake", method="post")
+
+
+class _QueuedSession:
+    """替身 Session：按调用顺序返回 responses 中的 (status, body, headers)。"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def request(self, method, url, **kwargs):
+        status, body, headers = self.responses.pop(0)
+        raw = requests.Response()
+        raw.status_code = status
+        raw._content = body
+        raw.headers = CaseInsensitiveDict(headers)
+        raw.encoding = "utf-8"
+        raw.elapsed = datetime.timedelta(0)
+        return raw
+
+    def close(self):
+        pass
+
+
+class _OfflineSession(_QueuedSession):
+    def __init__(self):
+        super().__init__([])
+
+    def request(self, method, url, **kwargs):
+        pytest.fail(f"回放模式不应发出网络请求: {method} {url}")
+
+
+def _client(path, mode: str, session, loose: bool = False) -> RestClient:
+    client = RestClient(base_url="http://127.0.0.1:9", cassette=Cassette(str(path), mode=mode, loose=loose))
+    client.session = session
+    return client
+
+
+@pytest.fixture
+def cassette_path(tmp_path):
+    return tmp_path / "fake.cassette"
+
+
+def _record(path, calls: list, responses: list) -> None:
+    """以 record 模式依次发出 calls = [(api, params, json)]，Session 依次返回 responses。"""
+    client = _client(path, CASSETTE_MODE_RECORD, _QueuedSession(responses))
+    try:
+        for api, params, body in calls:
+            client.request(api, params=params, json=body)
+    finally:
+        client.cassette.close()
+        client.close()
+
+
+@allure.epic("框架自测")
+@allure.feature("REST 录制回放")
+@pytest.mark.framework
+class TestCassette:
+    """录制格式、回放匹配与循环顺序"""
+
+    @allure.title("FW-016 录制后回放：状态码、body（含二进制）与响应头一致，不发网络请求，不还原编码相关头")
+    def test_fw016_round_trip(self, cassette_path):
+        binary = bytes(range(256))
+        _record(
+            cassette_path,
+            [(API_FAKE, {"instrument_name": "BTC"}, None), (API_POST, None, {"id": 1}), (API_FAKE, {"instrument_name": "ETH"}, None)],
+            [
+                (200, '{"code": 0, "result": "中文"}'.encode(), {"Content-Type": "application/json", "Content-Encoding": "gzip"}),
+                (400, b'{"code": 40001}', {"X-Trace": "t1"}),
+                (200, binary, {"Content-Type": "application/octet-stream"}),
+            ],
+        )
+        client = _client(cassette_path, CASSETTE_MODE_REPLAY, _OfflineSession())
+        try:
+            resp = client.request(API_FAKE, params={"instrument_name": "BTC"})
+            assert resp.status_code == 200 and resp.json() == {"code": 0, "result": "中文"}
+            assert resp.raw_response.headers["Content-Type"] == "application/json"
+            assert "Content-Encoding" not in resp.raw_response.headers
+
+            resp = client.request(API_POST, json={"id": 1})
+            assert resp.status_code == 400 and resp.raw_response.headers["X-Trace"] == "t1"
+            assert client.request(API_FAKE, params={"instrument_name": "ETH"}).raw_response.content == binary
+
+            with pytest.raises(CassetteMiss):
+                client.request(API_POST, json={"id": 2})
+        finally:
+            client.cassette.close()
+            client.close()
+
+    @allure.title("FW-017 同一键录制多次按录制顺序循环回放")
+    def test_fw017_cycles_in_order(self, cassette_path):
+        _record(
+            cassette_path,
+            [(API_FAKE, {"n": 1}, None)] * 3,
+            [(200, b'{"seq": %d}' % i, {}) for i in range(3)],
+        )
+        client = _client(cassette_path, CASSETTE_MODE_REPLAY, _OfflineSession())
+        try:
+            assert [client.request(API_FAKE, params={"n": 1}).json()["seq"] for _ in range(5)] == [0, 1, 2, 0, 1]
+        finally:
+            client.cassette.close()
+            client.close()
+
+    @allure.title("FW-018 开启 loose：精确键未命中时按忽略 start_ts / end_ts 取值的回退键匹配并告警，其他参数不同仍未命中")
+    def test_fw018_loose_match(self, cassette_path, monkeypatch):
+        _record(
+            cassette_path,
+            [(API_FAKE, {"instrument_name": "BTC", "start_ts": 1000, "end_ts": 2000}, None)],
+            [(200, b'{"code": 0}', {})],
+        )
+        warnings = []
+        monkeypatch.setattr(cassette_module.logger, "warning", lambda msg, *args: warnings.append(msg % args))
+        client = _client(cassette_path, CASSETTE_MODE_REPLAY, _OfflineSession(), loose=True)
+        try:
+            resp = client.request(API_FAKE, params={"instrument_name": "BTC", "start_ts": 5000, "end_ts": 9000})
+            assert resp.json() == {"code": 0}
+            exact = cassette_module.make_cassette_key("GET", API_FAKE.uri, {"instrument_name": "BTC", "start_ts": 5000, "end_ts": 9000})
+            loose = cassette_module.make_cassette_key(
+                "GET", API_FAKE.uri, {"instrument_name": "BTC", "start_ts": 1000, "end_ts": 2000}, ignore_params=cassette_module.DEFAULT_IGNORE_PARAMS
+            )
+            assert len(warnings) == 1 and exact in warnings[0] and loose in warnings[0], "回退匹配应告警并给出两个键"
+            with pytest.raises(CassetteMiss):
+                client.request(API_FAKE, params={"instrument_name": "ETH", "start_ts": 1000, "end_ts": 2000})
+            with pytest.raises(CassetteMiss):
+                client.request(API_FAKE, params={"instrument_name": "BTC"})
+        finally:
+            client.cassette.close()
+            client.close()
+
+    @allure.title("FW-034 默认不开启 loose：时间参数不同即未命中，不回放其他时间窗口的录制")
+    def test_fw034_loose_off_by_default(self, cassette_path):
+        _record(
+            cassette_path,
+            [(API_FAKE, {"instrument_name": "BTC", "start_ts": 1000, "end_ts": 2000}, None)],
+            [(200, b'{"code": 0}', {})],
+        )
+        assert Cassette(str(cassette_path), mode=CASSETTE_MODE_REPLAY).loose is False
+        client = _client(cassette_path, CASSETTE_MODE_REPLAY, _OfflineSession())
+        try:
+            with pytest.raises(CassetteMiss):
+                client.request(API_FAKE, params={"instrument_name": "BTC", "start_ts": 5000, "end_ts": 9000})
+            assert client.request(API_FAKE, params={"instrument_name": "BTC", "start_ts": 1000, "end_ts": 2000}).json() == {"code": 0}
+        finally:
+            client.cassette.close()
+            client.close()
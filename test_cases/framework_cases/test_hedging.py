@@ -0,0 +1,143 @@
+"""
+对冲请求用例，对应 framework_case.md 中 FW-012 ~ FW-014、FW-033。
+RestClient 的线程 Session 替换为按调用顺序返回预设结果的替身，不发网络请求。
+"""
+import datetime
+import threading
+import time
+
+import allure
+import pytest
+import requests
+
+from constants import RestApiDef
+from core.cassette import CASSETTE_MODE_RECORD, Cassette
+from core.hedging import HedgePolicy
+from core.metrics import LatencyRecorder
+from core.rest_client import RestClient
+
+API_FAKE = RestApiDef(uri="public/fake")
+
+
+class _ScriptedSession:
+    """替身 Session：第 n 次 request 按 script[n] = (耗时秒, body 或异常) 返回，所有线程共享同一序列。"""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.finished = threading.Semaphore(0)
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self._lock:
+            delay, result = self.script[self._calls]
+            self._calls += 1
+        time.sleep(delay)
+        self.finished.release()
+        if isinstance(result, Exception):
+            raise result
+        raw = requests.Response()
+        raw.status_code = 200
+        raw._content = result
+        raw.encoding = "utf-8"
+        raw.elapsed = datetime.timedelta(seconds=delay)
+        return raw
+
+    def wait_all(self, timeout: float = 2) -> None:
+        """等待全部预设请求（含被丢弃的一份）完成。"""
+        for _ in self.script:
+            assert self.finished.acquire(timeout=timeout)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def hedged_client(tmp_path):
+    """对冲等待固定 0.05s 的客户端，延迟记录器与录制文件均为本用例独享。"""
+    policy = HedgePolicy(initial_delay=0.05, min_samples=100)
+    cassette = Cassette(str(tmp_path / "hedge.cassette"), mode=CASSETTE_MODE_RECORD)
+    client = RestClient(
+        base_url="http://127.0.0.1:9", hedge_policy=policy, latency_recorder=LatencyRecorder(), cassette=cassette
+    )
+    yield client
+    client.close()
+
+
+def _use(client: RestClient, session: _ScriptedSession) -> _ScriptedSession:
+    """让客户端各工作线程改用替身 Session（丢弃已创建的线程 Session）。"""
+    client._new_session = lambda: session
+    client._thread_local = threading.local()
+    return session
+
+
+def _cassette_bodies(client: RestClient) -> list:
+    with open(client.cassette.path, encoding="utf-8") as f:
+        return [line.split("\t", 2)[2] for line in f]
+
+
+@allure.epic("框架自测")
+@allure.feature("对冲请求")
+@pytest.mark.framework
+class TestHedging:
+    """对冲触发、胜出与丢弃统计，只记录采用的一份"""
+
+    @allure.title("FW-012 主请求超过对冲阈值：对冲胜出，落后的主请求不计入延迟直方图与录制，只计 discarded")
+    def test_fw012_loser_not_recorded(self, hedged_client):
+        session = _use(hedged_client, _ScriptedSession([(0.3, b'{"from": "primary"}'), (0.01, b'{"from": "hedge"}')]))
+        resp = hedged_client.request(API_FAKE)
+        assert resp.json() == {"from": "hedge"}
+        session.wait_all()
+        time.sleep(0.05)  # 等待丢弃回调执行
+
+        summary = hedged_client.latency_recorder.summary()[API_FAKE.uri]
+        assert summary["count"] == 1 and summary["transfer"]["requests"] == 1
+        bodies = _cassette_bodies(hedged_client)
+        assert len(bodies) == 1 and "hedge" in bodies[0] and "primary" not in bodies[0]
+        stats = hedged_client.hedge_policy.stats()[API_FAKE.uri]
+        assert (stats["hedged"], stats["hedge_wins"], stats["discarded"]) == (1, 1, 1)
+
+    @allure.title("FW-013 主请求在阈值内返回：不对冲，记录一次")
+    def test_fw013_no_hedge(self, hedged_client):
+        session = _use(hedged_client, _ScriptedSession([(0.0, b'{"from": "primary"}')]))
+        assert hedged_client.request(API_FAKE).json() == {"from": "primary"}
+        session.wait_all()
+        assert hedged_client.latency_recorder.summary()[API_FAKE.uri]["count"] == 1
+        assert len(_cassette_bodies(hedged_client)) == 1
+        stats = hedged_client.hedge_policy.stats()[API_FAKE.uri]
+        assert (stats["requests"], stats["hedged"], stats["discarded"]) == (1, 0, 0)
+
+    @allure.title("FW-014 对冲后主请求失败则采用对冲结果；两份都失败抛出主请求异常，只记录一次异常")
+    def test_fw014_failures(self, hedged_client):
+        _use(hedged_client, _ScriptedSession([(0.1, ConnectionError("primary")), (0.15, b'{"from": "hedge"}')]))
+        assert hedged_client.request(API_FAKE).json() == {"from": "hedge"}
+        stats = hedged_client.hedge_policy.stats()[API_FAKE.uri]
+        assert (stats["hedge_wins"], stats["discarded"]) == (1, 1)
+
+        _use(hedged_client, _ScriptedSession([(0.1, ConnectionError("primary")), (0.1, TimeoutError("hedge"))]))
+        with pytest.raises(ConnectionError, match="primary"):
+            hedged_client.request(API_FAKE)
+        summary = hedged_client.latency_recorder.summary()[API_FAKE.uri]
+        assert summary["by_status"]["error"]["total"]["count"] == 1
+        assert summary["by_status"]["2xx"]["total"]["count"] == 1
+        assert len(_cassette_bodies(hedged_client)) == 1
+        stats = hedged_client.hedge_policy.stats()[API_FAKE.uri]
+        assert (stats["hedged"], stats["hedge_wins"], stats["discarded"]) == (2, 1, 2)
+
+    @allure.title("FW-033 对冲持续胜出：延迟样本自主请求发出时计并计入落后主请求的耗时，对冲阈值不被拉低")
+    def test_fw033_delay_stable_when_hedges_win(self, hedged_client):
+        policy = HedgePolicy(percentile=50, min_samples=2, initial_delay=0.05)
+        hedged_client.hedge_policy = policy
+        rounds = 6
+        session = _use(hedged_client, _ScriptedSession([(0.2, b'{"from": "primary"}'), (0.01, b'{"from": "hedge"}')] * rounds))
+        for _ in range(rounds):
+            assert hedged_client.request(API_FAKE).json() == {"from": "hedge"}
+        session.wait_all()
+        time.sleep(0.05)  # 等待落后主请求的完成回调执行
+
+        stats = policy.stats()[API_FAKE.uri]
+        assert (stats["hedged"], stats["hedge_wins"]) == (rounds, rounds)
+        samples = sorted(policy._samples[API_FAKE.uri])
+        assert len(samples) == 2 * rounds, "每轮记录对冲胜出耗时与主请求自身耗时各一次"
+        assert samples[0] >= 0.05, "胜出样本应自主请求发出时计，不低于对冲等待时间"
+        assert policy.delay(API_FAKE.uri) >= 0.05, "对冲持续胜出时对冲阈值不应被拉低"
@@ -0,0 +1,118 @@
+"""
+自适应限流用例，对应 framework_case.md 中 FW-008 ~ FW-011、FW-032。
+响应为手工构造的 requests.Response，RestClient 的实际发送替换为本地函数。
+"""
+import threading
+import time
+
+import allure
+import pytest
+import requests
+
+from constants import BizCode, RestApiDef
+from core.rate_limiter import THROTTLED_HTTP_STATUS, AdaptiveRateLimiter, TokenBucket, is_throttled
+from core.rest_client import RestClient
+from core.rest_response import RestResponse
+
+API_FAKE = RestApiDef(uri="public/fake")
+
+
+def _response(status: int, body: bytes = b"{}") -> RestResponse:
+    raw = requests.Response()
+    raw.status_code = status
+    raw._content = body
+    return RestResponse(raw)
+
+
+@allure.epic("框架自测")
+@allure.feature("自适应限流")
+@pytest.mark.framework
+class TestAdaptiveRateLimiter:
+    """限流识别、AIMD 调速、令牌桶与 RestClient 重试"""
+
+    @allure.title("FW-008 限流识别：HTTP 429 或错误 body 中 42901，成功响应不解析 body")
+    def test_fw008_is_throttled(self):
+        assert is_throttled(_response(THROTTLED_HTTP_STATUS, b"not json"))
+        assert is_throttled(_response(400, b'{"code": %d}' % BizCode.TOO_MANY_REQUESTS))
+        assert not is_throttled(_response(400, b'{"code": 40001}'))
+        assert not is_throttled(_response(500, b"<html>"))
+        assert not is_throttled(_response(200, b"not json"))
+
+    @allure.title("FW-009 AIMD：限流乘性降速（冷却期内只降一次，不低于 min_rate），成功线性回升至 max_rate")
+    def test_fw009_aimd(self):
+        limiter = AdaptiveRateLimiter(initial_rate=8, min_rate=3, max_rate=9, cooldown_sec=0.05, increase_step=4)
+        key = API_FAKE.uri
+        limiter.feedback(key, throttled=True)
+        assert limiter.rate(key) == 4
+        limiter.feedback(key, throttled=True)
+        assert limiter.rate(key) == 4, "冷却期内不应再次降速"
+        time.sleep(0.06)
+        limiter.feedback(key, throttled=True)
+        assert limiter.rate(key) == 3, "不应低于 min_rate"
+
+        limiter.feedback(key, throttled=False)
+        assert limiter.rate(key) == pytest.approx(3 + 4 / 3)
+        for _ in range(50):
+            limiter.feedback(key, throttled=False)
+        assert limiter.rate(key) == 9, "不应超过 max_rate"
+        assert limiter.stats()[key]["throttled"] == 3
+        assert limiter.rate("other") == 8, "不同 key 各自分桶"
+
+    @allure.title("FW-010 令牌桶：突发 capacity 个令牌不等待，之后按 rate 补充")
+    def test_fw010_token_bucket(self):
+        bucket = TokenBucket(rate=50, capacity=3)
+        assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        start = time.monotonic()
+        waited = bucket.acquire()
+        elapsed = time.monotonic() - start
+        assert 0.015 <= waited <= 0.03
+        assert elapsed >= 0.015
+
+    @allure.title("FW-011 RestClient 被限流后降速重试，最多 max_retries 次")
+    def test_fw011_client_retries(self):
+        limiter = AdaptiveRateLimiter(initial_rate=1000, max_retries=2, cooldown_sec=0)
+        client = RestClient(base_url="http://127.0.0.1:9", rate_limiter=limiter)
+        statuses = iter([429, 429, 200])
+        client._dispatch = lambda api, session=None, **kwargs: _response(next(statuses))
+        try:
+            assert client.request(API_FAKE).status_code == 200
+            assert limiter.stats()[API_FAKE.uri]["requests"] == 3
+            assert limiter.rate(API_FAKE.uri) < 1000
+
+            statuses = iter([429] * 5)
+            client._dispatch = lambda api, session=None, **kwargs: _response(next(statuses))
+            assert client.request(API_FAKE).status_code == 429, "重试耗尽后返回最后一次限流响应"
+            assert limiter.stats()[API_FAKE.uri]["requests"] == 6
+        finally:
+            client.close()
+
+    @allure.title("FW-032 并发反馈：回升不丢失、降速不被覆盖，未指定 burst 时桶容量随速率调整")
+    def test_fw032_concurrent_feedback(self):
+        limiter = AdaptiveRateLimiter(initial_rate=2, max_rate=1000, increase_step=1)
+        key = API_FAKE.uri
+        bucket = limiter._bucket(key)
+        set_rate = bucket.set_rate
+
+        def slow_set_rate(rate):
+            time.sleep(0.001)  # 拉长写回窗口，放大竞态
+            set_rate(rate)
+
+        bucket.set_rate = slow_set_rate
+        threads = [threading.Thread(target=lambda: [limiter.feedback(key, throttled=False) for _ in range(20)]) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        expected = 2.0
+        for _ in range(80):
+            expected += 1 / expected
+        assert limiter.rate(key) == pytest.approx(expected), "并发成功反馈的回升不应丢失"
+        assert bucket.capacity == pytest.approx(expected)
+
+        limiter.feedback(key, throttled=True)
+        assert limiter.rate(key) == pytest.approx(expected / 2) and bucket.capacity == pytest.approx(expected / 2)
+        assert TokenBucket(rate=50, capacity=3).capacity == 3
+        fixed = TokenBucket(rate=50, capacity=3)
+        fixed.set_rate(100)
+        assert fixed.capacity == 3, "显式指定的容量不随速率调整"
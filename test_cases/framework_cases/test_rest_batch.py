@@ -0,0 +1,100 @@
+"""
+RestClient 批量线程池用例，对应 framework_case.md 中 FW-001 ~ FW-002、FW-031。
+以替身 _request_api 记录在途数量，不发网络请求。
+"""
+import threading
+import time
+
+import allure
+import pytest
+
+from constants import RestApiDef
+from core.rest_client import DEFAULT_MAX_WORKERS, RestClient
+
+API_FAKE = RestApiDef(uri="public/fake")
+
+
+class _InFlight:
+    """替身请求：记录最大在途数，每次请求耗时 delay 秒，返回入参。"""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, api, session=None, params=None, **kwargs):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        time.sleep(self.delay)
+        with self._lock:
+            self.current -= 1
+        return params
+
+
+@pytest.fixture
+def batch_client():
+    client = RestClient(base_url="http://127.0.0.1:9")
+    client._request_api = _InFlight()
+    yield client
+    client.close()
+
+
+@allure.epic("框架自测")
+@allure.feature("REST 批量请求")
+@pytest.mark.framework
+class TestRestBatch:
+    """request_many / submit 共享线程池"""
+
+    @allure.title("FW-001 max_workers 限制单次调用在途数，线程池跨调用复用不重建")
+    def test_fw001_semaphore_caps_per_call(self, batch_client):
+        fake = batch_client._request_api
+        results = batch_client.request_many(API_FAKE, [{"i": i} for i in range(12)], max_workers=8)
+        executor = batch_client._executor
+        assert [r.response for r in results] == [{"i": i} for i in range(12)]
+
+        fake.peak = 0
+        results = batch_client.request_many(API_FAKE, [{"i": i} for i in range(12)], max_workers=2)
+        assert fake.peak <= 2, f"在途请求 {fake.peak} 超过 max_workers=2"
+        assert [r.response for r in results] == [{"i": i} for i in range(12)]
+        assert batch_client._executor is executor, "较小的 max_workers 不应重建线程池"
+
+    @allure.title("FW-002 多线程并发 request_many / submit（不同 max_workers）无已关闭线程池错误")
+    def test_fw002_concurrent_callers(self, batch_client):
+        errors = []
+        outputs = {}
+
+        def _batch(workers: int):
+            try:
+                results = batch_client.request_many(API_FAKE, [{"w": workers, "i": i} for i in range(10)], workers)
+                outputs[workers] = [r.response for r in results if r.error is None]
+            except Exception as e:  # 线程内异常收集后在主线程断言
+                errors.append(e)
+
+        def _submit():
+            try:
+                futures = [batch_client.submit(API_FAKE, params={"s": i}) for i in range(10)]
+                outputs["submit"] = [f.result() for f in futures]
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=_batch, args=(w,)) for w in (2, 4, 16, 3, 32)]
+        threads.append(threading.Thread(target=_submit))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+
+        assert not errors, f"并发调用出错：{errors}"
+        for workers in (2, 4, 16, 3, 32):
+            assert outputs[workers] == [{"w": workers, "i": i} for i in range(10)]
+        assert outputs["submit"] == [{"s": i} for i in range(10)]
+        assert batch_client._executor_workers == max(32, DEFAULT_MAX_WORKERS)
+
+    @allure.title("FW-031 max_workers 小于 1 时立即抛 ValueError，不提交任何请求")
+    def test_fw031_invalid_max_workers(self, batch_client):
+        for workers in (0, -1):
+            with pytest.raises(ValueError, match="max_workers"):
+                batch_client.request_many(API_FAKE, [{"i": 1}], max_workers=workers)
+        assert batch_client._request_api.peak == 0
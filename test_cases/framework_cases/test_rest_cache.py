@@ -0,0 +1,107 @@
+"""
+ResponseCache 用例，对应 framework_case.md 中 FW-003 ~ FW-007。
+loader 为本地函数，响应为手工构造的 requests.Response，不发网络请求。
+"""
+import threading
+import time
+
+import allure
+import pytest
+import requests
+
+from core.rest_cache import ResponseCache, make_cache_key
+from core.rest_response import RestResponse
+
+
+def _response(body: bytes, status: int = 200) -> RestResponse:
+    raw = requests.Response()
+    raw.status_code = status
+    raw._content = body
+    raw.encoding = "utf-8"
+    return RestResponse(raw)
+
+
+@allure.epic("框架自测")
+@allure.feature("REST 响应缓存")
+@pytest.mark.framework
+class TestResponseCache:
+    """缓存键、TTL / LRU、在途合并与副本隔离"""
+
+    @allure.title("FW-003 缓存键忽略 None 参数与参数顺序，值按字符串归一化")
+    def test_fw003_cache_key(self):
+        a = make_cache_key("get", "/public/get-candlestick", {"count": 5, "instrument_name": "BTC", "end_ts": None})
+        b = make_cache_key("GET", "public/get-candlestick/", {"instrument_name": "BTC", "count": "5"})
+        assert a == b
+        assert a != make_cache_key("GET", "public/get-candlestick", {"instrument_name": "BTC", "count": 6})
+        assert make_cache_key("GET", "x", None) == make_cache_key("GET", "x", {})
+
+    @allure.title("FW-004 TTL 过期后重新加载，超过 max_entries 按 LRU 淘汰")
+    def test_fw004_ttl_and_lru(self):
+        cache = ResponseCache(ttl=0.05, max_entries=2)
+        calls = []
+
+        def loader(name):
+            return lambda: calls.append(name) or _response(b"{}")
+
+        cache.get_or_load(("a",), loader("a"))
+        cache.get_or_load(("b",), loader("b"))
+        cache.get_or_load(("a",), loader("a"))  # 命中，a 变为最近使用
+        cache.get_or_load(("c",), loader("c"))  # 淘汰最久未使用的 b
+        cache.get_or_load(("a",), loader("a"))
+        assert calls == ["a", "b", "c"]
+        assert cache.stats()["evictions"] == 1
+
+        cache.get_or_load(("b",), loader("b"))
+        assert calls[-1] == "b", "被淘汰的条目应重新加载"
+        time.sleep(0.06)
+        cache.get_or_load(("b",), loader("b"))
+        assert calls == ["a", "b", "c", "b", "b"], "过期条目应重新加载"
+
+    @allure.title("FW-005 并发相同键只加载一次，等待者各自拿到副本")
+    def test_fw005_coalescing(self):
+        cache = ResponseCache(ttl=10)
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            release.wait(2)
+            return _response(b'{"code": 0}')
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_load(("k",), loader))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        while cache.stats()["coalesced"] < 4:
+            time.sleep(0.005)
+        release.set()
+        for t in threads:
+            t.join(2)
+
+        assert len(calls) == 1
+        assert len(results) == 5 and len({id(r) for r in results}) == 5, "每个调用方应拿到独立副本"
+        assert cache.stats()["coalesced"] == 4 and cache.stats()["misses"] == 1
+
+    @allure.title("FW-006 loader 异常抛给所有等待者且不缓存，非 2xx 响应不缓存")
+    def test_fw006_errors_not_cached(self):
+        cache = ResponseCache(ttl=10)
+        with pytest.raises(ConnectionError):
+            cache.get_or_load(("k",), lambda: (_ for _ in ()).throw(ConnectionError("boom")))
+        assert cache.stats()["size"] == 0
+
+        cache.get_or_load(("k",), lambda: _response(b"{}", status=429))
+        assert cache.stats()["size"] == 0
+        resp = cache.get_or_load(("k",), lambda: _response(b'{"ok": 1}'))
+        assert resp.json() == {"ok": 1} and cache.stats()["size"] == 1
+
+    @allure.title("FW-007 命中后原地修改响应 JSON 不影响缓存与其他调用方")
+    def test_fw007_hit_returns_copy(self):
+        cache = ResponseCache(ttl=10)
+        first = cache.get_or_load(("k",), lambda: _response(b'{"code": 0, "result": {"data": [1, 2]}}'))
+        first.json()["result"].pop("data")
+        first.json()["code"] = 1
+
+        second = cache.get_or_load(("k",), lambda: pytest.fail("应命中缓存"))
+        assert second.json() == {"code": 0, "result": {"data": [1, 2]}}
+        second.json()["result"]["data"].append(3)
+        assert cache.get_or_load(("k",), lambda: None).json()["result"]["data"] == [1, 2]
@@ -0,0 +1,94 @@
+"""
+WebSocket 抓包与离线回放用例，对应 framework_case.md 中 FW-021 ~ FW-023。
+抓包文件由 FrameCapture 以指定时间戳直接写入，不建立连接。
+"""
+import json
+
+import allure
+import pytest
+import websocket
+
+from core.ws_capture import CaptureReader, FrameCapture
+from core.ws_replay import CaptureReplay
+
+_MS = 1_000_000
+SUB_BTC = "book.BTCUSD-PERP.10"
+SUB_ETH = "book.ETHUSD-PERP.10"
+
+
+def _push(subscription: str, u: int) -> str:
+    return json.dumps({"id": -1, "method": "subscribe", "code": 0, "result": {"subscription": subscription, "data": [{"u": u}]}})
+
+
+HEARTBEAT = json.dumps({"id": 99, "method": "public/heartbeat"})
+
+
+def _write(path, frames: list) -> None:
+    """frames = [(毫秒时间戳, 帧, 是否本端发送)]。"""
+    capture = FrameCapture(str(path), compress=True)
+    for ts_ms, frame, sent in frames:
+        capture.write(frame, sent=sent, ts_ns=ts_ms * _MS)
+    capture.close()
+
+
+@pytest.fixture
+def capture_path(tmp_path):
+    return tmp_path / "case.wscap"
+
+
+@allure.epic("框架自测")
+@allure.feature("WebSocket 抓包回放")
+@pytest.mark.framework
+class TestWsCapture:
+    """抓包文件往返与回放客户端"""
+
+    @allure.title("FW-021 抓包往返：文本 / 二进制 / 压缩帧与发送标志原样读出，末尾残缺帧忽略")
+    def test_fw021_round_trip(self, capture_path):
+        large = json.dumps({"data": ["x" * 10] * 100})
+        binary = bytes(range(256)) * 4
+        frames = [(1, '{"id": 1, "method": "subscribe"}', True), (2, _push(SUB_BTC, 1), False), (3, large, False), (4, binary, False)]
+        _write(capture_path, frames)
+        with open(capture_path, "ab") as f:
+            f.write(b"\x00" * 7)  # 模拟进程退出时写了一半的帧头
+
+        with CaptureReader(str(capture_path)) as reader:
+            read = [(frame.ts_ns // _MS, frame.data, frame.sent) for frame in reader]
+            assert read == frames
+            assert [frame.ts_ns for frame in reader.received()] == [2 * _MS, 3 * _MS, 4 * _MS]
+
+    @allure.title("FW-022 回放 recv_until：按抓包时间戳截取窗口、过滤 heartbeat、满足 stop_when 即停，读完后 recv 抛连接关闭")
+    def test_fw022_replay_window(self, capture_path):
+        _write(capture_path, [
+            (1000, _push(SUB_BTC, 1), False),
+            (1100, HEARTBEAT, False),
+            (1200, _push(SUB_BTC, 2), False),
+            (3000, _push(SUB_BTC, 3), False),
+            (3100, _push(SUB_BTC, 4), False),
+            (3200, _push(SUB_BTC, 5), False),
+        ])
+        with CaptureReplay(str(capture_path)) as replay:
+            first = replay.recv_until(None, max_wait_sec=1.0)
+            assert [m["result"]["data"][0]["u"] for m in first] == [1, 2]
+            # 虚拟时钟停在上一窗口末尾（2000ms），3000ms 的帧在 1.5s 窗口内
+            rest = replay.recv_until(lambda m, msgs: len(msgs) == 2, max_wait_sec=1.5)
+            assert [m["result"]["data"][0]["u"] for m in rest] == [3, 4]
+            assert replay.recv_json()["result"]["data"][0]["u"] == 5
+            with pytest.raises(websocket.WebSocketConnectionClosedException):
+                replay.recv()
+            assert replay.recv_until(None, max_wait_sec=10) == []
+
+    @allure.title("FW-023 回放 recv_until / recv_for_seconds 支持 subscriptions：只返回关注订阅的推送与无 subscription 的消息")
+    def test_fw023_replay_subscriptions(self, capture_path):
+        response = json.dumps({"id": 5, "method": "subscribe", "code": 0})
+        _write(capture_path, [
+            (0, response, False),
+            (10, _push(SUB_BTC, 1), False),
+            (20, _push(SUB_ETH, 2), False),
+            (30, _push(SUB_BTC, 3), False),
+            (40, _push(SUB_ETH, 4), False),
+        ])
+        with CaptureReplay(str(capture_path)) as replay:
+            messages = replay.recv_until(None, max_wait_sec=0.025, subscriptions=[SUB_BTC])
+            assert [m.get("result", {}).get("subscription") for m in messages] == [None, SUB_BTC]
+            messages = replay.recv_for_seconds(1, subscriptions=(SUB_ETH,))
+            assert [m["result"]["data"][0]["u"] for m in messages] == [4]
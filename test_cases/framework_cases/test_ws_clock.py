@@ -0,0 +1,60 @@
+"""
+WebSocket 服务端时钟偏移与发布延迟用例，对应 framework_case.md 中 FW-039。
+服务端为本进程内后台线程启动的 MockExchange（随机端口，带时钟偏差），不依赖交易所。
+"""
+import allure
+import pytest
+
+import core.websocket_client as websocket_client_module
+from core.websocket_client import WebSocketClient
+from utils.mock_exchange import MockExchange, MockExchangeConfig
+
+CHANNEL = "book.BTCUSD-PERP.10"
+SKEW_MS = 1500
+
+
+@pytest.fixture(scope="module")
+def skewed_exchange():
+    exchange = MockExchange(MockExchangeConfig(port=0, snapshot_interval_ms=50, clock_skew_ms=SKEW_MS)).start()
+    yield exchange
+    exchange.stop()
+
+
+@allure.epic("框架自测")
+@allure.feature("WebSocket 行情时效")
+@pytest.mark.framework
+class TestWebSocketClock:
+    """时间请求往返样本与帧读取层延迟统计"""
+
+    @allure.title("FW-039 时钟偏移取自服务端时间请求往返（推送不作样本）；recv_json 与分发器读取的推送均计入延迟；服务端不支持时返回 False")
+    def test_fw039_clock_from_time_request(self, skewed_exchange, monkeypatch):
+        client = WebSocketClient(url=skewed_exchange.ws_market_url, timeout=5).connect()
+        try:
+            assert client.subscribe({"channels": [CHANNEL]}, 3)["code"] == 0
+            client.recv_until(lambda m, msgs: len(msgs) >= 2, max_wait_sec=2, subscriptions=[CHANNEL])
+            assert client.clock.total == 0, "订阅推送不应形成时钟样本"
+            assert client.sync_clock(samples=3) and client.clock.total == 3
+            assert abs(client.clock.offset_ms - SKEW_MS) <= client.clock.error_ms + 1, client.clock.summary()
+        finally:
+            client.close()
+
+        client = WebSocketClient(url=skewed_exchange.ws_market_url, timeout=5, track_latency=True).connect()
+        try:
+            assert client.subscribe({"channels": [CHANNEL]}, 4)["code"] == 0
+            assert client.clock.ready, "统计延迟时订阅前应自动同步时钟"
+            assert client.recv_json()["result"]["subscription"] == CHANNEL
+            assert client.latency.result()["book"]["count"] == 1
+            assert client.dispatcher.get(CHANNEL, 2) is not None
+            stats = client.latency.result()["book"]
+            assert stats["count"] >= 2, stats
+        finally:
+            client.close()
+
+        monkeypatch.setattr(websocket_client_module, "WS_CLOCK_METHOD", "public/no-such-method")
+        client = WebSocketClient(url=skewed_exchange.ws_market_url, timeout=5, track_latency=True).connect()
+        try:
+            assert client.sync_clock() is False and client._clock_unsupported
+            assert client.subscribe({"channels": [CHANNEL]}, 5)["code"] == 0
+            assert client.clock.total == 0 and not client.clock.ready
+        finally:
+            client.close()
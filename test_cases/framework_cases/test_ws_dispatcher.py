@@ -0,0 +1,51 @@
+"""
+WebSocket 消息分发用例，对应 framework_case.md 中 FW-035。
+帧来自按顺序返回预设帧的替身读函数，不建立连接。
+"""
+import json
+
+import allure
+import pytest
+
+from core.websocket_client import WS_RESPOND_HEARTBEAT_METHOD, WebSocketClient
+from core.ws_dispatcher import MessageDispatcher
+
+SUB_BTC = "book.BTCUSD-PERP.10"
+HEARTBEAT = {"id": 99, "method": "public/heartbeat", "code": 0}
+
+
+def _push(u: int) -> dict:
+    return {"id": -1, "method": "subscribe", "code": 0, "result": {"subscription": SUB_BTC, "data": [{"u": u}]}}
+
+
+def _frames(messages: list):
+    """替身 recv_frame：依次返回预设帧，读完后返回 None（视为超时）。"""
+    frames = [json.dumps(m) for m in messages]
+    return lambda timeout: frames.pop(0) if frames else None
+
+
+@allure.epic("框架自测")
+@allure.feature("WebSocket 消息分发")
+@pytest.mark.framework
+class TestMessageDispatcher:
+    """heartbeat 回复与有界队列"""
+
+    @allure.title("FW-035 分发器回复 heartbeat（不入队）；队列满时丢弃最早消息并计数；客户端分发器默认回复 heartbeat")
+    def test_fw035_heartbeat_and_bounded_queue(self, monkeypatch):
+        replies = []
+        dispatcher = MessageDispatcher(
+            _frames([_push(1), HEARTBEAT, *(_push(u) for u in range(2, 6))]), respond_heartbeat=replies.append, max_queue=3
+        )
+        assert dispatcher.pump_for(0.05) == 6
+        assert replies == [HEARTBEAT] and dispatcher.heartbeats == 1
+        assert dispatcher.pending(SUB_BTC) == 3
+        stats = dispatcher.stats()
+        assert stats["dropped"] == {SUB_BTC: 2} and stats["routed"] == {SUB_BTC: 5}
+        assert [m["result"]["data"][0]["u"] for m in dispatcher.collect(SUB_BTC, 0.01)] == [3, 4, 5]
+
+        client = WebSocketClient(url="ws://127.0.0.1:9/exchange/v1/market")
+        sent = []
+        monkeypatch.setattr(client, "send_json", sent.append)
+        monkeypatch.setattr(client, "_pump_frame", _frames([HEARTBEAT]))
+        assert client.dispatcher.get(SUB_BTC, 0.01) is None
+        assert sent == [{"id": HEARTBEAT["id"], "method": WS_RESPOND_HEARTBEAT_METHOD}]
@@ -0,0 +1,86 @@
+"""
+WebSocket 连接池用例，对应 framework_case.md 中 FW-024 ~ FW-026。
+服务端为本进程内后台线程启动的 MockExchange（随机端口），不依赖交易所。
+"""
+import allure
+import pytest
+
+from core.ws_pool import WebSocketPool
+from utils.mock_exchange import MockExchange, MockExchangeConfig
+
+CHANNEL = "book.BTCUSD-PERP.10"
+
+
+@pytest.fixture(scope="module")
+def mock_exchange():
+    exchange = MockExchange(MockExchangeConfig(port=0, snapshot_interval_ms=100)).start()
+    yield exchange
+    exchange.stop()
+
+
+@pytest.fixture
+def pool(mock_exchange):
+    pool = WebSocketPool(mock_exchange.ws_market_url, max_idle=1, timeout=5, track_latency=True, deflate=True)
+    yield pool
+    pool.close()
+
+
+def _subscribe_and_receive(client) -> list:
+    assert client.subscribe({"channels": [CHANNEL]}, 11)["code"] == 0
+    messages = client.recv_for_seconds(0.35, subscriptions=[CHANNEL])
+    assert messages, "未收到快照"
+    return messages
+
+
+@allure.epic("框架自测")
+@allure.feature("WebSocket 连接池")
+@pytest.mark.framework
+class TestWebSocketPool:
+    """租出 / 归还时的状态复位"""
+
+    @allure.title("FW-024 复用连接不沿用上一次租用的订阅、残留帧与测量状态，解压上下文保留")
+    def test_fw024_lease_resets_state(self, pool):
+        with pool.lease() as client:
+            _subscribe_and_receive(client)
+            assert client.clock.ready and client.clock.total >= 1
+            assert client.deflate_stats is not None and client.deflate_stats.compressed_messages > 0
+            assert "book" in client.latency.result()
+            client.reconnects = 2  # 模拟本次租用期间发生过断线恢复
+            first = client
+
+        with pool.lease() as client:
+            assert client is first and pool.stats()["reused"] == 1
+            assert client.subscriptions == set()
+            assert client.clock.total == 0 and not client.clock.ready
+            assert "book" not in client.latency.result() and client.latency.clock is client.clock
+            assert client.reconnects == 0
+            assert client.deflate_stats.messages == 0 and client.deflate_stats.compressed_bytes == 0
+            assert client.recv_for_seconds(0.3) == [], "不应收到上一次租用的订阅推送"
+
+            messages = _subscribe_and_receive(client)
+            assert all(m["result"]["subscription"] == CHANNEL for m in messages)
+            assert client.clock.total >= 1, "本次租用应形成新的时钟偏移样本"
+            assert client.deflate_stats.compressed_messages >= len(messages)
+
+    @allure.title("FW-025 空闲连接被断开：租出时重连并按原参数重新鉴权，测量状态清空")
+    def test_fw025_reconnect_and_reauth(self, pool, mock_exchange):
+        config = mock_exchange.config
+        with pool.lease() as client:
+            assert client.authenticate(config.api_key, config.secret_key)["code"] == 0
+            _subscribe_and_receive(client)
+        client._ws.close()  # 模拟空闲期间连接被对端断开
+        assert not client.connected
+
+        with pool.lease() as leased:
+            assert leased is client
+            assert pool.stats()["reconnects"] == 1
+            assert leased.connected and leased.authenticated
+            assert leased.clock.total == 0 and leased.subscriptions == set()
+
+    @allure.title("FW-026 空闲连接超过 max_idle 时归还的连接被关闭丢弃")
+    def test_fw026_max_idle(self, pool):
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        assert pool.stats() == {"created": 2, "reused": 0, "reconnects": 0, "discarded": 1, "idle": 1}
+        assert first.connected and not second.connected
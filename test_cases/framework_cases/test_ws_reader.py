@@ -0,0 +1,33 @@
+"""
+WebSocket 后台读线程用例，对应 framework_case.md 中 FW-036。
+服务端为本进程内后台线程启动的 MockExchange（随机端口），不依赖交易所。
+"""
+import allure
+import pytest
+
+from core.websocket_client import WebSocketClient
+from utils.mock_exchange import MockExchange, MockExchangeConfig
+
+CHANNEL = "book.BTCUSD-PERP.10"
+
+
+@allure.epic("框架自测")
+@allure.feature("WebSocket 读线程")
+@pytest.mark.framework
+class TestWebSocketReader:
+    """读线程缓冲原始帧，消费端按需解码"""
+
+    @allure.title("FW-036 读线程缓冲原始 bytes：decode=False 取到 bytes，recv 与 recv_until 照常返回 str / dict")
+    def test_fw036_reader_keeps_bytes(self):
+        exchange = MockExchange(MockExchangeConfig(port=0, snapshot_interval_ms=50)).start()
+        client = WebSocketClient(url=exchange.ws_market_url, timeout=5, reader_thread=True).connect()
+        try:
+            assert client.subscribe({"channels": [CHANNEL]}, 3)["code"] == 0
+            raw = client._recv_frame(2, decode=False)
+            assert isinstance(raw, bytes) and CHANNEL.encode() in raw
+            assert isinstance(client.recv(), str)
+            messages = client.recv_until(lambda m, msgs: len(msgs) >= 2, max_wait_sec=2, subscriptions=[CHANNEL])
+            assert len(messages) == 2 and all(m["result"]["subscription"] == CHANNEL for m in messages)
+        finally:
+            client.close()
+            exchange.stop()
@@ -0,0 +1,161 @@
+"""
+WebSocket 断线恢复用例，对应 framework_case.md 中 FW-027 ~ FW-030、FW-037 ~ FW-038。
+服务端为本进程内后台线程启动的 MockExchange（随机端口），断线由 ws_drop_interval_sec 模拟，重连失败通过改指不可达地址模拟；
+重连退避与重试次数在用例内调小。
+"""
+import json
+from types import SimpleNamespace
+
+import allure
+import numpy as np
+import pytest
+import websocket
+
+import core.websocket_client as websocket_client_module
+from core.websocket_client import (
+    GAP_DISCONNECTED,
+    GAP_RECONNECT,
+    META_KEY,
+    WS_RESPOND_HEARTBEAT_METHOD,
+    WebSocketClient,
+    is_gap_marker,
+    reconnect_delay,
+)
+from utils.checker.sequence_checker import SequenceChecker, check_sequence, extract_sequence_fields
+from utils.mock_exchange import MockExchange, MockExchangeConfig
+
+CHANNEL = "book.BTCUSD-PERP.10"
+
+
+@pytest.fixture
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(websocket_client_module, "WS_RECONNECT_BACKOFF", 0.01)
+    monkeypatch.setattr(websocket_client_module, "WS_RECONNECT_RETRIES", 2)
+
+
+def _book(u: int, t: int, channel: str = CHANNEL) -> dict:
+    return {"result": {"subscription": channel, "data": [{"u": u, "t": t}]}}
+
+
+def _offline_client(frames: list) -> WebSocketClient:
+    """不建立连接的客户端：socket 读帧依次返回 frames（JSON 文本），读完后按超时处理。"""
+    client = WebSocketClient(url="ws://127.0.0.1:9/exchange/v1/market", timeout=1, reader_thread=False)
+    client._ws = SimpleNamespace(sock=SimpleNamespace(gettimeout=lambda: 1, settimeout=lambda timeout: None))
+    queue = [json.dumps(m) for m in frames]
+
+    def read_socket(decode=True):
+        if not queue:
+            raise websocket.WebSocketTimeoutException("timed out")
+        return queue.pop(0)
+
+    client._read_socket = read_socket
+    return client
+
+
+@allure.epic("框架自测")
+@allure.feature("WebSocket 断线恢复")
+@pytest.mark.framework
+class TestWebSocketReconnect:
+    """退避、重连重放订阅与断档标记"""
+
+    @allure.title("FW-027 重连退避：第 n 次等待在 [0, min(cap, base × 2^(n-1))] 内均匀抖动")
+    def test_fw027_reconnect_delay(self):
+        for attempt, bound in ((1, 0.5), (3, 2.0), (10, 30.0)):
+            delays = [reconnect_delay(attempt, base=0.5, cap=30) for _ in range(200)]
+            assert all(0 <= d <= bound for d in delays)
+            assert max(delays) > bound / 2, "应在上限内抖动，而非固定取值"
+
+    @allure.title("FW-028 服务端断开：自动重连、重新鉴权并重放订阅，断线处插入断档标记，序列校验不计违规")
+    def test_fw028_reconnect_resubscribe(self, fast_backoff):
+        exchange = MockExchange(MockExchangeConfig(port=0, snapshot_interval_ms=100, ws_drop_interval_sec=0.5)).start()
+        client = WebSocketClient(url=exchange.ws_market_url, timeout=5, auto_reconnect=True).connect()
+        try:
+            assert client.authenticate(exchange.config.api_key, exchange.config.secret_key)["code"] == 0
+            assert client.subscribe({"channels": [CHANNEL]}, 3)["code"] == 0
+            messages = client.recv_for_seconds(1.3)
+        finally:
+            client.close()
+            exchange.stop()
+
+        markers = [i for i, m in enumerate(messages) if is_gap_marker(m)]
+        assert markers, f"未发生断线：{exchange.counters}"
+        assert client.reconnects == len(markers)
+        for i in markers:
+            meta = messages[i][META_KEY]
+            assert meta["event"] == GAP_RECONNECT and meta["subscriptions"] == [CHANNEL]
+        assert client.authenticated, "重连后应按原参数重新鉴权"
+        after = messages[markers[-1] + 1:]
+        assert after and all(m["result"]["subscription"] == CHANNEL for m in after), "重连后应继续收到原订阅的推送"
+
+        report = SequenceChecker.assert_sequence(messages, check_pu=False)
+        assert report.reconnect_gaps.tolist() == markers
+
+    @allure.title("FW-029 重连全部失败：以 disconnected 标记结尾，返回断线前已收消息")
+    def test_fw029_reconnect_exhausted(self, fast_backoff):
+        exchange = MockExchange(MockExchangeConfig(port=0, snapshot_interval_ms=100, ws_drop_interval_sec=0.5)).start()
+        client = WebSocketClient(url=exchange.ws_market_url, timeout=5, auto_reconnect=True).connect()
+        try:
+            assert client.subscribe({"channels": [CHANNEL]}, 3)["code"] == 0
+            client.url = "ws://127.0.0.1:9/exchange/v1/market"  # 断线后重连目标不可达
+            messages = client.recv_for_seconds(2)
+        finally:
+            client.close()
+            exchange.stop()
+
+        assert exchange.counters["ws_dropped"] == 1
+        assert len(messages) >= 2 and not is_gap_marker(messages[0]), "断线前已收推送应保留"
+        assert is_gap_marker(messages[-1])
+        meta = messages[-1][META_KEY]
+        assert meta["event"] == GAP_DISCONNECTED and meta["attempts"] == 2
+        assert not any(is_gap_marker(m) for m in messages[:-1])
+        assert not client.connected
+
+    @allure.title("FW-030 断档标记处序列重新开始：u 回退与 t 倒退不计违规，单独记入 reconnect_gaps")
+    def test_fw030_sequence_restart(self):
+        gap = {META_KEY: {"event": GAP_RECONNECT}}
+        messages = [_book(10, 1000), _book(11, 1100), gap, _book(3, 900), _book(4, 1000)]
+        u, pu, t = extract_sequence_fields(messages)
+        report = check_sequence(u, pu, t, strict=True)
+        assert report.ok and report.reconnect_gaps.tolist() == [2]
+
+        report = check_sequence(*extract_sequence_fields([m for m in messages if m is not gap]), strict=True)
+        assert report.non_monotonic.tolist() == [2] and report.time_reversals.tolist() == [2]
+        assert np.array_equal(report.reconnect_gaps, np.empty(0, dtype=np.int64))
+
+    @allure.title("FW-037 断线重连不输出中途统计：延迟与压缩附件只在最终 close 时输出一次，压缩计数跨重连累计")
+    def test_fw037_reconnect_publishes_once(self, fast_backoff, monkeypatch):
+        exchange = MockExchange(MockExchangeConfig(port=0, snapshot_interval_ms=100, ws_drop_interval_sec=0.5)).start()
+        client = WebSocketClient(url=exchange.ws_market_url, timeout=5, auto_reconnect=True, track_latency=True, deflate=True)
+        published = []
+        monkeypatch.setattr(client, "_publish_latency", lambda: published.append("latency"))
+        monkeypatch.setattr(client, "_publish_deflate", lambda: published.append(client.deflate_stats.messages))
+        client.connect()
+        try:
+            assert client.subscribe({"channels": [CHANNEL]}, 3)["code"] == 0
+            messages = client.recv_for_seconds(1.3)
+            assert client.reconnects >= 1
+            assert published == [], "重连时不应输出统计"
+        finally:
+            client.close()
+            exchange.stop()
+        assert len(published) == 2 and published[1] == "latency", f"最终 close 只输出一次：{published}"
+        assert published[0] >= len([m for m in messages if not is_gap_marker(m)]), "压缩计数应含重连前收到的消息"
+
+    @allure.title("FW-038 未启用分发器时按 id 匹配响应：期间的推送按原顺序暂存供后续读取，heartbeat 回复后跳过")
+    def test_fw038_response_matched_by_id(self, monkeypatch):
+        heartbeat = {"id": 42, "method": "public/heartbeat"}
+        other = "book.ETHUSD-PERP.10"
+        client = _offline_client([_book(1, 100), heartbeat, _book(2, 200), {"id": 7, "method": "subscribe", "code": 0}, _book(5, 500, other)])
+        sent = []
+        monkeypatch.setattr(client, "send_json", sent.append)
+        client._pending.append((json.dumps(_book(0, 50)), 0, 0))  # 此前等待响应时已暂存的帧
+
+        assert client._recv_response(7) == {"id": 7, "method": "subscribe", "code": 0}
+        assert sent == [{"id": 42, "method": WS_RESPOND_HEARTBEAT_METHOD}]
+        messages = client.recv_until(None, max_wait_sec=0.05)
+        assert [m["result"]["data"][0]["u"] for m in messages] == [0, 1, 2, 5]
+
+        client = _offline_client([_book(1, 100)])
+        with pytest.raises(websocket.WebSocketTimeoutException, match="id=9"):
+            client._recv_response(9)
+        assert len(client._pending) == 1, "超时时已读到的推送仍保留"
@@ -1,5 +1,5 @@
 """
-get-candlestick 用例对应 get_candles_case.md 中 GC-001 ~ GC-015。
+get-candlestick 用例对应 get_candles_case.md 中 GC-001 ~ GC-016。
 使用 RespChecker 进行响应校验，支持 jsonpath 取值、结构比较、范围校验等。
 """
 import time
@@ -8,6 +8,7 @@ import pytest
 
 from constants import BizCode, get_biz_http_status, INSTRUMENT_BTC, INSTRUMENT_ETH
 from test_data.rest.market_data import API_GET_CANDLESTICK
+from utils.candlestick_stream import iter_candles
 from utils.checker.response_checker import RespChecker
 
 # 时间相关常量
@@ -116,6 +117,25 @@ class TestGetCandlestick:
         )
         RespChecker.assert_resp_should_be(data, "$.result.instrument_name", INSTRUMENT_ETH)
 
+    @allure.title("GC-016 跨多个 count 窗口流式拉取长区间 K 线，校验时间有序、无重复且在区间内")
+    @allure.severity(allure.severity_level.NORMAL)
+    @pytest.mark.P2
+    def test_gc016_stream_range(self, rest_client):
+        now_ms = int(time.time() * 1000)
+        interval_ms = 60 * 1000
+        end_ts = now_ms - now_ms % interval_ms
+        start_ts = end_ts - 3 * 60 * interval_ms  # 3 小时 M1，按每窗口 60 条切为 3 个窗口
+
+        candles = iter_candles(
+            rest_client, API_GET_CANDLESTICK, INSTRUMENT_BTC, "M1", start_ts, end_ts,
+            candles_per_window=60, max_in_flight=3,
+        )
+        ts = [c["t"] for c in candles]
+
+        assert ts, "区间内未返回任何 K 线"
+        assert all(start_ts <= t < end_ts for t in ts), f"存在不在 [{start_ts}, {end_ts}) 内的 K 线"
+        assert all(t1 > t0 for t0, t1 in zip(ts, ts[1:])), "K 线时间应严格递增且无重复"
+
 
 # ==================== 异常用例 ====================
 
@@ -0,0 +1,57 @@
+"""
+get-candlestick 压测：复用 GC-002~005 的 timeframe 参数化数据作为负载场景，对应 get_candles_case.md 中 GC-017。
+默认跳过，设置 LOAD_DURATION > 0 时执行；速率 / 并发 / 预热见 LOAD_RPS、LOAD_CONCURRENCY、LOAD_WARMUP。
+结果附加到 Allure 并写入 reports/load/，便于版本间对比。
+"""
+import json
+
+import allure
+import pytest
+
+from config.settings import LOAD_CONCURRENCY, LOAD_DURATION, LOAD_RPS, LOAD_WARMUP
+from constants import INSTRUMENT_BTC
+from core.load_runner import LoadRunner
+from core.rest_client import RestClient
+from core.rest_logging import RestLogPolicy
+from test_data.rest.market_data import API_GET_CANDLESTICK
+
+LOAD_REPORT_PATH = "reports/load/get_candlestick_timeframe.json"
+
+
+@allure.epic("行情数据用例")
+@allure.feature("获取行情/K线数据 - 压测")
+@pytest.mark.rest
+@pytest.mark.load
+@pytest.mark.skipif(LOAD_DURATION <= 0, reason="未设置 LOAD_DURATION，跳过压测")
+class TestGetCandlestickLoad:
+    """public/get-candlestick 持续负载场景（GC-017）"""
+
+    @allure.title("GC-017 timeframe 参数化场景持续发压，校验无请求异常与 5xx，输出吞吐与延迟分位")
+    @allure.severity(allure.severity_level.NORMAL)
+    @pytest.mark.P2
+    def test_gc017_load_timeframe(self):
+        # 压测使用独立客户端：throughput 日志模式，成功请求不打日志，避免日志成为瓶颈
+        client = RestClient(log_policy=RestLogPolicy(mode="throughput", sample_rate=0.0))
+        runner = LoadRunner(
+            client,
+            API_GET_CANDLESTICK,
+            API_GET_CANDLESTICK.get_param_cases("timeframe"),
+            build_params=lambda case: {"instrument_name": INSTRUMENT_BTC, "timeframe": case["timeframe"]},
+        )
+        try:
+            report = runner.run(LOAD_DURATION, target_rps=LOAD_RPS, concurrency=LOAD_CONCURRENCY, warmup_sec=LOAD_WARMUP)
+        finally:
+            client.close()
+
+        summary = report.summary()
+        report.dump(LOAD_REPORT_PATH)
+        allure.attach(
+            json.dumps(summary, ensure_ascii=False, indent=2),
+            name="Load Report",
+            attachment_type=allure.attachment_type.JSON,
+        )
+
+        assert report.requests > 0, "统计窗口内没有完成的请求"
+        assert not report.errors, f"存在请求异常: {report.errors}"
+        server_errors = {s: n for s, n in report.by_http_status.items() if s.startswith("5")}
+        assert not server_errors, f"存在 5xx 响应: {server_errors}"
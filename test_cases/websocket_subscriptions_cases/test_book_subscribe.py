@@ -1,26 +1,39 @@
 """
-Book 订阅用例，对应 get_book_case.md 中 GB-001 ~ GB-010。
+Book 订阅用例，对应 get_book_case.md 中 GB-001 ~ GB-016。
 
 覆盖场景：
 - 快照订阅（SNAPSHOT）：默认模式，每 500ms 强制发布快照
 - 增量订阅（SNAPSHOT_AND_UPDATE）：先快照后 update，校验 u 递增及 pu 规则
 - 空心跳：5s 无变化时发送空 book.update
 - 异常入参：缺参、非法格式等
+- 异步多连接：单个事件循环同时订阅多个合约/深度
+- 单连接多订阅：按 subscription 分发，各频道消息互不混杂
+- 本地盘口重建：快照 + 增量逐条应用，校验 pu 连续与 cs 校验和
+- 流式聚合：只取计数、到达间隔、最近 N 条、t 范围等聚合结果，不保留消息列表
+- 行情时效：估计服务端时钟偏移，校验发布到接收延迟分位数
+- 压缩传输：协商 permessage-deflate，解压后快照内容正确，线上字节少于解压后字节
 """
+import asyncio
 import random
 
 import allure
 import pytest
 
-from constants import INSTRUMENT_BTC
+from constants import INSTRUMENT_BTC, INSTRUMENT_ETH
+from core.async_websocket_client import AsyncWebSocketClient
 from core.logger import get_logger
+from core.websocket_client import WebSocketClient
+from core.ws_aggregators import ChannelCounter, InterArrivalHistogram, LastN, PublishLatency, TimeRange
 from test_data.websocket.subscriptions import API_BOOK_SUBSCRIBE, RESP_BOOK_UPDATE_EXAMPLE
 from utils.checker.response_checker import RespChecker
+from utils.checker.sequence_checker import SequenceChecker
+from utils.order_book import OrderBook
 
 # ==================== 常量 ====================
 TOLERANCE_MS = 10  # 时间误差容忍度（毫秒）
 SNAPSHOT_INTERVAL_MS = 500  # 快照订阅默认发布间隔
 HEARTBEAT_INTERVAL_MS = 5000  # 空心跳间隔
+LATENCY_SLO_MS = 1000  # 行情发布到接收延迟 p99 上限
 
 logger = get_logger(__name__)
 
@@ -197,6 +210,216 @@ class TestBookSubscribeCases:
             RespChecker.assert_list_field_increasing(all_msgs, "result.data.0.u", strict=False)
             RespChecker.assert_list_pu_matches_prev_u(all_msgs)
 
+    @allure.title("GB-012 单连接订阅多个合约/深度，按 subscription 分发后各频道仅收到自身消息")
+    @allure.severity(allure.severity_level.NORMAL)
+    @pytest.mark.P2
+    def test_bs012_multiplexed_dispatch(self, websocket_market_client):
+        """同一连接订阅 BTC depth=10 与 ETH depth=50，经 dispatcher 分别收包"""
+        client = websocket_market_client
+        dispatcher = client.dispatcher  # 启用分发器后 subscribe 按 id 等待响应，先到的推送进入各自队列
+        channels = [f"book.{INSTRUMENT_BTC}.10", f"book.{INSTRUMENT_ETH}.50"]
+
+        with allure.step(f"同一连接依次订阅 {channels}"):
+            for channel in channels:
+                msg = client.subscribe({"channels": [channel]}, random.randint(1, 10**5))
+                RespChecker.assert_biz_success(msg)
+
+        with allure.step("按 subscription 各收 2 条快照"):
+            msgs_by_channel = {
+                channel: dispatcher.get_until(channel, lambda m, msgs: len(msgs) >= 2, max_wait_sec=5.0)
+                for channel in channels
+            }
+            logger.info("dispatcher 统计: %s", dispatcher.stats())
+
+        with allure.step("校验各频道消息的 subscription / depth 与订阅一致"):
+            for channel, msgs in msgs_by_channel.items():
+                assert len(msgs) >= 2, f"{channel} 需要至少 2 条消息，实际 {len(msgs)} 条"
+                RespChecker.assert_resp_all_list_value_same(msgs, "$[*].result.subscription")
+                RespChecker.assert_resp_should_be(msgs, "$[0].result.subscription", channel)
+                RespChecker.assert_resp_should_be(msgs, "$[0].result.depth", int(channel.rsplit(".", 1)[1]))
+
+    @allure.title("GB-013 增量订阅 frequency=10，本地重建盘口，逐条校验 pu 连续与 cs 校验和")
+    @allure.severity(allure.severity_level.CRITICAL)
+    @pytest.mark.P1
+    def test_bs013_rebuild_book_checksum(self, websocket_market_client):
+        """快照 + book.update 全量应用到 OrderBook，每条增量校验序列与校验和，档位数不超过订阅深度"""
+        client = websocket_market_client
+        depth = 10
+
+        with allure.step("发起 frequency=10 增量订阅"):
+            params = {
+                "channels": [f"book.{INSTRUMENT_BTC}.{depth}"],
+                "book_subscription_type": "SNAPSHOT_AND_UPDATE",
+                "book_update_frequency": 10,
+            }
+            msg = client.subscribe(params, random.randint(1, 10**5))
+            RespChecker.assert_biz_success(msg)
+
+        with allure.step("持续收包 3 秒"):
+            follow_msgs = client.recv_for_seconds(3)
+
+        with allure.step("向量化校验 u 递增、pu 链连续、t 间隔不超过空心跳间隔"):
+            SequenceChecker.assert_sequence(follow_msgs, max_gap_ms=HEARTBEAT_INTERVAL_MS + TOLERANCE_MS)
+
+        with allure.step("逐条应用到本地盘口（pu 不连续或 cs 不一致即失败）"):
+            book = OrderBook(depth)
+            for m in follow_msgs:
+                book.apply(m)
+            logger.info("盘口重建：快照 %d 条，增量 %d 条，最优买 %s，最优卖 %s",
+                        book.snapshots, book.updates, book.best_bid, book.best_ask)
+
+        with allure.step("校验首条为快照，档位数不超过订阅深度"):
+            RespChecker.assert_resp_should_be(follow_msgs, "$[0].result.channel", "book")
+            assert book.snapshots == 1, f"期望仅首条为快照，实际 {book.snapshots} 条"
+            assert len(book.bids) <= depth and len(book.asks) <= depth, "档位数超过订阅深度"
+
+    @allure.title("GB-014 快照订阅流式聚合，仅校验计数、t 范围与最近 N 条")
+    @allure.severity(allure.severity_level.NORMAL)
+    @pytest.mark.P2
+    def test_bs014_streaming_aggregates(self, websocket_market_client):
+        """默认快照订阅收包 2 秒，消息逐条交给聚合器不保留列表：快照条数与 t 跨度符合 500ms 间隔"""
+        client = websocket_market_client
+        duration_ms = SNAPSHOT_INTERVAL_MS * 4
+
+        with allure.step("发起订阅"):
+            params = {"channels": [f"book.{INSTRUMENT_BTC}.10"]}
+            msg = client.subscribe(params, random.randint(1, 10**5))
+            RespChecker.assert_biz_success(msg)
+
+        with allure.step("流式聚合 2 秒"):
+            result = client.aggregate_for_seconds(
+                {
+                    "count": ChannelCounter(),
+                    "arrival": InterArrivalHistogram(),
+                    "last": LastN(3),
+                    "t": TimeRange(),
+                },
+                duration_ms / 1000,
+            )
+
+        with allure.step("校验仅有 book 快照，条数约为时长 / 500ms"):
+            assert set(result["count"]) == {"book"}, f"出现非快照消息：{result['count']}"
+            count = result["count"]["book"]
+            expected = duration_ms // SNAPSHOT_INTERVAL_MS
+            assert expected <= count <= expected + 1, f"快照条数 {count}，期望 {expected} ~ {expected + 1}"
+
+        with allure.step("校验 t 跨度 = (条数 - 1) × 500ms，到达间隔样本数 = 条数 - 1"):
+            span = result["t"]["span_ms"]
+            expected_span = (count - 1) * SNAPSHOT_INTERVAL_MS
+            assert abs(span - expected_span) <= TOLERANCE_MS, f"t 跨度 {span}ms，期望 {expected_span}ms"
+            assert result["arrival"]["count"] == count - 1
+
+        with allure.step("校验最近 3 条均为本订阅快照"):
+            subscriptions = [m["result"]["subscription"] for m in result["last"]]
+            assert subscriptions == [f"book.{INSTRUMENT_BTC}.10"] * 3, f"最近 3 条 subscription：{subscriptions}"
+
+    @allure.title("GB-015 估计服务端时钟偏移，校验快照发布到接收延迟 p99")
+    @allure.severity(allure.severity_level.NORMAL)
+    @pytest.mark.P2
+    def test_bs015_publish_latency(self, websocket_market_client):
+        """服务端时间请求往返形成时钟偏移样本，快照的 t 换算到本机时钟后与接收时刻相减，p99 不超过 LATENCY_SLO_MS"""
+        client = websocket_market_client
+        channel = f"book.{INSTRUMENT_BTC}.10"
+        samples_before = client.clock.total
+
+        with allure.step("服务端时间请求往返估计时钟偏移"):
+            assert client.sync_clock(), "服务端不支持时间请求，无法估计时钟偏移"
+
+        with allure.step("发起订阅"):
+            msg = client.subscribe({"channels": [channel]}, random.randint(1, 10**5))
+            RespChecker.assert_biz_success(msg)
+
+        with allure.step("流式统计发布到接收延迟 2 秒"):
+            result = client.aggregate_for_seconds({"latency": PublishLatency(client.clock, field="subscription")}, 2)
+            latency = result["latency"]
+
+        with allure.step("校验已估计出时钟偏移"):
+            assert client.clock.total > samples_before, "本用例未形成新的时钟偏移样本"
+            assert client.clock.ready, "未形成时钟偏移样本"
+            logger.info("服务端时钟偏移：%s", latency["clock"])
+
+        with allure.step(f"校验 p99 延迟不超过 {LATENCY_SLO_MS}ms"):
+            assert channel in latency, f"未统计到 {channel} 的延迟：{latency}"
+            stats = latency[channel]
+            assert stats["count"] >= 1
+            assert stats["p99_ms"] <= LATENCY_SLO_MS, f"p99 延迟 {stats['p99_ms']}ms 超过 {LATENCY_SLO_MS}ms"
+
+    @allure.title("GB-016 permessage-deflate 压缩连接订阅 50 档快照")
+    @allure.severity(allure.severity_level.NORMAL)
+    @pytest.mark.P2
+    def test_bs016_deflate_snapshot(self, websocket_market_client):
+        """单独建立请求压缩的连接，50 档快照解压后结构正确，统计线上字节与解压后字节；服务端未接受压缩时跳过"""
+        channel = f"book.{INSTRUMENT_BTC}.50"
+        client = WebSocketClient(url=websocket_market_client.url, deflate=True).connect()
+        try:
+            if client.deflate_stats is None:
+                pytest.skip("服务端未接受 permessage-deflate")
+
+            with allure.step("发起 50 档快照订阅"):
+                msg = client.subscribe({"channels": [channel]}, random.randint(1, 10**5))
+                RespChecker.assert_biz_success(msg)
+
+            with allure.step("收包 1.2 秒"):
+                messages = client.recv_for_seconds(SNAPSHOT_INTERVAL_MS * 2.4 / 1000, subscriptions=[channel])
+
+            with allure.step("校验解压后快照结构"):
+                assert len(messages) >= 2, f"收到快照 {len(messages)} 条"
+                for m in messages:
+                    RespChecker.assert_resp_should_be(m, "$.result.subscription", channel)
+                    RespChecker.assert_resp_should_be(m, "$.result.depth", 50)
+                    data = m["result"]["data"][0]
+                    assert data["asks"] and data["bids"], "快照盘口为空"
+
+            with allure.step("校验压缩统计"):
+                stats = client.deflate_stats.summary()
+                logger.info("permessage-deflate 统计：%s", stats)
+                assert stats["compressed_messages"] >= len(messages), f"压缩消息数不足：{stats}"
+                assert stats["compressed_bytes"] < stats["uncompressed_bytes"], f"压缩后未变小：{stats}"
+        finally:
+            client.close()
+
+
+# ==================== 异步多连接用例 ====================
+
+@allure.epic("WebSocket 订阅接口测试")
+@allure.feature("Book 订阅 - 异步多连接")
+@pytest.mark.websocket
+class TestBookSubscribeAsync:
+    """单个事件循环驱动多个连接、多个频道（GB-011）"""
+
+    @allure.title("GB-011 异步多连接并发订阅多个合约/深度，校验各连接首条快照与订阅一致")
+    @allure.severity(allure.severity_level.NORMAL)
+    @pytest.mark.P2
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_bs011_async_multi_connection(self, async_websocket_market_client):
+        """4 个连接各订阅一个 channel，并发收包，各自首条快照的 subscription/depth 与订阅一致"""
+        channels = [f"book.{name}.{depth}" for name in (INSTRUMENT_BTC, INSTRUMENT_ETH) for depth in (10, 50)]
+        clients = [async_websocket_market_client] + [
+            AsyncWebSocketClient(url=async_websocket_market_client.url) for _ in channels[1:]
+        ]
+
+        async def _subscribe_first_snapshot(client: AsyncWebSocketClient, channel: str) -> list:
+            await client.connect()
+            msg = await client.subscribe({"channels": [channel]}, random.randint(1, 10**5))
+            RespChecker.assert_biz_success(msg)
+            return await client.recv_until(
+                lambda m: (m.get("result") or {}).get("subscription") == channel, max_wait_sec=5.0
+            )
+
+        try:
+            with allure.step(f"{len(channels)} 个连接并发订阅 {channels}"):
+                results = await asyncio.gather(*(
+                    _subscribe_first_snapshot(client, channel) for client, channel in zip(clients, channels)
+                ))
+        finally:
+            await asyncio.gather(*(client.close() for client in clients[1:]))
+
+        with allure.step("校验各连接首条为对应频道的快照"):
+            for channel, msgs in zip(channels, results):
+                RespChecker.assert_resp_should_be(msgs, "$[0].result.subscription", channel)
+                RespChecker.assert_resp_should_be(msgs, "$[0].result.channel", "book")
+                RespChecker.assert_resp_should_be(msgs, "$[0].result.depth", int(channel.rsplit(".", 1)[1]))
+
 
 # ==================== 异常用例 ====================
 
@@ -0,0 +1,117 @@
+"""
+K 线区间流式拉取：public/get-candlestick 单次最多返回 count 条，长区间需分窗多次请求。
+iter_candles 将 [start_ts, end_ts) 按 timeframe 的 interval_ms * candles_per_window 切分为窗口，
+通过 RestClient.submit 并发拉取（在途窗口数受 max_in_flight 限制），按时间顺序逐条产出并按 t 去重，
+任意时刻内存中最多只保留 max_in_flight 个窗口的数据。
+"""
+from collections import deque
+from typing import Iterator
+
+from constants import RestApiDef
+from core.logger import get_logger
+
+logger = get_logger("candlestick_stream")
+
+_MS_MIN = 60 * 1000
+_MS_HOUR = 60 * _MS_MIN
+_MS_DAY = 24 * _MS_HOUR
+
+# timeframe -> 单根 K 线时长（毫秒）；变长周期按最短时长计（1M 按 28 天），
+# 保证 interval_ms * count 的窗口内不超过 count 根 K 线，接口不会截断；窗口偏小只会多发请求，不会漏数据
+TIMEFRAME_INTERVAL_MS = {
+    "M1": _MS_MIN, "1m": _MS_MIN,
+    "M5": 5 * _MS_MIN, "5m": 5 * _MS_MIN,
+    "M15": 15 * _MS_MIN, "15m": 15 * _MS_MIN,
+    "M30": 30 * _MS_MIN, "30m": 30 * _MS_MIN,
+    "H1": _MS_HOUR, "1h": _MS_HOUR,
+    "H2": 2 * _MS_HOUR, "2h": 2 * _MS_HOUR,
+    "H4": 4 * _MS_HOUR, "4h": 4 * _MS_HOUR,
+    "H12": 12 * _MS_HOUR, "12h": 12 * _MS_HOUR,
+    "1D": _MS_DAY, "D1": _MS_DAY, "1d": _MS_DAY,
+    "7D": 7 * _MS_DAY,
+    "14D": 14 * _MS_DAY,
+    "1M": 28 * _MS_DAY,
+}
+
+# 单次请求的最大 count
+MAX_CANDLES_PER_CALL = 300
+
+
+def iter_windows(start_ts: int, end_ts: int, window_ms: int) -> Iterator[tuple[int, int]]:
+    """将 [start_ts, end_ts) 切分为若干 [window_start, window_end) 窗口。"""
+    window_start = start_ts
+    while window_start < end_ts:
+        window_end = min(window_start + window_ms, end_ts)
+        yield window_start, window_end
+        window_start = window_end
+
+
+def iter_candles(
+    client,
+    api: RestApiDef,
+    instrument_name: str,
+    timeframe: str,
+    start_ts: int,
+    end_ts: int,
+    candles_per_window: int = MAX_CANDLES_PER_CALL,
+    max_in_flight: int = 4,
+    interval_ms: int = None,
+) -> Iterator[dict]:
+    """
+    按时间顺序流式产出 [start_ts, end_ts) 内的 K 线（原始 dict，含 o/h/l/c/v/t）。
+    :param client: RestClient（使用其 submit 在线程池中并发请求）
+    :param api: K 线接口定义，通常为 API_GET_CANDLESTICK
+    :param instrument_name: 合约名
+    :param timeframe: 周期，如 "M1"、"H1"
+    :param start_ts: 起始时间（毫秒，含）
+    :param end_ts: 结束时间（毫秒，不含）
+    :param candles_per_window: 每个窗口的 K 线条数（即请求 count），不超过 MAX_CANDLES_PER_CALL
+    :param max_in_flight: 最多同时在途的窗口请求数
+    :param interval_ms: 单根 K 线时长，默认按 TIMEFRAME_INTERVAL_MS 取值
+    :raises AssertionError: 任一窗口 HTTP 或业务码校验失败
+    """
+    interval_ms = interval_ms or TIMEFRAME_INTERVAL_MS[timeframe]
+    candles_per_window = min(candles_per_window, MAX_CANDLES_PER_CALL)
+    windows = iter_windows(start_ts, end_ts, interval_ms * candles_per_window)
+
+    def _submit(window: tuple[int, int]):
+        # end_ts 取窗口结束前 1ms，保证无论接口按闭区间还是开区间处理，窗口内都不超过 count 条；
+        # 若接口仍返回相邻窗口的边界 K 线，统一由下方按 t 去重
+        params = {
+            "instrument_name": instrument_name,
+            "timeframe": timeframe,
+            "count": candles_per_window,
+            "start_ts": window[0],
+            "end_ts": window[1] - 1,
+        }
+        return client.submit(api, params=params)
+
+    pending = deque()
+    for window in windows:
+        pending.append(_submit(window))
+        if len(pending) >= max_in_flight:
+            break
+
+    last_t = None
+    yielded = 0
+    try:
+        while pending:
+            resp = pending.popleft().result()
+            # 先补齐在途窗口再处理当前结果，保持流水线不断流
+            next_window = next(windows, None)
+            if next_window is not None:
+                pending.append(_submit(next_window))
+            data = client.check_json_success(resp)
+            candles = sorted((data.get("result") or {}).get("data") or [], key=lambda c: c["t"])
+            for candle in candles:
+                t = candle["t"]
+                if t < start_ts or t >= end_ts or (last_t is not None and t <= last_t):
+                    continue
+                last_t = t
+                yielded += 1
+                yield candle
+    finally:
+        # 提前停止迭代时取消尚未开始的窗口请求
+        for future in pending:
+            future.cancel()
+        logger.info("[K线流] %s %s [%s, %s) 共产出 %d 条", instrument_name, timeframe, start_ts, end_ts, yielded)
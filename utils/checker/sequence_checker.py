@@ -0,0 +1,177 @@
+"""
+大批量 book 推送的序列校验（向量化）：一次遍历把 u / pu / t 取到 NumPy 数组，
+再以数组运算一次性找出全部违规位置，适用于长时间收集的百万级消息（RespChecker 的逐条校验只适合少量消息）。
+- 单调性：u[i] 相对 u[i-1] 递减（strict 时为不增）
+- pu 链：pu[i] != u[i-1]（pu 缺失的消息视为快照，链从该条重新开始）
+- 时间间隔：t[i] - t[i-1] > max_gap_ms，或时间倒退
+违规下标 i 均表示「第 i 条相对第 i-1 条」不满足。
+消息列表中的断档标记（WebSocketClient 断线恢复插入的 _meta 消息）处序列重新开始：不与前一条比较，
+单独记入 reconnect_gaps，不算违规。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import allure
+import numpy as np
+
+from core.logger import get_logger
+from core.websocket_client import META_KEY
+
+logger = get_logger("sequence_checker")
+
+# 字段缺失时填充的哨兵值；断档标记行的 u 填 GAP（pu / t 填 MISSING）
+MISSING = int(np.iinfo(np.int64).min)
+GAP = MISSING + 1
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def _parse_path(path: str) -> tuple:
+    return tuple(int(k) if k.isdigit() else k for k in path.split("."))
+
+
+def _resolve(val, keys: tuple):
+    for key in keys:
+        if isinstance(key, int):
+            val = val[key] if isinstance(val, list) and len(val) > key else None
+        else:
+            val = val.get(key) if isinstance(val, dict) else None
+        if val is None:
+            return None
+    return val
+
+
+def extract_sequence_fields(
+    items: list[dict],
+    u_path: str = "result.data.0.u",
+    pu_path: str = "result.data.0.pu",
+    t_path: str = "result.data.0.t",
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    一次遍历取出 u / pu / t，返回三个 int64 数组，缺失字段填 MISSING，断档标记行的 u 填 GAP。
+    三个路径的公共前缀（默认 result.data.0）每条消息只解析一次。
+    """
+    paths = [_parse_path(p) for p in (u_path, pu_path, t_path)]
+    prefix_len = 0
+    while all(len(p) > prefix_len + 1 for p in paths) and len({p[prefix_len] for p in paths}) == 1:
+        prefix_len += 1
+    prefix = paths[0][:prefix_len]
+    u_keys, pu_keys, t_keys = (p[prefix_len:] for p in paths)
+
+    missing_row = (MISSING, MISSING, MISSING)
+    gap_row = (GAP, MISSING, MISSING)
+    rows = []
+    append = rows.append
+    for item in items:
+        if META_KEY in item:
+            append(gap_row)
+            continue
+        base = _resolve(item, prefix)
+        if base is None:
+            append(missing_row)
+            continue
+        u, pu, t = _resolve(base, u_keys), _resolve(base, pu_keys), _resolve(base, t_keys)
+        append((MISSING if u is None else u, MISSING if pu is None else pu, MISSING if t is None else t))
+    arr = np.array(rows, dtype=np.int64).reshape(-1, 3)
+    return arr[:, 0], arr[:, 1], arr[:, 2]
+
+
+@dataclass
+class SequenceReport:
+    """各类违规的消息下标（int64 数组，升序）；reconnect_gaps 为断档标记所在下标（不算违规）。"""
+
+    count: int
+    missing_u: np.ndarray = field(default_factory=lambda: _EMPTY)
+    non_monotonic: np.ndarray = field(default_factory=lambda: _EMPTY)
+    chain_breaks: np.ndarray = field(default_factory=lambda: _EMPTY)
+    time_gaps: np.ndarray = field(default_factory=lambda: _EMPTY)
+    time_reversals: np.ndarray = field(default_factory=lambda: _EMPTY)
+    reconnect_gaps: np.ndarray = field(default_factory=lambda: _EMPTY)
+
+    _KINDS = ("missing_u", "non_monotonic", "chain_breaks", "time_gaps", "time_reversals")
+
+    @property
+    def ok(self) -> bool:
+        return all(len(getattr(self, kind)) == 0 for kind in self._KINDS)
+
+    def summary(self, max_indices: int = 20) -> dict:
+        """各类违规数量及前 max_indices 个下标。"""
+        out = {"count": self.count}
+        for kind in (*self._KINDS, "reconnect_gaps"):
+            indices = getattr(self, kind)
+            out[kind] = {"total": int(len(indices)), "indices": indices[:max_indices].tolist()}
+        return out
+
+
+def check_sequence(
+    u: np.ndarray,
+    pu: np.ndarray = None,
+    t: np.ndarray = None,
+    strict: bool = False,
+    max_gap_ms: int = None,
+) -> SequenceReport:
+    """
+    对已提取的数组做向量化校验，返回全部违规下标。
+    :param u: u 数组（MISSING 表示缺失，GAP 表示断档标记）
+    :param pu: pu 数组，None 表示不校验 pu 链
+    :param t: t 数组，None 表示不校验时间
+    :param strict: u 是否要求严格递增
+    :param max_gap_ms: 相邻消息 t 的最大间隔（毫秒），None 表示只校验时间不倒退
+    """
+    u = np.asarray(u, dtype=np.int64)
+    report = SequenceReport(count=len(u))
+    missing = u == MISSING
+    gaps = u == GAP
+    has_u = ~(missing | gaps)
+    report.missing_u = np.flatnonzero(missing)
+    report.reconnect_gaps = np.flatnonzero(gaps)
+    if len(u) < 2:
+        return report
+
+    both_u = has_u[1:] & has_u[:-1]
+    du = np.diff(u)
+    bad = (du <= 0) if strict else (du < 0)
+    report.non_monotonic = np.flatnonzero(bad & both_u) + 1
+
+    if pu is not None:
+        pu = np.asarray(pu, dtype=np.int64)
+        linked = (pu[1:] != MISSING) & has_u[:-1]
+        report.chain_breaks = np.flatnonzero(linked & (pu[1:] != u[:-1])) + 1
+
+    if t is not None:
+        t = np.asarray(t, dtype=np.int64)
+        both_t = (t[1:] != MISSING) & (t[:-1] != MISSING)
+        dt = np.diff(t)
+        report.time_reversals = np.flatnonzero(both_t & (dt < 0)) + 1
+        if max_gap_ms is not None:
+            report.time_gaps = np.flatnonzero(both_t & (dt > max_gap_ms)) + 1
+    return report
+
+
+class SequenceChecker:
+    """book 推送序列的向量化断言，失败时一次列出全部违规位置。"""
+
+    @classmethod
+    @allure.step("断言 u 递增、pu 链连续、t 间隔不超过 {max_gap_ms}ms（向量化）")
+    def assert_sequence(
+        cls,
+        items: list[dict],
+        strict: bool = False,
+        max_gap_ms: int = None,
+        check_pu: bool = True,
+        u_path: str = "result.data.0.u",
+        pu_path: str = "result.data.0.pu",
+        t_path: str = "result.data.0.t",
+    ) -> SequenceReport:
+        """
+        校验消息列表的 u / pu / t 序列，全部通过返回 SequenceReport，否则断言失败并给出各类违规数量与下标。
+        Example:
+            SequenceChecker.assert_sequence(msgs, max_gap_ms=5100)
+        """
+        u, pu, t = extract_sequence_fields(items, u_path, pu_path, t_path)
+        report = check_sequence(u, pu if check_pu else None, t, strict=strict, max_gap_ms=max_gap_ms)
+        summary = report.summary()
+        logger.info("序列校验：%s", summary)
+        assert report.ok, f"序列校验失败：{summary}"
+        return report
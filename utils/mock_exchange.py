@@ -0,0 +1,593 @@
+"""
+本地模拟交易所（REST + WebSocket market/user），用于离线运行、框架自身基准测试与高负载场景（不受 UAT 限流影响）。
+- REST：GET {prefix}/public/get-candlestick，按 timeframe / count / start_ts / end_ts 生成确定性 K 线，
+  入参校验与业务码与真实接口一致（缺 instrument_name -> 40003，空串/非法合约 -> 40004，非法 timeframe -> 40003）
+- WebSocket {prefix}/market、{prefix}/user：subscribe book.{instrument}.{depth}（SNAPSHOT / SNAPSHOT_AND_UPDATE）、
+  unsubscribe、public/auth、public/respond-heartbeat、public/get-time（result.t 为处理请求时的服务端时间）；服务端定时下发 public/heartbeat
+- 订单簿按 book_change_rate（次/秒）随机变化；增量订阅按 book_update_frequency 推送 book.update（u/pu 连续），
+  无变化满 empty_update_interval_ms 时推送空 book.update；消息中 t 按调度时刻精确递增
+- 可配置 REST/WS 延迟、REST 限流（超限返回 HTTP 429 / 42901）、REST 响应压缩（按 Accept-Encoding 协商），见 MockExchangeConfig
+
+用法：
+    python -m utils.mock_exchange --port 8765 --book-change-rate 20
+    TEST_ENV=local pytest
+也可在代码中启动（后台线程运行事件循环）：
+    with MockExchange(MockExchangeConfig(port=0)) as mock:
+        client = RestClient(mock.rest_url)
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+
+from aiohttp import WSMsgType, web
+
+from config.settings import MOCK_EXCHANGE_HOST, MOCK_EXCHANGE_PORT
+from constants import INSTRUMENT_BTC, INSTRUMENT_ETH, BizCode, get_biz_http_status, get_biz_infos
+from core.logger import get_logger
+from core.ws_signature import params_to_str
+from utils.candlestick_stream import MAX_CANDLES_PER_CALL, TIMEFRAME_INTERVAL_MS
+from utils.order_book import book_checksum
+
+logger = get_logger("mock_exchange")
+
+# 合约参考价与最小价格变动
+INSTRUMENT_SPECS = {
+    INSTRUMENT_BTC: {"price": 30000.0, "tick": 0.5},
+    INSTRUMENT_ETH: {"price": 2000.0, "tick": 0.01},
+}
+
+BOOK_DEPTHS = (10, 50)
+BOOK_SUBSCRIPTION_TYPES = ("SNAPSHOT", "SNAPSHOT_AND_UPDATE")
+# 各订阅模式允许的 book_update_frequency（毫秒），首个为默认值
+BOOK_UPDATE_FREQUENCIES = {"SNAPSHOT": (500,), "SNAPSHOT_AND_UPDATE": (10, 100)}
+DEFAULT_CANDLE_COUNT = 25
+DEFAULT_TIMEFRAME = "1m"
+
+
+@dataclass
+class MockExchangeConfig:
+    """
+    模拟交易所行为参数：
+    - host / port: 监听地址，port=0 时随机端口（启动后见 MockExchange.port）
+    - prefix: URL 前缀，与真实环境 /exchange/v1 一致
+    - rest_latency_ms / rest_jitter_ms: REST 响应固定延迟与随机抖动上限（毫秒）
+    - rest_rate_limit: REST 每秒最大请求数（全局），超出返回 HTTP 429 / 42901；0 表示不限流
+    - rest_compression: REST 响应是否按请求的 Accept-Encoding 压缩（gzip / deflate）
+    - ws_latency_ms: WebSocket 每条下发消息的附加延迟（毫秒）
+    - ws_compression: 客户端请求 permessage-deflate 时是否接受（接受后下发消息全部压缩）
+    - ws_drop_interval_sec: 每个 WebSocket 连接建立该时长后被服务端断开一次（模拟断线；客户端重连后新连接重新计时）；0 表示不断开
+    - clock_skew_ms: 推送中 t / tt 与 public/get-time 响应 t 相对本机时钟的偏移（毫秒），模拟服务端时钟偏差
+    - book_change_rate: 每个订阅的订单簿每秒变化次数；0 表示订单簿静止（SNAPSHOT 模式 u 不变）
+    - snapshot_interval_ms: SNAPSHOT 模式快照间隔
+    - empty_update_interval_ms: 增量订阅无变化时空 book.update 的间隔
+    - heartbeat_interval_sec: 服务端 public/heartbeat 间隔；0 表示不发送
+    - api_key / secret_key: public/auth 校验用；请求未带 sig 时直接通过
+    """
+
+    host: str = MOCK_EXCHANGE_HOST
+    port: int = MOCK_EXCHANGE_PORT
+    prefix: str = "/exchange/v1"
+    instruments: dict = field(default_factory=lambda: dict(INSTRUMENT_SPECS))
+    rest_latency_ms: float = 0.0
+    rest_jitter_ms: float = 0.0
+    rest_rate_limit: float = 0.0
+    rest_compression: bool = True
+    ws_latency_ms: float = 0.0
+    ws_compression: bool = True
+    ws_drop_interval_sec: float = 0.0
+    clock_skew_ms: int = 0
+    book_change_rate: float = 0.0
+    snapshot_interval_ms: int = 500
+    empty_update_interval_ms: int = 5000
+    heartbeat_interval_sec: float = 30.0
+    api_key: str = "LOCAL_API_KEY"
+    secret_key: str = "LOCAL_SECRET_KEY"
+    seed: int = None
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _error_body(method: str, biz_code: int, request_id: int = -1) -> dict:
+    infos = get_biz_infos(biz_code)
+    message = infos[0]["message"] if infos else "Unknown error"
+    return {"id": request_id, "method": method, "code": biz_code, "message": message}
+
+
+# ========== K 线 ==========
+
+def make_candle(instrument: str, interval_ms: int, t: int) -> dict:
+    """按 (合约, 周期, t) 生成确定性 K 线，同一参数多次请求结果一致。"""
+    spec = INSTRUMENT_SPECS.get(instrument, {"price": 100.0})
+    rnd = random.Random(zlib.crc32(f"{instrument}:{interval_ms}:{t}".encode()))
+    # 以天为周期缓慢波动的参考价
+    mid = spec["price"] * (1 + 0.05 * math.sin(t / 86_400_000))
+    o = mid * (1 + rnd.uniform(-0.002, 0.002))
+    c = mid * (1 + rnd.uniform(-0.002, 0.002))
+    h = max(o, c) * (1 + rnd.uniform(0, 0.001))
+    low = min(o, c) * (1 - rnd.uniform(0, 0.001))
+    return {
+        "o": f"{o:.2f}", "h": f"{h:.2f}", "l": f"{low:.2f}", "c": f"{c:.2f}",
+        "v": f"{rnd.uniform(0.1, 50):.4f}", "t": t,
+    }
+
+
+def make_candles(instrument: str, interval_ms: int, count: int, start_ts: int = None, end_ts: int = None) -> list:
+    """返回 [start_ts, end_ts] 内按周期对齐的最近 count 根 K 线（t 升序）。"""
+    end_ts = end_ts if end_ts is not None else _now_ms()
+    last = end_ts - end_ts % interval_ms
+    first = last - (count - 1) * interval_ms
+    if start_ts is not None:
+        first = max(first, start_ts + (-start_ts) % interval_ms)
+    return [make_candle(instrument, interval_ms, t) for t in range(first, last + 1, interval_ms)]
+
+
+# ========== 订单簿 ==========
+
+class _BookSim:
+    """单个订阅的模拟订单簿：每侧固定 depth 档，随机改量或撤档/新增档，u 随每次变化递增。"""
+
+    def __init__(self, instrument: str, depth: int, spec: dict, rnd: random.Random):
+        self.depth = depth
+        self.tick = spec["tick"]
+        self.rnd = rnd
+        self.decimals = max(0, -int(math.floor(math.log10(self.tick))))
+        mid_ticks = int(spec["price"] / self.tick)
+        # 价格以 tick 整数表示：bid 在 mid 下方，ask 在 mid 上方，各自可用区间为 2 * depth 档
+        self.bid_range = range(mid_ticks - 2 * depth, mid_ticks)
+        self.ask_range = range(mid_ticks + 1, mid_ticks + 1 + 2 * depth)
+        self.bids = {p: self._level() for p in self.bid_range[-depth:]}
+        self.asks = {p: self._level() for p in self.ask_range[:depth]}
+        self.u = _now_ms() * 1000
+
+    def _level(self) -> tuple:
+        return round(self.rnd.uniform(0.001, 5), 4), self.rnd.randint(1, 5)
+
+    def _fmt(self, price: int, qty: float, count: int) -> list:
+        return [f"{price * self.tick:.{self.decimals}f}", f"{qty:.4f}", str(count)]
+
+    def mutate(self, n: int) -> dict:
+        """随机变化 n 次，返回 {(side, price): [价, 量, 笔数]}，量为 0 表示该档被撤销。"""
+        changes = {}
+        for _ in range(n):
+            side = self.rnd.choice(("bids", "asks"))
+            levels = getattr(self, side)
+            price = self.rnd.choice(list(levels))
+            if self.rnd.random() < 0.7:
+                levels[price] = self._level()
+                changes[(side, price)] = self._fmt(price, *levels[price])
+            else:
+                # 撤一档并在空闲价位补一档，保持每侧 depth 档
+                del levels[price]
+                changes[(side, price)] = self._fmt(price, 0, 0)
+                free = [p for p in (self.bid_range if side == "bids" else self.ask_range) if p not in levels]
+                new_price = self.rnd.choice(free)
+                levels[new_price] = self._level()
+                changes[(side, new_price)] = self._fmt(new_price, *levels[new_price])
+            self.u += 1
+        return changes
+
+    def snapshot(self) -> tuple[list, list]:
+        bids = [self._fmt(p, *self.bids[p]) for p in sorted(self.bids, reverse=True)]
+        asks = [self._fmt(p, *self.asks[p]) for p in sorted(self.asks)]
+        return bids, asks
+
+
+# ========== 服务端 ==========
+
+class _RestThrottle:
+    """REST 全局固定窗口（1 秒）限流计数。"""
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self._window = 0
+        self._count = 0
+
+    def allow(self) -> bool:
+        if self.limit <= 0:
+            return True
+        window = int(time.monotonic())
+        if window != self._window:
+            self._window, self._count = window, 0
+        self._count += 1
+        return self._count <= self.limit
+
+
+class _WsSession:
+    """单个 WebSocket 连接：处理请求、维护订阅推送任务与心跳。"""
+
+    def __init__(self, exchange: "MockExchange", ws: web.WebSocketResponse):
+        self.exchange = exchange
+        self.config = exchange.config
+        self.ws = ws
+        self.authenticated = False
+        self._send_lock = asyncio.Lock()
+        self._tasks = {}  # subscription -> Task
+
+    async def send(self, obj: dict) -> None:
+        if self.config.ws_latency_ms:
+            await asyncio.sleep(self.config.ws_latency_ms / 1000)
+        async with self._send_lock:
+            if not self.ws.closed:
+                await self.ws.send_str(json.dumps(obj, separators=(",", ":")))
+                self.exchange.counters["ws_sent"] += 1
+
+    async def run(self) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat_loop()) if self.config.heartbeat_interval_sec > 0 else None
+        drop = asyncio.create_task(self._drop_later()) if self.config.ws_drop_interval_sec > 0 else None
+        try:
+            async for msg in self.ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                self.exchange.counters["ws_received"] += 1
+                try:
+                    req = json.loads(msg.data)
+                except ValueError:
+                    await self.send(_error_body("", BizCode.BAD_REQUEST))
+                    continue
+                await self._handle(req)
+        finally:
+            for task in [heartbeat, drop, *self._tasks.values()]:
+                if task is not None:
+                    task.cancel()
+
+    async def _handle(self, req: dict) -> None:
+        method = req.get("method")
+        request_id = req.get("id", -1)
+        if method == "public/respond-heartbeat":
+            return
+        if method == "public/get-time":
+            # 服务端处理请求时的时间戳，供客户端以往返样本估计时钟偏移
+            await self.send({"id": request_id, "method": method, "code": 0, "result": {"t": _now_ms() + self.config.clock_skew_ms}})
+            return
+        if method == "public/auth":
+            self.authenticated = self._verify_sig(req)
+            if self.authenticated:
+                await self.send({"id": request_id, "method": method, "code": 0})
+            else:
+                await self.send(_error_body(method, BizCode.UNAUTHORIZED, request_id))
+        elif method == "subscribe":
+            await self._subscribe(request_id, req.get("params") or {})
+        elif method == "unsubscribe":
+            for channel in (req.get("params") or {}).get("channels") or []:
+                task = self._tasks.pop(channel, None)
+                if task is not None:
+                    task.cancel()
+            await self.send({"id": request_id, "method": method, "code": 0})
+        else:
+            await self.send(_error_body(method, BizCode.METHOD_NOT_FOUND, request_id))
+
+    def _verify_sig(self, req: dict) -> bool:
+        """请求带 sig 时按 ws_signature 规则校验 HMAC-SHA256；未带 sig 直接通过。"""
+        if "sig" not in req:
+            return True
+        payload = (
+            req["method"] + str(req.get("id")) + str(req.get("api_key")) + params_to_str(req.get("params") or {}, 0)
+            + str(req.get("nonce"))
+        )
+        expected = hmac.new(self.config.secret_key.encode(), payload.encode(), hashlib.sha256).hexdigest()
+        return req.get("api_key") == self.config.api_key and hmac.compare_digest(expected, str(req["sig"]))
+
+    async def _subscribe(self, request_id: int, params: dict) -> None:
+        channels = params.get("channels")
+        sub_type = params.get("book_subscription_type", "SNAPSHOT")
+        frequency = params.get("book_update_frequency")
+        parsed = []
+        valid = isinstance(channels, list) and bool(channels) and sub_type in BOOK_SUBSCRIPTION_TYPES
+        if valid:
+            allowed = BOOK_UPDATE_FREQUENCIES[sub_type]
+            valid = frequency is None or frequency in allowed
+            frequency = frequency or allowed[0]
+        for channel in channels if valid else []:
+            parts = str(channel).split(".")
+            if (
+                len(parts) != 3 or parts[0] != "book" or parts[1] not in self.config.instruments
+                or not parts[2].isdigit() or int(parts[2]) not in BOOK_DEPTHS
+            ):
+                valid = False
+                break
+            parsed.append((channel, parts[1], int(parts[2])))
+        if not valid:
+            await self.send(_error_body("subscribe", BizCode.INVALID_REQUEST, request_id))
+            return
+
+        await self.send({"id": request_id, "method": "subscribe", "code": 0})
+        for channel, instrument, depth in parsed:
+            old = self._tasks.pop(channel, None)
+            if old is not None:
+                old.cancel()
+            loop = self._update_loop if sub_type == "SNAPSHOT_AND_UPDATE" else self._snapshot_loop
+            self._tasks[channel] = asyncio.create_task(loop(channel, instrument, depth, frequency))
+
+    async def _drop_later(self) -> None:
+        await asyncio.sleep(self.config.ws_drop_interval_sec)
+        self.exchange.counters["ws_dropped"] += 1
+        await self.ws.close()
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.heartbeat_interval_sec)
+            await self.send({"id": _now_ms(), "method": "public/heartbeat", "code": 0})
+
+    def _book_msg(self, channel: str, instrument: str, depth: int, kind: str, data: dict) -> dict:
+        if self.config.clock_skew_ms:
+            data = {**data, "t": data["t"] + self.config.clock_skew_ms, "tt": data["tt"] + self.config.clock_skew_ms}
+        return {
+            "id": -1,
+            "method": "subscribe",
+            "code": 0,
+            "result": {
+                "instrument_name": instrument,
+                "subscription": channel,
+                "channel": kind,
+                "depth": depth,
+                "data": [data],
+            },
+        }
+
+    def _new_book(self, instrument: str, depth: int) -> _BookSim:
+        seed = self.config.seed if self.config.seed is not None else random.randrange(1 << 32)
+        return _BookSim(instrument, depth, self.config.instruments[instrument], random.Random(seed))
+
+    @staticmethod
+    async def _sleep_until(t_ms: int) -> None:
+        delay = (t_ms - time.time() * 1000) / 1000
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _changes_due(self, interval_ms: int, state: list) -> int:
+        """按 book_change_rate 累计本周期应发生的变化次数（state[0] 保存小数部分）。"""
+        state[0] += self.config.book_change_rate * interval_ms / 1000
+        n = int(state[0])
+        state[0] -= n
+        return n
+
+    async def _snapshot_loop(self, channel: str, instrument: str, depth: int, interval_ms: int) -> None:
+        """SNAPSHOT：每 interval_ms 推送一次完整快照。"""
+        book = self._new_book(instrument, depth)
+        acc = [0.0]
+        t = _now_ms()
+        while True:
+            bids, asks = book.snapshot()
+            await self.send(self._book_msg(channel, instrument, depth, "book", {
+                "asks": asks, "bids": bids, "t": t, "tt": t, "u": book.u, "cs": book_checksum(bids, asks),
+            }))
+            t += interval_ms
+            await self._sleep_until(t)
+            book.mutate(self._changes_due(interval_ms, acc))
+
+    async def _update_loop(self, channel: str, instrument: str, depth: int, interval_ms: int) -> None:
+        """SNAPSHOT_AND_UPDATE：先推送快照，之后每 interval_ms 推送有变化的档位；长时间无变化推送空 update。"""
+        book = self._new_book(instrument, depth)
+        acc = [0.0]
+        t = _now_ms()
+        bids, asks = book.snapshot()
+        await self.send(self._book_msg(channel, instrument, depth, "book", {
+            "asks": asks, "bids": bids, "t": t, "tt": t, "u": book.u, "cs": book_checksum(bids, asks),
+        }))
+        last_sent = t
+        while True:
+            t += interval_ms
+            await self._sleep_until(t)
+            pu = book.u
+            changes = book.mutate(self._changes_due(interval_ms, acc))
+            if not changes and t - last_sent < self.config.empty_update_interval_ms:
+                continue
+            if not changes:
+                book.u += 1
+            update = {"asks": [], "bids": []}
+            for (side, _), level in sorted(changes.items()):
+                update[side].append(level)
+            bids, asks = book.snapshot()
+            await self.send(self._book_msg(channel, instrument, depth, "book.update", {
+                "update": update, "t": t, "tt": t, "u": book.u, "pu": pu, "cs": book_checksum(bids, asks),
+            }))
+            last_sent = t
+
+
+class MockExchange:
+    """模拟交易所服务：可在当前事件循环中 await start_async()，或 start() 在后台线程运行。"""
+
+    def __init__(self, config: MockExchangeConfig = None):
+        self.config = config or MockExchangeConfig()
+        self.port = self.config.port
+        self.counters = {
+            "rest_requests": 0,
+            "rest_throttled": 0,
+            "ws_connections": 0,
+            "ws_sent": 0,
+            "ws_received": 0,
+            "ws_dropped": 0,
+        }
+        self._throttle = _RestThrottle(self.config.rest_rate_limit)
+        self._runner = None
+        self._loop = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.config.host}:{self.port}{self.config.prefix}"
+
+    @property
+    def rest_url(self) -> str:
+        return f"http://{self.base_url}"
+
+    @property
+    def ws_market_url(self) -> str:
+        return f"ws://{self.base_url}/market"
+
+    @property
+    def ws_user_url(self) -> str:
+        return f"ws://{self.base_url}/user"
+
+    def build_app(self) -> web.Application:
+        prefix = self.config.prefix
+        app = web.Application()
+        app.router.add_get(f"{prefix}/market", self._ws_handler)
+        app.router.add_get(f"{prefix}/user", self._ws_handler)
+        app.router.add_get(f"{prefix}/public/get-candlestick", self._get_candlestick)
+        app.router.add_route("*", prefix + "/{method:.*}", self._method_not_found)
+        return app
+
+    async def _rest_delay(self) -> None:
+        delay = self.config.rest_latency_ms + random.uniform(0, self.config.rest_jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    def _rest_json(self, method: str, biz_code: int, result: dict = None) -> web.Response:
+        body = {"id": -1, "method": method, "code": 0, "result": result} if biz_code == 0 else _error_body(method, biz_code)
+        resp = web.json_response(body, status=get_biz_http_status(biz_code))
+        if self.config.rest_compression:
+            resp.enable_compression()
+        return resp
+
+    async def _get_candlestick(self, request: web.Request) -> web.Response:
+        method = "public/get-candlestick"
+        self.counters["rest_requests"] += 1
+        if not self._throttle.allow():
+            self.counters["rest_throttled"] += 1
+            return self._rest_json(method, BizCode.TOO_MANY_REQUESTS)
+        await self._rest_delay()
+
+        query = request.query
+        instrument = query.get("instrument_name")
+        if instrument is None:
+            return self._rest_json(method, BizCode.INVALID_REQUEST)
+        if instrument not in self.config.instruments:
+            return self._rest_json(method, BizCode.MISSING_OR_INVALID_ARGUMENT)
+        timeframe = query.get("timeframe", DEFAULT_TIMEFRAME)
+        if timeframe not in TIMEFRAME_INTERVAL_MS:
+            return self._rest_json(method, BizCode.INVALID_REQUEST)
+        try:
+            count = min(int(query.get("count", DEFAULT_CANDLE_COUNT)), MAX_CANDLES_PER_CALL)
+            start_ts = int(query["start_ts"]) if "start_ts" in query else None
+            end_ts = int(query["end_ts"]) if "end_ts" in query else None
+        except ValueError:
+            return self._rest_json(method, BizCode.INVALID_REQUEST)
+        if count <= 0 or (start_ts is not None and end_ts is not None and start_ts > end_ts):
+            data = []
+        else:
+            data = make_candles(instrument, TIMEFRAME_INTERVAL_MS[timeframe], count, start_ts, end_ts)
+        return self._rest_json(method, BizCode.SUCCESS, {"interval": timeframe, "instrument_name": instrument, "data": data})
+
+    async def _method_not_found(self, request: web.Request) -> web.Response:
+        self.counters["rest_requests"] += 1
+        return self._rest_json(request.match_info["method"], BizCode.METHOD_NOT_FOUND)
+
+    async def _ws_handler(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(compress=self.config.ws_compression)
+        await ws.prepare(request)
+        self.counters["ws_connections"] += 1
+        await _WsSession(self, ws).run()
+        return ws
+
+    # ========== 启停 ==========
+
+    async def start_async(self) -> "MockExchange":
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.config.host, self.config.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        logger.info("Mock exchange listening on %s", self.rest_url)
+        return self
+
+    async def stop_async(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+            logger.info("Mock exchange stopped, stats: %s", self.counters)
+
+    def start(self) -> "MockExchange":
+        """在后台线程中启动（独立事件循环），返回时已开始监听。"""
+        started = threading.Event()
+        errors = []
+
+        def _run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.start_async())
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=_run, name="mock_exchange", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop_async(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self) -> "MockExchange":
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="本地模拟交易所（REST + WebSocket）")
+    parser.add_argument("--host", default=MOCK_EXCHANGE_HOST)
+    parser.add_argument("--port", type=int, default=MOCK_EXCHANGE_PORT)
+    parser.add_argument("--rest-latency-ms", type=float, default=0.0, help="REST 固定延迟（毫秒）")
+    parser.add_argument("--rest-jitter-ms", type=float, default=0.0, help="REST 随机抖动上限（毫秒）")
+    parser.add_argument("--rest-rate-limit", type=float, default=0.0, help="REST 每秒最大请求数，0 不限流")
+    parser.add_argument("--no-rest-compression", action="store_true", help="REST 响应不压缩")
+    parser.add_argument("--ws-latency-ms", type=float, default=0.0, help="WebSocket 下发消息附加延迟（毫秒）")
+    parser.add_argument("--no-ws-compression", action="store_true", help="不接受 WebSocket permessage-deflate")
+    parser.add_argument("--ws-drop-interval", type=float, default=0.0, help="WebSocket 连接建立多少秒后被断开一次（重连后重新计时），0 不断开")
+    parser.add_argument("--clock-skew-ms", type=int, default=0, help="推送 t 相对本机时钟的偏移（毫秒）")
+    parser.add_argument("--book-change-rate", type=float, default=0.0, help="订单簿每秒变化次数")
+    parser.add_argument("--heartbeat-interval", type=float, default=30.0, help="服务端心跳间隔（秒），0 不发送")
+    args = parser.parse_args(argv)
+    config = MockExchangeConfig(
+        host=args.host,
+        port=args.port,
+        rest_latency_ms=args.rest_latency_ms,
+        rest_jitter_ms=args.rest_jitter_ms,
+        rest_rate_limit=args.rest_rate_limit,
+        rest_compression=not args.no_rest_compression,
+        ws_latency_ms=args.ws_latency_ms,
+        ws_compression=not args.no_ws_compression,
+        ws_drop_interval_sec=args.ws_drop_interval,
+        clock_skew_ms=args.clock_skew_ms,
+        book_change_rate=args.book_change_rate,
+        heartbeat_interval_sec=args.heartbeat_interval,
+    )
+
+    async def _serve():
+        exchange = await MockExchange(config).start_async()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await exchange.stop_async()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
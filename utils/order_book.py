@@ -0,0 +1,171 @@
+"""
+本地订单簿：按 book 快照与 book.update 增量重建盘口，逐条校验序列（pu == 上一条 u）与校验和 cs。
+- 档位格式为 [价格, 数量, 笔数]（字符串），数量为 0 表示撤档
+- 每侧维护按价格有序的键列表（bisect 定位，O(log n) 查找）+ 价格 -> 档位字典；
+  插入/删除为列表内存移动，订阅深度（≤ 150 档）下开销可忽略，10ms 更新频率下不会积压
+- 每次应用后按订阅深度截断，并按截断后的盘口计算校验和（默认 book_checksum，可替换）
+- 断线恢复的断档标记（_meta 消息）使盘口回到未就绪状态，等待重连后的快照
+"""
+import bisect
+import zlib
+from typing import Callable, Optional
+
+from core.logger import get_logger
+from core.websocket_client import META_KEY
+
+logger = get_logger("order_book")
+
+CHANNEL_BOOK = "book"
+CHANNEL_BOOK_UPDATE = "book.update"
+
+
+def book_checksum(bids: list, asks: list) -> int:
+    """订单簿校验和：按档位交替拼接「bid价:bid量:ask价:ask量」后取 CRC32（无符号）。"""
+    parts = []
+    for i in range(max(len(bids), len(asks))):
+        if i < len(bids):
+            parts.extend(bids[i][:2])
+        if i < len(asks):
+            parts.extend(asks[i][:2])
+    return zlib.crc32(":".join(parts).encode("ascii"))
+
+
+class BookSequenceError(AssertionError):
+    """book.update 的 pu 与本地 u 不连续（漏包或乱序），需重新订阅获取快照。"""
+
+
+class BookChecksumError(AssertionError):
+    """本地盘口校验和与消息中的 cs 不一致。"""
+
+
+class _BookSide:
+    """盘口单侧：sort_keys 升序（bid 以负价格存储，使两侧都是最优价在前）。"""
+
+    def __init__(self, descending: bool):
+        self._sign = -1.0 if descending else 1.0
+        self._keys = []
+        self._levels = {}  # sort_key -> [价, 量, 笔数]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._levels.clear()
+
+    def apply(self, level: list) -> None:
+        key = self._sign * float(level[0])
+        if float(level[1]) == 0:
+            if self._levels.pop(key, None) is not None:
+                del self._keys[bisect.bisect_left(self._keys, key)]
+            return
+        if key not in self._levels:
+            bisect.insort(self._keys, key)
+        self._levels[key] = level
+
+    def truncate(self, depth: int) -> None:
+        for key in self._keys[depth:]:
+            del self._levels[key]
+        del self._keys[depth:]
+
+    def top(self, n: Optional[int] = None) -> list:
+        return [self._levels[k] for k in self._keys[:n]]
+
+
+def _as_levels(levels: list) -> list:
+    """兼容单档写法（如 RESP_BOOK_UPDATE_EXAMPLE 中 "asks": ["价", "量", "笔数"]）。"""
+    if levels and isinstance(levels[0], str):
+        return [levels]
+    return levels
+
+
+class OrderBook:
+    """单个 book 订阅的本地盘口。apply(msg) 接收订阅推送，快照重置盘口，增量按档位更新。"""
+
+    def __init__(
+        self,
+        depth: int,
+        checksum: Optional[Callable[[list, list], int]] = book_checksum,
+        verify_sequence: bool = True,
+    ):
+        """
+        :param depth: 订阅深度，每侧保留的最大档位数
+        :param checksum: 校验和函数 checksum(bids, asks) -> int，None 表示不校验 cs
+        :param verify_sequence: 是否校验增量的 pu == 上一条 u
+        """
+        self.depth = depth
+        self.checksum = checksum
+        self.verify_sequence = verify_sequence
+        self.bids = _BookSide(descending=True)
+        self.asks = _BookSide(descending=False)
+        self.u: Optional[int] = None
+        self.t: Optional[int] = None
+        self.snapshots = 0
+        self.updates = 0
+
+    @property
+    def ready(self) -> bool:
+        """是否已收到快照。"""
+        return self.u is not None
+
+    def apply(self, msg: dict) -> None:
+        """应用一条 book / book.update 推送（完整消息或其 result 均可），其他 channel 忽略；断档标记使盘口待重新快照。"""
+        if META_KEY in msg:
+            self.u = None
+            return
+        result = msg.get("result", msg)
+        channel = result.get("channel")
+        for data in result.get("data") or ():
+            if channel == CHANNEL_BOOK:
+                self.apply_snapshot(data)
+            elif channel == CHANNEL_BOOK_UPDATE:
+                self.apply_update(data)
+
+    def apply_snapshot(self, data: dict) -> None:
+        """用快照重置盘口。"""
+        self.bids.clear()
+        self.asks.clear()
+        for level in _as_levels(data.get("bids") or []):
+            self.bids.apply(level)
+        for level in _as_levels(data.get("asks") or []):
+            self.asks.apply(level)
+        self._finish(data)
+        self.snapshots += 1
+
+    def apply_update(self, data: dict) -> None:
+        """应用增量：校验 pu 连续后逐档更新（数量 0 撤档），截断到订阅深度并校验 cs。"""
+        if not self.ready:
+            raise BookSequenceError("未收到快照即收到 book.update")
+        if self.verify_sequence and data.get("pu") != self.u:
+            raise BookSequenceError(f"序列不连续：pu={data.get('pu')}，本地 u={self.u}")
+        update = data.get("update") or {}
+        for level in _as_levels(update.get("bids") or []):
+            self.bids.apply(level)
+        for level in _as_levels(update.get("asks") or []):
+            self.asks.apply(level)
+        self._finish(data)
+        self.updates += 1
+
+    def _finish(self, data: dict) -> None:
+        self.bids.truncate(self.depth)
+        self.asks.truncate(self.depth)
+        self.u = data.get("u")
+        self.t = data.get("t")
+        if self.checksum is not None and data.get("cs") is not None:
+            actual = self.checksum(self.bids.top(), self.asks.top())
+            if actual != data["cs"]:
+                raise BookChecksumError(f"校验和不一致：u={self.u} 本地 cs={actual}，消息 cs={data['cs']}")
+
+    def top(self, n: Optional[int] = None) -> tuple[list, list]:
+        """前 n 档（默认全部）：(bids 价格降序, asks 价格升序)。"""
+        return self.bids.top(n), self.asks.top(n)
+
+    @property
+    def best_bid(self) -> Optional[list]:
+        levels = self.bids.top(1)
+        return levels[0] if levels else None
+
+    @property
+    def best_ask(self) -> Optional[list]:
+        levels = self.asks.top(1)
+        return levels[0] if levels else None